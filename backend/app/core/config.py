@@ -18,7 +18,56 @@ class Settings:
     # Fatigue Model Paths
     FATIGUE_MODEL_PATH = ML_DIR / "fatigue_model" / "artifacts" / "model.pkl"
     FATIGUE_SCALER_PATH = ML_DIR / "fatigue_model" / "artifacts" / "scaler.pkl"
+    FATIGUE_ARRAYS_PATH = ML_DIR / "fatigue_model" / "artifacts" / "fatigue_arrays"
+
+    # Memory-map the exported raw-array artifacts instead of unpickling
+    # (python -m backend.ml.export_artifacts). Set USE_ARRAY_ARTIFACTS=0 to force the pickles
+    USE_ARRAY_ARTIFACTS: bool = os.getenv("USE_ARRAY_ARTIFACTS", "1") != "0"
     
+    # Route Risk prediction cache (quantized-input memoization)
+    # Set ROUTE_CACHE_SIZE=0 to disable
+    ROUTE_CACHE_SIZE: int = int(os.getenv("ROUTE_CACHE_SIZE", "10000"))
+    ROUTE_CACHE_TTL_SECONDS: float = float(os.getenv("ROUTE_CACHE_TTL_SECONDS", "300"))
+    ROUTE_CACHE_RESOLUTIONS = {
+        "route_distance_km": 0.1,
+        "route_duration_min": 1.0,
+        "intersection_density": 0.05,
+        "is_night": 1,
+        "weather_stress_index": 0.05,
+        "fatigue_score": 0.1,
+        "shift_duration_hours": 0.25,
+    }
+
+    # Micro-batching of /predict/route and /predict/fatigue: single-row requests
+    # are queued for up to MAX_WAIT_MS (or MAX_SIZE rows) and scored together
+    # off the event loop. Set INFERENCE_BATCHING=0 to score each request directly
+    INFERENCE_BATCHING: bool = os.getenv("INFERENCE_BATCHING", "1") != "0"
+    INFERENCE_BATCH_MAX_SIZE: int = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "256"))
+    INFERENCE_BATCH_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "2"))
+
+    # Versioned model artifacts for hot-swap: <dir>/<version>/ holds the same
+    # files as the default artifacts dir (route_risk_logreg.joblib + stats, or
+    # model.pkl + scaler.pkl + label_map.pkl), optionally with exported arrays
+    ROUTE_VERSIONS_DIR = ML_DIR / "route_risk" / "artifacts" / "versions"
+    FATIGUE_VERSIONS_DIR = ML_DIR / "fatigue_model" / "artifacts" / "versions"
+    # Labelled rows the candidate versions were NOT trained on. Unset by default:
+    # validated activation is refused until one is configured, and the training
+    # CSVs themselves are rejected (scoring on them would pass overfit models)
+    ROUTE_HOLDOUT_PATH = Path(os.environ["ROUTE_HOLDOUT_PATH"]) if os.getenv("ROUTE_HOLDOUT_PATH") else None
+    FATIGUE_HOLDOUT_PATH = Path(os.environ["FATIGUE_HOLDOUT_PATH"]) if os.getenv("FATIGUE_HOLDOUT_PATH") else None
+    ROUTE_TRAINING_DATA = [ML_DIR / "route_risk" / "data" / "route_risk_expanded_10k.csv",
+                           ML_DIR / "route_risk" / "data" / "route_risk_synthetic_base.csv"]
+    FATIGUE_TRAINING_DATA = [ML_DIR / "fatigue_model" / "data" / "base_data_expanded.csv"]
+    # A new version must reach this holdout accuracy and not lose more than
+    # MODEL_MAX_ACCURACY_DROP against the active version
+    MODEL_HOLDOUT_SAMPLE: int = int(os.getenv("MODEL_HOLDOUT_SAMPLE", "2000"))
+    MODEL_MIN_ACCURACY: float = float(os.getenv("MODEL_MIN_ACCURACY", "0.8"))
+    MODEL_MAX_ACCURACY_DROP: float = float(os.getenv("MODEL_MAX_ACCURACY_DROP", "0.02"))
+    # Previous versions kept loaded for instant rollback
+    MODEL_ROLLBACK_DEPTH: int = int(os.getenv("MODEL_ROLLBACK_DEPTH", "3"))
+    # /admin/* requires this in the X-Admin-Token header; unset disables the admin API
+    ADMIN_TOKEN: str | None = os.getenv("ADMIN_TOKEN")
+
     # Incident Data Path
     DB_PATH = BASE_DIR / "backend" / "app" / "data" / "incidents.json"
 
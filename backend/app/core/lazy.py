@@ -0,0 +1,43 @@
+import importlib
+import threading
+
+
+class LazyImport:
+    """
+    Defers importing a module (or one attribute of it) until first use.
+
+    Heavy optional stacks (Gemini, python-docx, ...) are wrapped in this so
+    importing the app stays fast and a fresh pod can serve health checks and
+    /predict/* before they are ever needed. Calling the object calls the
+    wrapped attribute, so it can stand in for an imported function:
+
+        run_pipeline = LazyImport("backend.ml.incident_ai.main_workflow", "run_gigguard_pipeline")
+        run_pipeline(...)   # imports on the first call only
+    """
+
+    def __init__(self, module: str, attr: str | None = None):
+        self.module = module
+        self.attr = attr
+        self._target = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    target = importlib.import_module(self.module)
+                    if self.attr:
+                        target = getattr(target, self.attr)
+                    self._target = target
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self.module}.{self.attr}" if self.attr else self.module
+        return f"<LazyImport {name} ({'loaded' if self.loaded else 'deferred'})>"
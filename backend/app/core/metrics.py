@@ -0,0 +1,230 @@
+"""
+In-process Prometheus metrics (text exposition format 0.0.4).
+
+Kept dependency-free so every module, including the standalone ML
+scripts, can record timings without pulling in prometheus_client. Each
+standalone entry point puts the repo root on sys.path in its __main__
+guard, so the ML modules import this one the same way the server does. The
+server exposes everything registered here at GET /metrics.
+
+    with stage("route_risk", "model"):
+        ...
+
+    with upstream_call("overpass") as call:
+        response = await client.post(...)
+        if response.status_code != 200:
+            call["outcome"] = f"http_{response.status_code}"
+
+Label values are kept low-cardinality on purpose: route templates
+(/fatigue/workers/{worker_id}/risk), never raw paths or ids.
+"""
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; spans sub-millisecond kernel calls up to slow upstream APIs
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # le is inclusive
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_samples(self, items):
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by router, route and status code.",
+    ("router", "method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body byte is sent.",
+    ("router", "method", "route")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent in one stage of a request (feature prep, model, render, ...).",
+    ("service", "stage")
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total", "Calls to external services (Overpass, Nominatim, Gemini) by outcome.",
+    ("upstream", "outcome")
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of single calls to external services, per attempt.",
+    ("upstream", "outcome")
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "upstream_retries_total", "Retried calls to external services.",
+    ("upstream",)
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observes the wall time of the block, also when it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def stage(service: str, name: str):
+    """timed() on STAGE_SECONDS: `with stage("fatigue", "model"): ...`"""
+    return timed(STAGE_SECONDS, service=service, stage=name)
+
+
+@contextmanager
+def upstream_call(upstream: str, attempt: int = 0):
+    """
+    Times one call to an external service and counts it by outcome;
+    attempt > 0 also counts it as a retry. The block can set the outcome
+    itself (e.g. an HTTP error status that did not raise) by assigning
+    call["outcome"].
+    """
+    if attempt > 0:
+        UPSTREAM_RETRIES.inc(upstream=upstream)
+    call = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield call
+    except asyncio.CancelledError:
+        # Abandoned by the caller (e.g. a deadline), not a failure upstream
+        call["outcome"] = "cancelled"
+        raise
+    except BaseException:
+        call["outcome"] = "error"
+        raise
+    finally:
+        outcome = call["outcome"]
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, upstream=upstream, outcome=outcome)
+        UPSTREAM_REQUESTS.inc(upstream=upstream, outcome=outcome)
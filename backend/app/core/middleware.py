@@ -0,0 +1,63 @@
+import time
+
+from backend.app.core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+
+UNMATCHED = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Records http_requests_total and http_request_duration_seconds per
+    router and route template.
+
+    Pure ASGI (not BaseHTTPMiddleware) so streaming responses such as
+    /predict/route/stream are neither buffered nor cut short: the clock
+    stops when the last body chunk has been sent, not when the handler
+    returns its response object.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500  # if the app raises before sending a response
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            router, route = _route_labels(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, router=router, method=method, route=route)
+            HTTP_REQUESTS.inc(router=router, method=method, route=route, status=status)
+
+
+def _route_labels(scope) -> tuple[str, str]:
+    """
+    (router, route template) of the matched route, e.g.
+    ("fatigue_state_api", "/fatigue/workers/{worker_id}/risk").
+    The router is the module the endpoint is defined in.
+    """
+    route = scope.get("route")
+    if route is not None:
+        endpoint = getattr(route, "endpoint", None)
+        module = getattr(endpoint, "__module__", None) or ""
+        return module.rsplit(".", 1)[-1] or UNMATCHED, route.path
+
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        # Mounted sub-app (e.g. StaticFiles on /data): one series per mount
+        module = type(endpoint).__module__.rsplit(".", 1)[-1]
+        return module, scope.get("root_path") or UNMATCHED
+
+    return UNMATCHED, UNMATCHED
@@ -1,7 +1,7 @@
 import sys
 import os
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles  # <--- CRITICAL IMPORT
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -20,15 +20,23 @@ sys.path.append(str(BASE_DIR / "backend" / "ml" / "incident_ai"))
 # ==========================================
 from backend.app.services.risk_service import risk_service
 from backend.app.services.fatigue_service import fatigue_service
+from backend.app.services.batching import BATCHERS
+from backend.app.core.config import settings
+from backend.app.core import metrics
+from backend.app.core.middleware import MetricsMiddleware
 from backend.app.routers import ml_api
+from backend.app.routers import stream_api
+from backend.app.routers import fatigue_state_api
 from backend.app.routers import incident_api  # <--- Ensure this is imported
+from backend.app.routers import admin_api
 
 # Import SOS App (Safe Import)
 try:
-    from backend.ml.SOS.sos_api import app as sos_app
+    from backend.ml.SOS import sos_api
+    sos_app = sos_api.app
 except ImportError as e:
     print(f"⚠️ Warning: Could not import SOS API: {e}")
-    sos_app = None
+    sos_api = sos_app = None
 
 # ==========================================
 # 3. LIFESPAN (Startup Logic)
@@ -38,13 +46,42 @@ async def lifespan(app: FastAPI):
     print("\n🚀 STARTING UNIFIED SAFETY SERVER...")
     try:
         print("   -> Loading Route Risk Model...")
+        risk_service.load_model()
         print("   -> Loading Fatigue Model...")
         fatigue_service.load_model()
         print("✅ Core ML Models Loaded!")
     except Exception as e:
         print(f"❌ Error loading ML models: {e}")
+    if sos_api:
+        try:
+            print("   -> Loading SOS POI index...")
+            sos_api.load_poi_index()
+        except Exception as e:
+            print(f"❌ Error loading POI index (falling back to Overpass): {e}")
+        try:
+            print("   -> Loading SOS reverse geocoder...")
+            sos_api.load_geocoder_data()
+        except Exception as e:
+            print(f"❌ Error loading reverse geocoder (falling back to Nominatim): {e}")
+        try:
+            sos_api.load_overpass_cache()
+        except Exception as e:
+            print(f"❌ Error loading Overpass cache (starting cold): {e}")
+    if sos_api:
+        await sos_api.upstreams.start()
+    if settings.INFERENCE_BATCHING:
+        for batcher in BATCHERS:
+            await batcher.start()
     yield
     print("🛑 Shutting down...")
+    for batcher in BATCHERS:
+        await batcher.stop()
+    if sos_api:
+        await sos_api.upstreams.aclose()
+        try:
+            sos_api.save_overpass_cache()
+        except Exception as e:
+            print(f"❌ Error saving Overpass cache: {e}")
 
 # ==========================================
 # 4. MAIN APP SETUP
@@ -58,6 +95,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so it times everything including CORS and error handling
+app.add_middleware(MetricsMiddleware)
 
 # ==========================================
 # 5. REGISTER ROUTES
@@ -69,7 +108,10 @@ if sos_app:
 
 # B. ML Services
 app.include_router(ml_api.router, tags=["Risk & Fatigue"])
+app.include_router(stream_api.router, tags=["Risk & Fatigue"])
+app.include_router(fatigue_state_api.router, tags=["Risk & Fatigue"])
 app.include_router(incident_api.router, tags=["Incident AI"])
+app.include_router(admin_api.router, tags=["Admin"])
 
 # C. Serve Generated Reports (CRITICAL FOR DOWNLOADS)
 # This lets the frontend access: http://localhost:8000/data/user_123/report.docx
@@ -86,4 +128,9 @@ def health_check():
         "status": "active", 
         "system": "Unified Backend", 
         "modules": ["SOS", "Route Risk", "Fatigue", "Incident AI"]
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Request, per-stage and upstream latency in Prometheus text format."""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
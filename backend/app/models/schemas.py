@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 # --- Route Risk Schemas ---
@@ -17,6 +19,14 @@ class RouteRiskResponse(BaseModel):
     reasons: list[str]
 
 
+class RouteRiskBatchRequest(BaseModel):
+    routes: list[RouteRiskRequest]
+
+
+class RouteRiskBatchResponse(BaseModel):
+    results: list[RouteRiskResponse]
+
+
 # --- Fatigue Schemas ---
 class FatigueRequest(BaseModel):
     shift_duration_hours: float = Field(json_schema_extra={"example": 4.0})
@@ -30,3 +40,61 @@ class FatigueResponse(BaseModel):
     risk_class: str
     risk_score: float
     risk_probabilities: dict[str, float]
+
+
+class FatigueBatchRequest(BaseModel):
+    workers: list[FatigueRequest]
+
+
+class FatigueBatchResponse(BaseModel):
+    results: list[FatigueResponse]
+
+
+# --- Worker + Routes (composite) Schemas ---
+class CandidateRoute(BaseModel):
+    route_id: str | None = Field(None, json_schema_extra={"example": "via-ring-road"})
+    route_distance_km: float = Field(json_schema_extra={"example": 8.5})
+    route_duration_min: float = Field(json_schema_extra={"example": 42.0})
+    intersection_density: float = Field(json_schema_extra={"example": 1.4})
+    is_night: int = Field(description="1 for night, 0 for day", json_schema_extra={"example": 1})
+    weather_stress_index: float | None = Field(None, description="Defaults to the worker's weather_stress_index")
+
+
+class WorkerRoutesRequest(BaseModel):
+    worker: FatigueRequest
+    routes: list[CandidateRoute]
+
+
+class RankedRoute(RouteRiskResponse):
+    rank: int
+    index: int = Field(description="Position of the route in the request")
+    route_id: str | None
+
+
+class WorkerRoutesResponse(BaseModel):
+    fatigue: FatigueResponse
+    fatigue_score: float = Field(description="Fatigue mapped to the route model's 1–5 scale")
+    routes: list[RankedRoute]
+
+
+# --- Fatigue State (shift events) Schemas ---
+class ShiftStartEvent(BaseModel):
+    timestamp: datetime | None = Field(None, description="Defaults to server time")
+    weather_stress_index: float | None = Field(None, description="0.0 to 1.0", json_schema_extra={"example": 0.5})
+
+
+class ShiftEndEvent(BaseModel):
+    timestamp: datetime | None = Field(None, description="Defaults to server time")
+    self_reported_tiredness: int | None = Field(None, description="1–5 scale", json_schema_extra={"example": 3})
+
+
+class WorkerFatigueFeatures(BaseModel):
+    worker_id: str
+    on_shift: bool
+    shift_duration_hours: float
+    consecutive_work_days: int
+    night_work_fraction: float
+
+
+class WorkerFatigueRiskResponse(FatigueResponse):
+    features: WorkerFatigueFeatures
@@ -0,0 +1,54 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.core.config import settings
+from backend.app.services.model_versions import (
+    model_versions, HoldoutUnavailable, InvalidVersionName, UnknownVersion, ValidationFailed
+)
+
+
+def require_admin_token(x_admin_token: str | None = Header(None)):
+    # Closed unless a token is configured: these routes swap the live models
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API disabled: ADMIN_TOKEN is not configured")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Token")
+
+
+router = APIRouter(prefix="/admin/models", dependencies=[Depends(require_admin_token)])
+
+@router.get("")
+async def model_status():
+    """Active, available and rollback versions per model."""
+    return model_versions.status()
+
+@router.post("/{model}/versions/{version}/activate")
+async def activate_model_version(model: str, version: str, validate: bool = True):
+    """
+    Loads a version in a worker thread while the current one keeps serving,
+    checks it on the holdout sample, then swaps it in atomically.
+    """
+    try:
+        return await run_in_threadpool(model_versions.activate, model, version, validate)
+    except UnknownVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidVersionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HoldoutUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValidationFailed as e:
+        raise HTTPException(status_code=422, detail=e.report)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{model}/rollback")
+async def rollback_model_version(model: str):
+    try:
+        version = await run_in_threadpool(model_versions.rollback, model)
+    except UnknownVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"model": model, "active": version}
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.app.models.schemas import (
+    ShiftStartEvent, ShiftEndEvent,
+    WorkerFatigueFeatures, WorkerFatigueRiskResponse
+)
+from backend.app.services.fatigue_state import fatigue_state_store, ShiftEventError
+from backend.app.services.fatigue_service import fatigue_service
+
+router = APIRouter(prefix="/fatigue/workers")
+
+@router.post("/{worker_id}/shift/start", response_model=WorkerFatigueFeatures)
+async def shift_start(worker_id: str, event: ShiftStartEvent):
+    try:
+        features = fatigue_state_store.shift_start(worker_id, event.timestamp, event.weather_stress_index)
+    except ShiftEventError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"worker_id": worker_id, **features}
+
+@router.post("/{worker_id}/shift/end", response_model=WorkerFatigueFeatures)
+async def shift_end(worker_id: str, event: ShiftEndEvent):
+    try:
+        features = fatigue_state_store.shift_end(worker_id, event.timestamp, event.self_reported_tiredness)
+    except ShiftEventError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"worker_id": worker_id, **features}
+
+@router.get("/{worker_id}/features", response_model=WorkerFatigueFeatures)
+async def worker_features(worker_id: str, at: datetime | None = None):
+    try:
+        features = fatigue_state_store.features(worker_id, at)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No shift events for worker {worker_id}")
+    return {"worker_id": worker_id, **features}
+
+@router.get("/{worker_id}/risk", response_model=WorkerFatigueRiskResponse)
+async def worker_fatigue_risk(
+    worker_id: str,
+    weather_stress_index: float | None = Query(None, description="Defaults to the value sent with the last shift start"),
+    self_reported_tiredness: int | None = Query(None, description="Defaults to the value sent with the last shift end"),
+    at: datetime | None = None
+):
+    """Current fatigue risk from the worker's server-side shift state."""
+    try:
+        inputs = fatigue_state_store.model_inputs(worker_id, weather_stress_index, self_reported_tiredness, at)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No shift events for worker {worker_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        result = fatigue_service.predict(inputs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    features = {k: inputs[k] for k in ("on_shift", "shift_duration_hours", "consecutive_work_days", "night_work_fraction")}
+    return {**result, "features": {"worker_id": worker_id, **features}}
@@ -3,9 +3,12 @@ import os
 import uuid
 import time
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body
-from backend.ml.incident_ai.main_workflow import run_gigguard_pipeline
+from backend.app.core.lazy import LazyImport
 from backend.ml.incident_ai.storage import save_report_and_update_db
-from backend.ml.incident_ai.docs_generator import create_word_report
+
+# Gemini + python-docx are only imported on the first incident report
+run_gigguard_pipeline = LazyImport("backend.ml.incident_ai.main_workflow", "run_gigguard_pipeline")
+create_word_report = LazyImport("backend.ml.incident_ai.docs_generator", "create_word_report")
 
 router = APIRouter()
 
@@ -1,23 +1,67 @@
 from fastapi import APIRouter, HTTPException
-from backend.app.models.schemas import RouteRiskRequest, RouteRiskResponse, FatigueRequest, FatigueResponse
+from backend.app.models.schemas import (
+    RouteRiskRequest, RouteRiskResponse,
+    RouteRiskBatchRequest, RouteRiskBatchResponse,
+    FatigueRequest, FatigueResponse,
+    FatigueBatchRequest, FatigueBatchResponse,
+    WorkerRoutesRequest, WorkerRoutesResponse
+)
 from backend.app.services.risk_service import risk_service
 from backend.app.services.fatigue_service import fatigue_service
+from backend.app.services.worker_routes import rank_routes_for_worker
+from backend.app.services.batching import route_batcher, fatigue_batcher, BATCHERS
 
 router = APIRouter()
 
 @router.post("/predict/route", response_model=RouteRiskResponse)
 async def predict_route_risk(request: RouteRiskRequest):
     try:
-        # Convert Pydantic model to dict
-        result = risk_service.predict(request.dict())
+        # Convert Pydantic model to dict; scored with other concurrent
+        # requests in one vectorized batch, off the event loop
+        result = await route_batcher.submit(request.dict())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/predict/route/batch", response_model=RouteRiskBatchResponse)
+async def predict_route_risk_batch(request: RouteRiskBatchRequest):
+    try:
+        results = risk_service.predict_batch([route.dict() for route in request.routes])
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/predict/route/cache")
+async def route_cache_stats():
+    return risk_service.cache_stats()
+
+@router.get("/predict/batching")
+async def batching_stats():
+    return {batcher.name: batcher.stats() for batcher in BATCHERS}
+
 @router.post("/predict/fatigue", response_model=FatigueResponse)
 async def predict_fatigue(request: FatigueRequest):
     try:
-        result = fatigue_service.predict(request.dict())
+        result = await fatigue_batcher.submit(request.dict())
         return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/fatigue/batch", response_model=FatigueBatchResponse)
+async def predict_fatigue_batch(request: FatigueBatchRequest):
+    try:
+        results = fatigue_service.predict_batch([worker.dict() for worker in request.workers])
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/worker/routes", response_model=WorkerRoutesResponse)
+async def predict_worker_routes(request: WorkerRoutesRequest):
+    """
+    One call instead of /predict/fatigue + N x /predict/route: the worker's
+    fatigue is scored once and fed into all candidate routes, ranked safest first.
+    """
+    try:
+        return rank_routes_for_worker(request.worker.dict(), [route.dict() for route in request.routes])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
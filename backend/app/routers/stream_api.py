@@ -0,0 +1,213 @@
+import heapq
+import json
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import QueryParams
+from starlette.routing import Route
+
+from backend.app.models.schemas import RouteRiskRequest
+from backend.app.services.risk_service import risk_service
+
+router = APIRouter()
+
+# Longest accepted input line; longer ones become an error line and are skipped
+MAX_LINE_BYTES = 64 * 1024
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class _RouteRiskStream:
+    """
+    POST /predict/route/stream: scores an NDJSON (or chunked) body of
+    candidate routes as it arrives.
+
+    Each input line is one RouteRiskRequest object, optionally with a
+    "route_id". Rows are scored in fixed-size vectorized chunks, and the
+    response streams back NDJSON lines:
+      {"type": "route", ...}   one per scored row
+      {"type": "error", ...}   one per invalid row
+      {"type": "top_k", ...}   running K safest routes after each chunk
+      {"type": "summary", ...} final counts and top-K
+    Query parameters: chunk_size (1-10000, default 512), top_k (1-100,
+    default 10).
+
+    A raw ASGI app rather than a FastAPI endpoint: it reads receive()
+    itself while sending results, so no disconnect listener competes for
+    the body chunks. Memory stays bounded by chunk_size, top_k and
+    MAX_LINE_BYTES, not by input size.
+    """
+
+    async def __call__(self, scope, receive, send):
+        # Plain Routes, unlike FastAPI's, leave scope["route"] unset; the metrics labels read it
+        scope["route"] = stream_route
+        params = QueryParams(scope["query_string"])
+        try:
+            chunk_size = _int_param(params, "chunk_size", 512, 1, 10_000)
+            top_k = _int_param(params, "top_k", 10, 1, 100)
+        except ValueError as e:
+            await JSONResponse({"detail": str(e)}, status_code=422)(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        })
+        try:
+            async for text in _score_stream(_iter_lines(receive), chunk_size, top_k):
+                await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+        except _ClientDisconnected:
+            return
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+stream_route = Route("/predict/route/stream", _RouteRiskStream(), methods=["POST"])
+router.routes.append(stream_route)
+
+
+async def _score_stream(lines, chunk_size: int, top_k: int):
+    ranking = _SafestRoutes(top_k)
+    chunk = []  # (index, route_id, features)
+    rows_scored = 0
+    errors = 0
+
+    async for index, line in lines:
+        try:
+            if line is None:
+                raise ValueError(f"Line longer than {MAX_LINE_BYTES} bytes")
+            row = json.loads(line.decode("utf-8"))
+            route_id = row.pop("route_id", None) if isinstance(row, dict) else None
+            features = RouteRiskRequest(**row).dict()
+        except (UnicodeDecodeError, ValueError, TypeError, ValidationError) as e:
+            errors += 1
+            yield _ndjson({"type": "error", "index": index, "detail": _error_detail(e)})
+            continue
+
+        chunk.append((index, route_id, features))
+        if len(chunk) >= chunk_size:
+            lines_out, failed = await _score_chunk(chunk, ranking)
+            yield lines_out
+            rows_scored += len(chunk) - failed
+            errors += failed
+            chunk = []
+            yield _ndjson({"type": "top_k", "rows_scored": rows_scored, "safest": ranking.ranked()})
+
+    if chunk:
+        lines_out, failed = await _score_chunk(chunk, ranking)
+        yield lines_out
+        rows_scored += len(chunk) - failed
+        errors += failed
+
+    yield _ndjson({
+        "type": "summary",
+        "rows_scored": rows_scored,
+        "errors": errors,
+        "safest": ranking.ranked()
+    })
+
+
+async def _score_chunk(chunk, ranking) -> tuple[str, int]:
+    """NDJSON lines for the chunk, and how many of its rows failed."""
+    # One vectorized pass per chunk, off the event loop
+    try:
+        results = await run_in_threadpool(risk_service.predict_batch, [features for _, _, features in chunk])
+    except ValueError as e:
+        # A chunk the model rejects fails on its own; the stream goes on
+        lines = [
+            _ndjson({"type": "error", "index": index, "route_id": route_id, "detail": str(e)})
+            for index, route_id, _ in chunk
+        ]
+        return "".join(lines), len(chunk)
+
+    lines = []
+    for (index, route_id, _), result in zip(chunk, results):
+        ranking.offer(index, route_id, result)
+        lines.append(_ndjson({"type": "route", "index": index, "route_id": route_id, **result}))
+    return "".join(lines), 0
+
+
+async def _iter_lines(receive):
+    """
+    Yields (line_number, raw bytes) for each non-empty line as body chunks
+    arrive, holding at most one partial line. A line over MAX_LINE_BYTES
+    is yielded once as None and the rest of it is dropped.
+    """
+    index = 0
+    partial = b""
+    skipping = False  # inside an over-long line, dropping up to its newline
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _ClientDisconnected()
+        more_body = message.get("more_body", False)
+
+        *lines, partial = (partial + message.get("body", b"")).split(b"\n")
+        if not more_body:
+            lines.append(partial)
+            partial = b""
+
+        for line in lines:
+            if skipping:
+                skipping = False  # the tail of the over-long line
+                continue
+            if line.strip():
+                yield index, (line if len(line) <= MAX_LINE_BYTES else None)
+                index += 1
+
+        if len(partial) > MAX_LINE_BYTES:
+            if not skipping:
+                yield index, None
+                index += 1
+                skipping = True
+            partial = b""
+
+
+def _int_param(params: QueryParams, name: str, default: int, low: int, high: int) -> int:
+    raw = params.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = None
+    if value is None or not low <= value <= high:
+        raise ValueError(f"{name} must be an integer between {low} and {high}")
+    return value
+
+
+class _SafestRoutes:
+    """Running top-K routes with the lowest P(High), in O(log K) per row."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap = []  # max-heap on P(High) via negation
+
+    def offer(self, index: int, route_id, result: dict) -> None:
+        p_high = result["risk_probabilities"]["High"]
+        item = (-p_high, -index, route_id, result["risk_label"])
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def ranked(self) -> list[dict]:
+        return [
+            {"index": -neg_index, "route_id": route_id, "risk_label": label, "high_probability": -neg_p}
+            for neg_p, neg_index, route_id, label in sorted(self._heap, reverse=True)
+        ]
+
+
+def _error_detail(e: Exception):
+    if isinstance(e, ValidationError):
+        return [err["msg"] + ": " + ".".join(map(str, err["loc"])) for err in e.errors()]
+    return str(e)
+
+
+def _ndjson(obj: dict) -> str:
+    return json.dumps(obj) + "\n"
@@ -0,0 +1,173 @@
+"""
+Dynamic micro-batching for the single-row ML endpoints.
+
+Each request submits one row and awaits a future. A collector task drains
+the queue into a batch until it has max_batch_size rows or max_wait_ms has
+passed since the first row arrived, then scores the whole batch with one
+vectorized call on a dedicated executor thread, off the event loop. While
+a batch is being scored, new rows pile up and form the next (bigger)
+batch, so under load throughput grows with batch size instead of with
+request count, and SOS handlers on the same loop are never blocked.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.core.config import settings
+from backend.app.services.fatigue_service import fatigue_service
+from backend.app.services.risk_service import risk_service
+
+
+class MicroBatcher:
+    def __init__(self, name: str, score_batch, max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        """
+        score_batch: list of rows -> list of results (same order, same length).
+        """
+        self.name = name
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-batcher")
+        self._task = asyncio.create_task(self._collect(), name=f"{self.name}-batcher")
+
+    async def stop(self):
+        """Scores whatever is still queued, then shuts the executor down."""
+        if not self.running:
+            return
+        await self._queue.put(None)  # sentinel: finish the current queue, then exit
+        await self._task
+        self._task = None
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, row):
+        """Scores one row as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        if not self.running:
+            # Not started (e.g. no lifespan): still keep the work off the loop
+            return (await loop.run_in_executor(None, self.score_batch, [row]))[0]
+
+        future = loop.create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    # Take what is already queued without waiting
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._run_batch(loop, batch)
+
+        # Rows submitted after the stop sentinel
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftover.append(item)
+        if leftover:
+            await self._run_batch(loop, leftover)
+
+    async def _run_batch(self, loop, batch):
+        # Callers that gave up (client disconnect, timeout) are dropped
+        batch = [(row, future) for row, future in batch if not future.done()]
+        if not batch:
+            return
+
+        rows = [row for row, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self._executor, self.score_batch, rows)
+        except Exception:
+            # One bad row must not fail everyone else's request: retry one by one
+            results = await loop.run_in_executor(self._executor, self._score_individually, rows)
+        self.busy_seconds += time.perf_counter() - start
+
+        self.batches += 1
+        self.rows += len(rows)
+        self.largest_batch = max(self.largest_batch, len(rows))
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _score_individually(self, rows):
+        results = []
+        for row in rows:
+            try:
+                results.append(self.score_batch([row])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "busy_seconds": self.busy_seconds,
+        }
+
+
+route_batcher = MicroBatcher(
+    "route_risk",
+    risk_service.predict_batch,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS
+)
+fatigue_batcher = MicroBatcher(
+    "fatigue",
+    fatigue_service.predict_batch,
+    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS
+)
+BATCHERS = [route_batcher, fatigue_batcher]
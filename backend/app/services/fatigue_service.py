@@ -1,52 +1,153 @@
 import joblib
 import numpy as np
 import os
+from typing import NamedTuple
 from backend.app.core.config import settings
+from backend.app.core.metrics import stage
+from backend.ml.route_risk.inference.array_artifacts import MANIFEST_NAME, is_stale, load_array_artifact
+from backend.ml.route_risk.inference.linear_kernel import LinearSoftmaxKernel
+
+FEATURES = [
+    "shift_duration_hours",
+    "consecutive_work_days",
+    "night_work_fraction",
+    "weather_stress_index",
+    "self_reported_tiredness"
+]
+
+class FatigueBundle(NamedTuple):
+    version: str
+    artifact_dir: str
+    # Scaler folded into the weights: scores raw (unscaled) features directly
+    kernel: LinearSoftmaxKernel
+    # Label per kernel output column, e.g. ["Low", "Medium", "High"]
+    class_labels: list
+    label_map: dict
 
 class FatigueService:
     def __init__(self):
-        self.model = None
-        self.scaler = None
-        self.label_map = None
+        # Everything predict() needs, swapped as one reference (no lock on reads)
+        self.bundle = None
+
+    @property
+    def kernel(self):
+        return self.bundle.kernel if self.bundle else None
+
+    @property
+    def class_labels(self):
+        return self.bundle.class_labels if self.bundle else None
 
     def load_model(self):
         """Loads model artifacts into memory"""
-        if not os.path.exists(settings.FATIGUE_MODEL_PATH):
-            raise FileNotFoundError(f"Model not found at {settings.FATIGUE_MODEL_PATH}")
-            
-        self.model = joblib.load(settings.FATIGUE_MODEL_PATH)
-        self.scaler = joblib.load(settings.FATIGUE_SCALER_PATH)
+        self.activate(self.build_bundle())
+
+    def build_bundle(self, artifact_dir: str | None = None, version: str = "default") -> FatigueBundle:
+        """
+        Loads a model version without activating it. artifact_dir holds
+        model.pkl, scaler.pkl, label_map.pkl (and optionally fatigue_arrays/);
+        defaults to the configured artifact paths.
+        """
+        if artifact_dir is None:
+            model_path, scaler_path = str(settings.FATIGUE_MODEL_PATH), str(settings.FATIGUE_SCALER_PATH)
+            arrays_dir = str(settings.FATIGUE_ARRAYS_PATH)
+            artifact_dir = os.path.dirname(model_path)
+        else:
+            model_path = os.path.join(artifact_dir, "model.pkl")
+            scaler_path = os.path.join(artifact_dir, "scaler.pkl")
+            arrays_dir = os.path.join(artifact_dir, "fatigue_arrays")
+
+        if settings.USE_ARRAY_ARTIFACTS:
+            bundle = self._load_arrays(arrays_dir, model_path, scaler_path, version)
+            if bundle is not None:
+                return bundle
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found at {model_path}")
+
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
         # Hardcoding map if file is missing, otherwise load it
-        # self.label_map = {0: 'Low', 1: 'Medium', 2: 'High'} 
+        # label_map = {'Low': 0, 'Medium': 1, 'High': 2}
         # Or load from file if you prefer:
-        artifact_dir = os.path.dirname(settings.FATIGUE_MODEL_PATH)
-        self.label_map = joblib.load(os.path.join(artifact_dir, "label_map.pkl"))
-        self.inverse_label_map = {v: k for k, v in self.label_map.items()}
+        label_map = joblib.load(os.path.join(os.path.dirname(model_path), "label_map.pkl"))
+        # MinMaxScaler is X * scale_ + min_, so it folds into the weights
+        # and scoring becomes a single matmul + softmax on raw features
+        kernel = LinearSoftmaxKernel.from_estimator(model).fold_affine(scaler.scale_, scaler.min_)
+        return self._make_bundle(version, artifact_dir, kernel, label_map)
 
-    def predict(self, data: dict):
-        if not self.model:
+    def _load_arrays(self, arrays_dir: str, model_path: str, scaler_path: str, version: str):
+        """
+        Memory-maps the exported raw-array artifact (no pickles, no sklearn).
+        Returns None if it is missing or older than the pickles.
+        """
+        if not os.path.exists(os.path.join(arrays_dir, MANIFEST_NAME)):
+            return None
+
+        arrays, manifest = load_array_artifact(arrays_dir)
+        label_map_path = os.path.join(os.path.dirname(model_path), "label_map.pkl")
+        if is_stale(manifest, model_path, scaler_path, label_map_path):
+            print(f"⚠️ {arrays_dir} is out of date with the fatigue pickles, loading those instead")
+            return None
+
+        if "folded_coef" not in arrays:
+            print(f"⚠️ {arrays_dir} predates scaler folding (re-run backend.ml.export_artifacts), loading the pickles instead")
+            return None
+
+        # Scaler already folded in at export: the kernel uses the mapped pages as-is,
+        # so every worker process shares them
+        kernel = LinearSoftmaxKernel(arrays["folded_coef"], arrays["folded_intercept"], arrays["classes"])
+        return self._make_bundle(version, os.path.dirname(arrays_dir), kernel, manifest["metadata"]["label_map"])
+
+    @staticmethod
+    def _make_bundle(version, artifact_dir, kernel: LinearSoftmaxKernel, label_map) -> FatigueBundle:
+        """kernel must score raw features (scaler folded in)."""
+        inverse_label_map = {v: k for k, v in label_map.items()}
+        class_labels = [inverse_label_map[c] for c in kernel.classes.tolist()]
+        return FatigueBundle(version, artifact_dir, kernel, class_labels, dict(label_map))
+
+    def activate(self, bundle: FatigueBundle):
+        """Atomically swaps the served model. Returns the previous bundle."""
+        previous, self.bundle = self.bundle, bundle
+        return previous
+
+    def active_bundle(self) -> FatigueBundle:
+        if self.bundle is None:
             self.load_model()
-            
-        features = np.array([[
-            data["shift_duration_hours"],
-            data["consecutive_work_days"],
-            data["night_work_fraction"],
-            data["weather_stress_index"],
-            data["self_reported_tiredness"]
-        ]])
-
-        features_scaled = self.scaler.transform(features) # type: ignore
-        probs = self.model.predict_proba(features_scaled)[0] # type: ignore
-        predicted_class = np.argmax(probs)
-
-        return {
-            "risk_class": self.inverse_label_map[predicted_class],
-            "risk_probabilities": {
-                "Low": float(probs[0]),
-                "Medium": float(probs[1]),
-                "High": float(probs[2])
-            },
-            "risk_score": float(probs[2])  # Probability of High Risk
-        }
-
-fatigue_service = FatigueService()
\ No newline at end of file
+        return self.bundle
+
+    def predict_proba_array(self, X: np.ndarray, bundle: FatigueBundle | None = None) -> np.ndarray:
+        """
+        Class probabilities (columns in class_labels order) for a raw
+        feature matrix of shape (n_workers, len(FEATURES)).
+        """
+        bundle = bundle or self.active_bundle()
+        return bundle.kernel.predict_proba(X)
+
+    def predict(self, data: dict):
+        return self.predict_batch([data])[0]
+
+    def predict_batch(self, rows: list[dict], bundle: FatigueBundle | None = None):
+        if not rows:
+            return []
+
+        # Read once, so one call never mixes two model versions
+        bundle = bundle or self.active_bundle()
+
+        with stage("fatigue", "feature_prep"):
+            features = np.array([[row[f] for f in FEATURES] for row in rows], dtype=np.float64)
+        with stage("fatigue", "model"):
+            probs = self.predict_proba_array(features, bundle)
+            predicted = probs.argmax(axis=1)
+
+        labels = bundle.class_labels
+        high = labels.index("High")
+        return [
+            {
+                "risk_class": labels[cls],
+                "risk_probabilities": dict(zip(labels, p)),
+                "risk_score": p[high]  # Probability of High Risk
+            }
+            for cls, p in zip(predicted.tolist(), probs.tolist())
+        ]
+
+fatigue_service = FatigueService()
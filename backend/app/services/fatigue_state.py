@@ -0,0 +1,235 @@
+"""
+Server-side fatigue state per worker, built incrementally from shift events.
+
+Instead of clients re-scanning their shift history to compute the fatigue
+model inputs, they post shift start/end events and the store keeps each
+worker's features current:
+
+  shift_duration_hours   length of the open shift so far, else of the last one
+  consecutive_work_days  streak of calendar days worked (reset by a day off)
+  night_work_fraction    night hours / worked hours over the last 7 days
+
+Each worker holds a fixed 7-slot ring buffer (one slot per calendar day) of
+worked and night hours, so every event and every query is O(1) and memory
+per worker is constant. Times are wall-clock hours of the event timestamps,
+so night hours follow the worker's local clock.
+"""
+
+import math
+import threading
+from array import array
+from datetime import datetime
+
+WINDOW_DAYS = 7
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 6
+
+
+class ShiftEventError(ValueError):
+    """An event that does not fit the worker's state (e.g. end without start)."""
+
+
+def _to_hours(ts: datetime) -> float:
+    """Wall-clock time as hours since day 0 of the proleptic calendar."""
+    return ts.toordinal() * 24 + ts.hour + ts.minute / 60 + (ts.second + ts.microsecond / 1e6) / 3600
+
+
+def _overlap(a: float, b: float, lo: float, hi: float) -> float:
+    return max(0.0, min(b, hi) - max(a, lo))
+
+
+def _day_pieces(start: float, end: float, first_day: int):
+    """
+    Splits [start, end) at midnights, ignoring anything before first_day.
+    Yields (day, worked_hours, night_hours). At most WINDOW_DAYS + 1 pieces.
+    """
+    start = max(start, first_day * 24.0)
+    if end <= start:
+        return
+
+    day = int(start // 24)
+    while day * 24 < end:
+        midnight = day * 24.0
+        a, b = max(start, midnight), min(end, midnight + 24)
+        night = _overlap(a, b, midnight, midnight + NIGHT_END_HOUR) + _overlap(a, b, midnight + NIGHT_START_HOUR, midnight + 24)
+        yield day, b - a, night
+        day += 1
+
+
+class WorkerFatigueState:
+    __slots__ = (
+        "shift_start",
+        "last_shift_hours",
+        "streak_days",
+        "last_work_day",
+        "last_event",
+        "tz",
+        "weather_stress_index",
+        "self_reported_tiredness",
+        "ring_day",
+        "ring_hours",
+        "ring_night",
+    )
+
+    def __init__(self):
+        self.shift_start = None
+        self.last_shift_hours = 0.0
+        self.streak_days = 0
+        self.last_work_day = None
+        self.last_event = -math.inf
+        self.tz = None
+        self.weather_stress_index = None
+        self.self_reported_tiredness = None
+        # Slot i holds calendar day ring_day[i] (day % WINDOW_DAYS == i)
+        self.ring_day = array("q", [-1] * WINDOW_DAYS)
+        self.ring_hours = array("d", [0.0] * WINDOW_DAYS)
+        self.ring_night = array("d", [0.0] * WINDOW_DAYS)
+
+    def _check_order(self, t: float):
+        if t < self.last_event:
+            raise ShiftEventError("Shift events must arrive in time order")
+        self.last_event = t
+
+    def start_shift(self, ts: datetime, weather_stress_index: float | None = None):
+        if self.shift_start is not None:
+            raise ShiftEventError("Worker is already on shift")
+        t = _to_hours(ts)
+        self._check_order(t)
+
+        self.shift_start = t
+        self.tz = ts.tzinfo
+        if weather_stress_index is not None:
+            self.weather_stress_index = weather_stress_index
+
+        day = int(t // 24)
+        if self.last_work_day == day:
+            pass
+        elif self.last_work_day == day - 1:
+            self.streak_days += 1
+        else:
+            self.streak_days = 1
+        self.last_work_day = day
+
+    def end_shift(self, ts: datetime, self_reported_tiredness: int | None = None):
+        if self.shift_start is None:
+            raise ShiftEventError("Worker is not on shift")
+        t = _to_hours(ts)
+        self._check_order(t)
+
+        first_day = int(t // 24) - WINDOW_DAYS + 1
+        for day, hours, night in _day_pieces(self.shift_start, t, first_day):
+            slot = day % WINDOW_DAYS
+            if self.ring_day[slot] != day:
+                self.ring_day[slot] = day
+                self.ring_hours[slot] = 0.0
+                self.ring_night[slot] = 0.0
+            self.ring_hours[slot] += hours
+            self.ring_night[slot] += night
+
+        # A shift running past midnight also counts the days it ran into
+        end_day = int(t // 24)
+        self.streak_days += end_day - self.last_work_day
+        self.last_work_day = end_day
+
+        self.last_shift_hours = t - self.shift_start
+        self.shift_start = None
+        self.tz = ts.tzinfo
+        if self_reported_tiredness is not None:
+            self.self_reported_tiredness = self_reported_tiredness
+
+    def features(self, at: datetime | None = None) -> dict:
+        """Current fatigue model inputs that can be derived from shifts."""
+        now = max(_to_hours(at or datetime.now(self.tz)), self.last_event)
+        today = int(now // 24)
+        first_day = today - WINDOW_DAYS + 1
+
+        worked = night = 0.0
+        for slot in range(WINDOW_DAYS):
+            if first_day <= self.ring_day[slot] <= today:
+                worked += self.ring_hours[slot]
+                night += self.ring_night[slot]
+
+        on_shift = self.shift_start is not None
+        if on_shift:
+            for _, hours, night_hours in _day_pieces(self.shift_start, now, first_day):
+                worked += hours
+                night += night_hours
+
+        streak = self.streak_days
+        if on_shift:
+            # A shift still open past midnight keeps the streak going
+            streak += today - self.last_work_day
+        elif self.last_work_day is None or today - self.last_work_day > 1:
+            streak = 0
+
+        return {
+            "on_shift": on_shift,
+            "shift_duration_hours": (now - self.shift_start) if on_shift else self.last_shift_hours,
+            "consecutive_work_days": streak,
+            "night_work_fraction": night / worked if worked > 0 else 0.0,
+        }
+
+
+class FatigueStateStore:
+    """
+    In-memory map of worker_id -> WorkerFatigueState.
+    State is per process and is lost on restart.
+    """
+
+    def __init__(self):
+        self._workers: dict[str, WorkerFatigueState] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._workers)
+
+    def shift_start(self, worker_id: str, ts: datetime | None = None, weather_stress_index: float | None = None) -> dict:
+        with self._lock:
+            state = self._workers.get(worker_id)
+            if state is None:
+                state = self._workers[worker_id] = WorkerFatigueState()
+            state.start_shift(ts or datetime.now(), weather_stress_index)
+            return state.features(ts)
+
+    def shift_end(self, worker_id: str, ts: datetime | None = None, self_reported_tiredness: int | None = None) -> dict:
+        with self._lock:
+            state = self._workers.get(worker_id)
+            if state is None:
+                raise ShiftEventError("Worker is not on shift")
+            state.end_shift(ts or datetime.now(), self_reported_tiredness)
+            return state.features(ts)
+
+    def features(self, worker_id: str, at: datetime | None = None) -> dict:
+        """Raises KeyError for workers with no shift events."""
+        with self._lock:
+            return self._workers[worker_id].features(at)
+
+    def model_inputs(
+        self,
+        worker_id: str,
+        weather_stress_index: float | None = None,
+        self_reported_tiredness: int | None = None,
+        at: datetime | None = None
+    ) -> dict:
+        """
+        Full FatigueService input: shift features plus weather and tiredness,
+        falling back to the last values reported with shift events.
+        Raises KeyError for unknown workers, ValueError if an input is missing.
+        """
+        with self._lock:
+            state = self._workers[worker_id]
+            inputs = state.features(at)
+            inputs["weather_stress_index"] = (
+                weather_stress_index if weather_stress_index is not None else state.weather_stress_index
+            )
+            inputs["self_reported_tiredness"] = (
+                self_reported_tiredness if self_reported_tiredness is not None else state.self_reported_tiredness
+            )
+
+        missing = [k for k in ("weather_stress_index", "self_reported_tiredness") if inputs[k] is None]
+        if missing:
+            raise ValueError(f"No value reported yet for: {missing}")
+        return inputs
+
+
+fatigue_state_store = FatigueStateStore()
@@ -0,0 +1,276 @@
+"""
+Zero-downtime model version management for the route risk and fatigue models.
+
+A new version is loaded next to the one serving, scored on a holdout sample,
+and only then swapped in with a single reference assignment (see
+model_registry.activate / FatigueService.activate), so requests never wait
+on a lock or a restart. The last few replaced versions stay loaded in
+memory for instant rollback.
+
+Versions live in <versions dir>/<version>/ (settings.ROUTE_VERSIONS_DIR,
+settings.FATIGUE_VERSIONS_DIR). "default" is the artifact the server
+started with.
+"""
+
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+from backend.app.core.config import settings
+from backend.app.services.fatigue_service import FEATURES as FATIGUE_FEATURES, fatigue_service
+from backend.app.services.risk_service import risk_service
+from backend.ml.route_risk.features.feature_utils import REQUIRED_FEATURES
+
+# A plain directory name: no separators, and never "." or ".."
+VERSION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+class ValidationFailed(ValueError):
+    def __init__(self, report: dict):
+        super().__init__(report["reason"])
+        self.report = report
+
+
+class HoldoutUnavailable(RuntimeError):
+    """No separate holdout set is configured, so a version cannot be validated."""
+
+
+class UnknownVersion(LookupError):
+    """The model, or the version of it, does not exist."""
+
+
+class InvalidVersionName(ValueError):
+    """The version is not a plain directory name under the versions dir."""
+
+
+class _ModelSlot(ABC):
+    """How to load, swap and score one model; subclassed per model."""
+    name: str
+    versions_dir: Path
+    holdout_path: Path | None
+    holdout_env: str
+    training_data: list
+    features: list
+    label_col: str
+
+    def __init__(self):
+        self._holdout = None
+
+    def version_path(self, version: str) -> Path:
+        if not VERSION_NAME.match(version):
+            raise InvalidVersionName(f"Invalid version name '{version}': expected letters, digits, '.', '_' or '-'")
+        return self.versions_dir / version
+
+    @abstractmethod
+    def build(self, version: str):
+        ...
+
+    @abstractmethod
+    def active(self):
+        ...
+
+    @abstractmethod
+    def activate(self, bundle):
+        ...
+
+    @abstractmethod
+    def predict_labels(self, bundle, rows: list[dict]) -> list[str]:
+        ...
+
+    @abstractmethod
+    def classes(self, bundle) -> list:
+        ...
+
+    def check_holdout(self) -> Path:
+        """The holdout file, if it is set, exists and is not training data."""
+        if self.holdout_path is None:
+            raise HoldoutUnavailable(
+                f"No holdout set for {self.name}: set {self.holdout_env} to labelled rows the "
+                f"versions were not trained on, or activate with validate=false"
+            )
+        if not self.holdout_path.is_file():
+            raise HoldoutUnavailable(f"{self.holdout_env} does not exist: {self.holdout_path}")
+        if any(path.exists() and self.holdout_path.samefile(path) for path in self.training_data):
+            raise HoldoutUnavailable(
+                f"{self.holdout_env} points at training data ({self.holdout_path.name}); "
+                f"accuracy on it would not catch overfit or regressed versions"
+            )
+        return self.holdout_path
+
+    def holdout(self):
+        """Fixed random sample of labelled rows, loaded once."""
+        if self._holdout is None:
+            self.check_holdout()
+            df = pd.read_csv(self.holdout_path)
+            df = df.sample(n=min(settings.MODEL_HOLDOUT_SAMPLE, len(df)), random_state=42)
+            self._holdout = (df[self.features].to_dict("records"), df[self.label_col].astype(str).tolist())
+        return self._holdout
+
+    def accuracy(self, bundle) -> float:
+        rows, labels = self.holdout()
+        predicted = self.predict_labels(bundle, rows)
+        return sum(p == y for p, y in zip(predicted, labels)) / len(labels)
+
+
+class _RouteRiskSlot(_ModelSlot):
+    name = "route_risk"
+    versions_dir = settings.ROUTE_VERSIONS_DIR
+    holdout_path = settings.ROUTE_HOLDOUT_PATH
+    holdout_env = "ROUTE_HOLDOUT_PATH"
+    training_data = settings.ROUTE_TRAINING_DATA
+    features = REQUIRED_FEATURES
+    label_col = "route_risk_label"
+
+    def build(self, version: str):
+        if version == "default":
+            return risk_service.build_bundle(str(settings.ROUTE_MODEL_PATH))
+        model_path = self.version_path(version) / os.path.basename(settings.ROUTE_MODEL_PATH)
+        return risk_service.build_bundle(str(model_path), version=version)
+
+    def active(self):
+        return risk_service.active_bundle()
+
+    def activate(self, bundle):
+        return risk_service.activate(bundle)
+
+    def predict_labels(self, bundle, rows):
+        return risk_service.predict_labels(rows, bundle=bundle)
+
+    def classes(self, bundle):
+        return sorted(bundle.kernel.classes.tolist())
+
+
+class _FatigueSlot(_ModelSlot):
+    name = "fatigue"
+    versions_dir = settings.FATIGUE_VERSIONS_DIR
+    holdout_path = settings.FATIGUE_HOLDOUT_PATH
+    holdout_env = "FATIGUE_HOLDOUT_PATH"
+    training_data = settings.FATIGUE_TRAINING_DATA
+    features = FATIGUE_FEATURES
+    label_col = "workload_risk_label"
+
+    def build(self, version: str):
+        if version == "default":
+            return fatigue_service.build_bundle()
+        return fatigue_service.build_bundle(str(self.version_path(version)), version=version)
+
+    def active(self):
+        return fatigue_service.active_bundle()
+
+    def activate(self, bundle):
+        return fatigue_service.activate(bundle)
+
+    def predict_labels(self, bundle, rows):
+        return [r["risk_class"] for r in fatigue_service.predict_batch(rows, bundle=bundle)]
+
+    def classes(self, bundle):
+        return sorted(bundle.class_labels)
+
+
+class ModelVersionManager:
+    def __init__(self, rollback_depth: int = settings.MODEL_ROLLBACK_DEPTH):
+        self.slots = {slot.name: slot for slot in (_RouteRiskSlot(), _FatigueSlot())}
+        self.rollback_depth = rollback_depth
+        self._history = {name: [] for name in self.slots}  # replaced bundles, newest last
+        self._lock = threading.Lock()  # serializes admin operations, never taken by requests
+
+    def _slot(self, model: str) -> _ModelSlot:
+        if model not in self.slots:
+            raise UnknownVersion(f"Unknown model '{model}', expected one of {list(self.slots)}")
+        return self.slots[model]
+
+    def available_versions(self, model: str) -> list[str]:
+        versions_dir = self._slot(model).versions_dir
+        found = sorted(p.name for p in versions_dir.iterdir() if p.is_dir()) if versions_dir.exists() else []
+        return ["default"] + found
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "active": slot.active().version,
+                "available": self.available_versions(name),
+                "rollback": [b.version for b in reversed(self._history[name])],
+            }
+            for name, slot in self.slots.items()
+        }
+
+    def validate(self, model: str, bundle) -> dict:
+        """
+        Scores `bundle` and the active version on the same holdout sample.
+        """
+        slot = self._slot(model)
+        active = slot.active()
+
+        accuracy = slot.accuracy(bundle)
+        active_accuracy = slot.accuracy(active)
+        report = {
+            "model": model,
+            "version": bundle.version,
+            "active_version": active.version,
+            "holdout_rows": len(slot.holdout()[1]),
+            "accuracy": accuracy,
+            "active_accuracy": active_accuracy,
+            "passed": True,
+            "reason": "ok",
+        }
+
+        if slot.classes(bundle) != slot.classes(active):
+            report.update(passed=False, reason=f"Class labels changed: {slot.classes(bundle)} vs {slot.classes(active)}")
+        elif accuracy < settings.MODEL_MIN_ACCURACY:
+            report.update(passed=False, reason=f"Holdout accuracy {accuracy:.4f} below minimum {settings.MODEL_MIN_ACCURACY}")
+        elif accuracy < active_accuracy - settings.MODEL_MAX_ACCURACY_DROP:
+            report.update(passed=False, reason=f"Holdout accuracy {accuracy:.4f} is more than "
+                                               f"{settings.MODEL_MAX_ACCURACY_DROP} below the active {active_accuracy:.4f}")
+        return report
+
+    def activate(self, model: str, version: str, validate: bool = True) -> dict:
+        """
+        Loads `version`, validates it (unless validate=False) and swaps it in.
+        Raises UnknownVersion for unknown models or versions,
+        InvalidVersionName for anything but a plain directory name,
+        HoldoutUnavailable when validating without a separate holdout set,
+        and ValidationFailed (with the report) if the holdout check fails;
+        the active model is untouched in all cases.
+        """
+        slot = self._slot(model)
+        if version != "default" and not slot.version_path(version).is_dir():
+            raise UnknownVersion(f"No version '{version}' in {slot.versions_dir}")
+        if validate:
+            slot.check_holdout()
+        with self._lock:
+
+            bundle = slot.build(version)
+            report = self.validate(model, bundle) if validate else {"model": model, "version": version, "validated": False}
+            if validate and not report["passed"]:
+                raise ValidationFailed(report)
+
+            previous = slot.activate(bundle)
+            self._remember(model, previous)
+            print(f"🔄 {model}: now serving version '{version}' (was '{previous.version if previous else None}')")
+            return report
+
+    def rollback(self, model: str) -> str:
+        """Swaps back to the most recently replaced version (already loaded)."""
+        slot = self._slot(model)
+        with self._lock:
+            if not self._history[model]:
+                raise LookupError(f"No previous version of {model} to roll back to")
+
+            bundle = self._history[model].pop()
+            slot.activate(bundle)
+            print(f"↩️ {model}: rolled back to version '{bundle.version}'")
+            return bundle.version
+
+    def _remember(self, model: str, bundle):
+        if bundle is None:
+            return
+        history = self._history[model]
+        history.append(bundle)
+        del history[:max(0, len(history) - self.rollback_depth)]
+
+
+model_versions = ModelVersionManager()
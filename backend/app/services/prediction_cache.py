@@ -0,0 +1,93 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class QuantizedLRUCache:
+    """
+    LRU + TTL memo cache keyed on inputs snapped to per-feature resolutions.
+
+    Two requests whose features fall in the same quantization cell
+    (e.g. distances 8.52 km and 8.54 km at 0.1 km resolution) share one
+    entry, so repeated lookups skip feature prep and inference entirely.
+    """
+
+    def __init__(self, resolutions: dict, maxsize: int = 10_000, ttl_seconds: float = 300.0, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if any(res <= 0 for res in resolutions.values()):
+            raise ValueError("All resolutions must be positive")
+
+        self.resolutions = dict(resolutions)
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, data: dict) -> tuple:
+        """Snaps each feature to the nearest multiple of its resolution."""
+        return tuple(
+            math.floor(data[feature] / res + 0.5)
+            for feature, res in self.resolutions.items()
+        )
+
+    def get(self, key):
+        """Returns the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, data: dict, compute):
+        key = self.make_key(data)
+        value = self.get(key)
+        if value is None:
+            value = compute(data)
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -1,6 +1,8 @@
 import sys
 import os
+import numpy as np
 from backend.app.core.config import settings
+from backend.app.services.prediction_cache import QuantizedLRUCache
 
 # --- CRITICAL: Add the ML folder to the system path ---
 # This allows your scripts to say "from features import..." without crashing
@@ -8,27 +10,109 @@ sys.path.append(str(settings.ML_DIR / "route_risk"))
 
 # --- Imports from YOUR existing files ---
 try:
-    from inference.predict_route_risk import predict_route_risk
-    from inference.risk_reasoning import get_top_risk_reasons
+    from inference.predict_route_risk import score_route, predict_route_risk_batch
+    from features.feature_utils import REQUIRED_FEATURES, feature_array_from_records
+    from inference import model_registry
     print("✅ Route Risk modules loaded successfully")
 except ImportError as e:
     print(f"❌ Error importing Route Risk modules: {e}")
     # We don't crash here, but the API will fail if called
 
 class RiskService:
+    def __init__(self):
+        # Memo layer in front of predict(); None when disabled
+        self.cache = self._new_cache()
+
+    @staticmethod
+    def _new_cache():
+        if settings.ROUTE_CACHE_SIZE <= 0:
+            return None
+        return QuantizedLRUCache(
+            settings.ROUTE_CACHE_RESOLUTIONS,
+            maxsize=settings.ROUTE_CACHE_SIZE,
+            ttl_seconds=settings.ROUTE_CACHE_TTL_SECONDS
+        )
+
+    def load_model(self):
+        """Loads the route risk model into the shared registry"""
+        self.activate(self.build_bundle(str(settings.ROUTE_MODEL_PATH)))
+
+    def build_bundle(self, model_path: str, version: str = "default"):
+        """Loads a model version without serving it yet"""
+        return model_registry.build_bundle(model_path, prefer_arrays=settings.USE_ARRAY_ARTIFACTS, version=version)
+
+    def active_bundle(self):
+        return model_registry.get_bundle()
+
+    def activate(self, bundle):
+        """
+        Atomically swaps the served model and returns the previous one.
+        The cache is replaced *after* the swap, so anything computed by
+        the old version can only land in the discarded cache.
+        """
+        previous = model_registry.activate(bundle)
+        self.cache = self._new_cache()
+        return previous
+
+    def predict_labels(self, rows: list[dict], bundle=None) -> list[str]:
+        """Uncached labels for many rows, e.g. to validate a model version"""
+        return predict_route_risk_batch(feature_array_from_records(rows), top_k=1, bundle=bundle)["risk_labels"]
+
     def predict(self, data: dict):
-        # 1. Use YOUR existing function to get the prediction
-        # (It handles model loading internally)
-        prediction = predict_route_risk(data)
-        
-        # 2. Use YOUR existing function to get the reasons
-        reasons = get_top_risk_reasons(data)
-
-        # 3. Combine them for the API response
-        return {
-            "risk_label": prediction["risk_label"],
-            "risk_probabilities": prediction["risk_probabilities"],
-            "reasons": reasons
-        }
+        # Fused scoring: label, probabilities and reasons from one forward pass
+        # (It reads the model from the shared registry)
+        cache = self.cache
+        if cache:
+            return cache.get_or_compute(data, score_route)
+        return score_route(data)
+
+    def predict_batch(self, rows: list[dict]):
+        if not rows:
+            return []
+
+        cache = self.cache
+        results = [None] * len(rows)
+        keys = [None] * len(rows)
+        if cache:
+            for i, row in enumerate(rows):
+                keys[i] = cache.make_key(row)
+                results[i] = cache.get(keys[i])
+
+        # One NumPy matrix for all cache misses, scored in a single vectorized pass
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            batch = predict_route_risk_batch(feature_array_from_records([rows[i] for i in pending]))
+            classes = batch["classes"]
+
+            for i, label, probs, reasons in zip(
+                pending, batch["risk_labels"], batch["risk_probabilities"], batch["reasons"]
+            ):
+                results[i] = {
+                    "risk_label": label,
+                    "risk_probabilities": dict(zip(classes, map(float, probs))),
+                    "reasons": reasons
+                }
+                if cache:
+                    cache.put(keys[i], results[i])
+
+        return results
+
+    def score_broadcast(self, rows: list[dict], shared: dict, top_k: int = 3) -> dict:
+        """
+        Vectorized scoring where some features are the same for every row
+        (e.g. one worker's fatigue across many candidate routes). Values in
+        `shared` are broadcast into their columns; the rest come from rows.
+        Returns the raw predict_route_risk_batch() output (no cache).
+        """
+        X = np.empty((len(rows), len(REQUIRED_FEATURES)), dtype=np.float64)
+        for j, feature in enumerate(REQUIRED_FEATURES):
+            if feature in shared:
+                X[:, j] = shared[feature]
+            else:
+                X[:, j] = [row[feature] for row in rows]
+        return predict_route_risk_batch(X, top_k=top_k)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache else {"enabled": False}
 
 risk_service = RiskService()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import numpy as np
+from backend.app.services.fatigue_service import fatigue_service
+from backend.app.services.risk_service import risk_service
+
+# Expected fatigue level on the route model's 1–5 fatigue_score scale
+FATIGUE_SCORE_LEVELS = {"Low": 1.0, "Medium": 3.0, "High": 5.0}
+
+
+def fatigue_score_from_probabilities(probabilities: dict[str, float]) -> float:
+    """
+    Maps fatigue class probabilities to the route model's fatigue_score:
+    1 + 2 * (P(Medium) + 2 * P(High)), i.e. Low=1, Medium=3, High=5.
+    """
+    return sum(FATIGUE_SCORE_LEVELS[label] * p for label, p in probabilities.items())
+
+
+def rank_routes_for_worker(worker: dict, routes: list[dict]) -> dict:
+    """
+    Scores the worker's fatigue once, broadcasts it (with their shift length)
+    into one vectorized route risk pass over all candidate routes, and returns
+    the routes ranked safest first (lowest P(High)).
+
+    A route without its own weather_stress_index uses the worker's.
+    """
+    fatigue = fatigue_service.predict_batch([worker])[0]
+    fatigue_score = fatigue_score_from_probabilities(fatigue["risk_probabilities"])
+
+    if not routes:
+        return {"fatigue": fatigue, "fatigue_score": fatigue_score, "routes": []}
+
+    rows = [
+        route if route.get("weather_stress_index") is not None
+        else {**route, "weather_stress_index": worker["weather_stress_index"]}
+        for route in routes
+    ]
+    batch = risk_service.score_broadcast(
+        rows,
+        shared={"fatigue_score": fatigue_score, "shift_duration_hours": worker["shift_duration_hours"]}
+    )
+
+    classes = batch["classes"]
+    route_probs = batch["risk_probabilities"]
+    order = np.argsort(route_probs[:, classes.index("High")], kind="stable")
+
+    ranked = [
+        {
+            "rank": rank,
+            "index": i,
+            "route_id": routes[i].get("route_id"),
+            "risk_label": batch["risk_labels"][i],
+            "risk_probabilities": dict(zip(classes, route_probs[i].tolist())),
+            "reasons": batch["reasons"][i]
+        }
+        for rank, i in enumerate(order.tolist(), 1)
+    ]
+    return {"fatigue": fatigue, "fatigue_score": fatigue_score, "routes": ranked}
@@ -0,0 +1,229 @@
+"""
+Micro-benchmarks for the route risk and fatigue inference hot paths.
+
+For every target and batch size this reports p50/p95/p99 latency, rows/sec
+and peak Python allocation, and can save the results as a JSON baseline or
+compare against a previous one (non-zero exit on regression).
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_inference
+    python -m backend.benchmarks.bench_inference --sizes 1 10 100 --save
+    python -m backend.benchmarks.bench_inference --compare
+
+Per-row targets are called once per row, so their percentiles are per-call
+latency. Batch targets are called once per batch, so their percentiles are
+per-batch latency over --repeats runs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(BASE_DIR / "backend" / "ml" / "route_risk"))
+
+from features.feature_utils import REQUIRED_FEATURES  # noqa: E402
+from inference.model_registry import load_model  # noqa: E402
+from inference.predict_route_risk import predict_route_risk, predict_route_risk_batch  # noqa: E402
+from inference.risk_reasoning import get_top_risk_reasons  # noqa: E402
+from backend.app.services.fatigue_service import FatigueService  # noqa: E402
+from backend.ml.fatigue_model.inference import predict_workload_risk  # noqa: E402
+
+ROUTE_DATA_PATH = BASE_DIR / "backend" / "ml" / "route_risk" / "data" / "route_risk_expanded_10k.csv"
+FATIGUE_DATA_PATH = BASE_DIR / "backend" / "ml" / "fatigue_model" / "data" / "base_data_expanded.csv"
+FATIGUE_FEATURES = [
+    "shift_duration_hours",
+    "consecutive_work_days",
+    "night_work_fraction",
+    "weather_stress_index",
+    "self_reported_tiredness"
+]
+
+DEFAULT_SIZES = [1, 10, 100, 10_000, 100_000]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "inference.json"
+
+# Peak allocation is traced on at most this many rows per target,
+# since tracemalloc slows per-row calls down considerably
+MAX_TRACED_ROWS = 10_000
+
+
+def _sample_rows(path: Path, features: list[str], n: int) -> list[dict]:
+    """Real rows from the training data, cycled up to n."""
+    df = pd.read_csv(path)[features]
+    records = df.to_dict("records")
+    return [records[i % len(records)] for i in range(n)]
+
+
+def _per_row(fn):
+    def run(rows):
+        timings = np.empty(len(rows))
+        for i, row in enumerate(rows):
+            start = time.perf_counter()
+            fn(row)
+            timings[i] = time.perf_counter() - start
+        return timings
+    return run
+
+
+def _batched(fn, to_batch):
+    def run(rows):
+        batch = to_batch(rows)
+        start = time.perf_counter()
+        fn(batch)
+        return np.array([time.perf_counter() - start])
+    return run
+
+
+def build_targets():
+    load_model()
+    fatigue_service = FatigueService()
+    fatigue_service.load_model()
+
+    def route_matrix(rows):
+        return np.array([[r[f] for f in REQUIRED_FEATURES] for r in rows], dtype=float)
+
+    return {
+        "predict_route_risk": ("route", _per_row(predict_route_risk)),
+        "predict_route_risk_batch": ("route", _batched(predict_route_risk_batch, route_matrix)),
+        "get_top_risk_reasons": ("route", _per_row(get_top_risk_reasons)),
+        "FatigueService.predict": ("fatigue", _per_row(fatigue_service.predict)),
+        "FatigueService.predict_batch": ("fatigue", _batched(fatigue_service.predict_batch, list)),
+        "predict_workload_risk": ("fatigue", _per_row(predict_workload_risk)),
+    }
+
+
+def _peak_alloc_bytes(run, rows) -> int:
+    tracemalloc.start()
+    try:
+        run(rows[:MAX_TRACED_ROWS])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench(targets, sizes, repeats: int) -> dict:
+    max_size = max(sizes)
+    inputs = {
+        "route": _sample_rows(ROUTE_DATA_PATH, REQUIRED_FEATURES, max_size),
+        "fatigue": _sample_rows(FATIGUE_DATA_PATH, FATIGUE_FEATURES, max_size),
+    }
+
+    results = {}
+    for name, (kind, run) in targets.items():
+        run(inputs[kind][:10])  # warm-up
+
+        for size in sizes:
+            rows = inputs[kind][:size]
+            timings, wall = [], []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                timings.append(run(rows))
+                wall.append(time.perf_counter() - start)
+            timings = np.concatenate(timings)
+
+            key = f"{name}@{size}"
+            results[key] = {
+                "target": name,
+                "batch_size": size,
+                "p50_ms": float(np.percentile(timings, 50) * 1000),
+                "p95_ms": float(np.percentile(timings, 95) * 1000),
+                "p99_ms": float(np.percentile(timings, 99) * 1000),
+                "rows_per_sec": float(size / np.median(wall)),
+                "peak_alloc_kib": _peak_alloc_bytes(run, rows) / 1024,
+            }
+            _print_row(key, results[key])
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Flags any metric that is more than `tolerance` (fraction) worse than
+    the baseline. Latencies may not grow; throughput may not shrink.
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {base[metric]:.4f} -> {current[metric]:.4f}")
+        if current["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{key} rows_per_sec: {base['rows_per_sec']:.0f} -> {current['rows_per_sec']:.0f}"
+            )
+    return regressions
+
+
+def _environment() -> dict:
+    import sklearn
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit_learn": sklearn.__version__,
+    }
+
+
+def _print_row(key: str, r: dict) -> None:
+    print(
+        f"{key:<36} p50 {r['p50_ms']:>9.4f} ms  p95 {r['p95_ms']:>9.4f} ms  "
+        f"p99 {r['p99_ms']:>9.4f} ms  {r['rows_per_sec']:>12,.0f} rows/s  "
+        f"peak {r['peak_alloc_kib']:>10,.1f} KiB"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--targets", nargs="+", help="Subset of targets to run (default: all)")
+    parser.add_argument("--save", nargs="?", const=str(DEFAULT_BASELINE), help="Write results as a JSON baseline")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown fraction (default 0.25)")
+    args = parser.parse_args(argv)
+
+    targets = build_targets()
+    if args.targets:
+        unknown = set(args.targets) - set(targets)
+        if unknown:
+            parser.error(f"Unknown targets: {sorted(unknown)}; choose from {sorted(targets)}")
+        targets = {name: targets[name] for name in args.targets}
+
+    results = bench(targets, sorted(args.sizes), args.repeats)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"environment": _environment(), "results": results}, f, indent=2)
+        print(f"\nBaseline saved to: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print("   " + line)
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
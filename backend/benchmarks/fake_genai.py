@@ -0,0 +1,126 @@
+"""
+Offline stand-in for the parts of google.generativeai the incident
+pipeline uses (configure, upload_file, GenerativeModel.generate_content,
+types.HarmCategory/HarmBlockThreshold), with configurable latency and
+failure injection.
+
+Enable it in the server with
+    GENAI_MODULE=backend.benchmarks.fake_genai GOOGLE_API_KEY=fake
+
+Latency and faults come from the environment, as FaultProfile specs
+(see backend/benchmarks/fake_upstreams.py):
+    FAKE_GEMINI_UPLOAD="latency=600,jitter=300"
+    FAKE_GEMINI_GENERATE="latency=2000,jitter=1000,errors=0.05"
+
+Like the real SDK these calls block the calling thread, so a load test
+sees the same event-loop behaviour as production.
+"""
+
+import enum
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+from backend.benchmarks.fake_upstreams import FaultProfile
+
+DEFAULT_UPLOAD = FaultProfile(latency_ms=600, jitter_ms=300)
+DEFAULT_GENERATE = FaultProfile(latency_ms=2000, jitter_ms=1000)
+
+_rng = random.Random()
+_rng_lock = threading.Lock()
+
+upload_profile = FaultProfile.parse(os.getenv("FAKE_GEMINI_UPLOAD"), DEFAULT_UPLOAD)
+generate_profile = FaultProfile.parse(os.getenv("FAKE_GEMINI_GENERATE"), DEFAULT_GENERATE)
+
+
+class InjectedFailure(RuntimeError):
+    pass
+
+
+class HarmCategory(enum.IntEnum):
+    HARM_CATEGORY_HARASSMENT = 7
+    HARM_CATEGORY_HATE_SPEECH = 8
+    HARM_CATEGORY_SEXUALLY_EXPLICIT = 9
+    HARM_CATEGORY_DANGEROUS_CONTENT = 10
+
+
+class HarmBlockThreshold(enum.IntEnum):
+    BLOCK_LOW_AND_ABOVE = 1
+    BLOCK_MEDIUM_AND_ABOVE = 2
+    BLOCK_ONLY_HIGH = 3
+    BLOCK_NONE = 4
+
+
+# Mirrors google.generativeai.types for the safety settings
+types = SimpleNamespace(HarmCategory=HarmCategory, HarmBlockThreshold=HarmBlockThreshold)
+
+
+def _simulate(name: str, profile: FaultProfile):
+    with _rng_lock:
+        outcome = profile.outcome(_rng)
+        delay = profile.delay(_rng)
+    if outcome == "timeout":
+        time.sleep(profile.timeout_s)
+        raise TimeoutError(f"fake {name}: injected timeout")
+    time.sleep(delay)
+    if outcome == "error":
+        raise InjectedFailure(f"fake {name}: injected {profile.error_status} error")
+
+
+def configure(api_key: str | None = None, **kwargs):
+    pass
+
+
+class _File:
+    def __init__(self, path: str):
+        self.name = f"files/fake-{uuid.uuid4().hex[:12]}"
+        self.display_name = os.path.basename(path)
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def upload_file(path, **kwargs) -> _File:
+    _simulate("upload_file", upload_profile)
+    return _File(str(path))
+
+
+_TRANSCRIPT = {
+    "transcription": "A car hit my bike near the market crossing. My leg is hurt but I can walk.",
+    "category": "Accident",
+    "title": "Minor Bike Collision",
+    "severity": "medium",
+    "summary": "Bike hit by a car near the market crossing.",
+}
+
+
+class GenerativeModel:
+    def __init__(self, model_name: str = "gemini-flash-latest", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, generation_config=None, safety_settings=None, **kwargs) -> _Response:
+        _simulate("generate_content", generate_profile)
+
+        if isinstance(contents, list):
+            # [uploaded audio, prompt]: transcription + classification
+            return _Response(json.dumps(_TRANSCRIPT))
+
+        return _Response(json.dumps({
+            "meta": {"report_id": f"INC_{uuid.uuid4().hex[:8]}", "report_type": "Automated Field Report"},
+            "title": _TRANSCRIPT["title"],
+            "summary": _TRANSCRIPT["summary"],
+            "severity": "Medium",
+            "category": _TRANSCRIPT["category"],
+            "narrative": {
+                "objective_summary": _TRANSCRIPT["transcription"],
+                "chronological_timeline": ["Rider stopped at crossing", "Car struck the bike"],
+            },
+            "entities": {"vehicles": ["car", "bike"], "people": ["rider", "driver"]},
+            "location_context": {"transcript_mentioned_location": "market crossing"},
+        }))
@@ -0,0 +1,220 @@
+"""
+Local stand-ins for the Overpass and Nominatim APIs used by the SOS flow,
+with configurable latency and failure injection, for offline load tests.
+
+One server answers both:
+    POST /api/interpreter   Overpass (synthetic POIs around the queried point)
+    GET  /reverse           Nominatim reverse geocoding
+    GET  /stats             calls and injected faults so far
+
+Point the backend at it with
+    OVERPASS_URL=http://127.0.0.1:8900/api/interpreter
+    NOMINATIM_URL=http://127.0.0.1:8900/reverse
+
+Run from the repository root:
+    python -m backend.benchmarks.fake_upstreams --port 8900
+    python -m backend.benchmarks.fake_upstreams --overpass "latency=2000,jitter=1500,errors=0.1,status=429"
+
+Fault profiles are comma-separated key=value specs (see FaultProfile):
+latency and jitter in ms (jitter is exponential, so it produces a tail),
+errors/timeouts as fractions of calls, status for injected errors.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import re
+import zlib
+from collections import Counter
+from typing import NamedTuple
+
+from fastapi import FastAPI, Form, Query
+from fastapi.responses import JSONResponse
+
+
+_SPEC_KEYS = {
+    "latency": "latency_ms",
+    "jitter": "jitter_ms",
+    "errors": "error_rate",
+    "status": "error_status",
+    "timeouts": "timeout_rate",
+    "hang": "timeout_s",
+}
+
+
+class FaultProfile(NamedTuple):
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    timeout_rate: float = 0.0
+    timeout_s: float = 30.0  # how long an injected timeout hangs before giving up
+
+    @classmethod
+    def parse(cls, spec: str | None, default: "FaultProfile | None" = None) -> "FaultProfile":
+        """'latency=800,jitter=200,errors=0.05,status=429,timeouts=0.01,hang=30'"""
+        profile = default or cls()
+        if not spec:
+            return profile
+        updates = {}
+        for part in spec.split(","):
+            key, _, value = part.partition("=")
+            field = _SPEC_KEYS.get(key.strip())
+            if field is None or not value:
+                raise ValueError(f"Bad fault spec '{part}', expected one of {sorted(_SPEC_KEYS)}=<value>")
+            updates[field] = cls.__annotations__[field](float(value))
+        return profile._replace(**updates)
+
+    def outcome(self, rng: random.Random) -> str:
+        """'ok', 'error' or 'timeout' for one call."""
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return "timeout"
+        if roll < self.timeout_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+    def delay(self, rng: random.Random) -> float:
+        """Seconds to wait before answering."""
+        jitter = rng.expovariate(1 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+
+DEFAULT_OVERPASS = FaultProfile(latency_ms=700, jitter_ms=500)
+DEFAULT_NOMINATIM = FaultProfile(latency_ms=120, jitter_ms=80)
+
+_AROUND = re.compile(r"\[(\w+)=(\w+)\]\(around:(\d+),([-\d.]+),([-\d.]+)\)")
+
+
+def synthetic_pois(tag_key: str, tag_value: str, radius_m: int, lat: float, lon: float, count: int) -> list[dict]:
+    """
+    Overpass-shaped elements (mix of nodes and ways with a center) within
+    radius_m of (lat, lon). Seeded by the query, so repeated queries for
+    the same place return the same POIs.
+    """
+    rng = random.Random(f"{tag_key}={tag_value}:{radius_m}:{lat:.3f}:{lon:.3f}")
+    # Distinct ids per tag, so union responses do not repeat an id
+    first_id = zlib.crc32(f"{tag_key}={tag_value}".encode()) * 1000
+    elements = []
+    for i in range(count):
+        # ~111 km per degree; good enough for synthetic data
+        distance = radius_m * math.sqrt(rng.random()) / 111_000
+        angle = rng.uniform(0, 2 * math.pi)
+        p_lat = lat + distance * math.cos(angle)
+        p_lon = lon + distance * math.sin(angle)
+        tags = {
+            tag_key: tag_value,
+            "name": f"Synthetic {tag_value.capitalize()} {i + 1}",
+            "addr:street": f"{rng.randint(1, 200)} Test Road",
+            "addr:city": "Loadtest City",
+        }
+        if rng.random() < 0.6:
+            tags["phone"] = f"+91 {rng.randint(7000000000, 9999999999)}"
+
+        if i % 3:
+            elements.append({"type": "node", "id": first_id + i, "lat": p_lat, "lon": p_lon, "tags": tags})
+        else:
+            elements.append({"type": "way", "id": first_id + i, "center": {"lat": p_lat, "lon": p_lon}, "tags": tags})
+    return elements
+
+
+def create_app(
+    overpass: FaultProfile = DEFAULT_OVERPASS,
+    nominatim: FaultProfile = DEFAULT_NOMINATIM,
+    pois: int = 20,
+    seed: int | None = None
+) -> FastAPI:
+    app = FastAPI(title="Fake Overpass + Nominatim")
+    rng = random.Random(seed)
+    stats = Counter()
+
+    async def inject(name: str, profile: FaultProfile):
+        """Returns an error response to send instead of data, or None."""
+        outcome = profile.outcome(rng)
+        stats[f"{name}_{outcome}"] += 1
+        if outcome == "timeout":
+            await asyncio.sleep(profile.timeout_s)
+            return JSONResponse({"error": "injected timeout"}, status_code=504)
+        await asyncio.sleep(profile.delay(rng))
+        if outcome == "error":
+            return JSONResponse({"error": "injected failure"}, status_code=profile.error_status)
+        return None
+
+    @app.post("/api/interpreter")
+    async def overpass_interpreter(data: str = Form(...)):
+        failure = await inject("overpass", overpass)
+        if failure is not None:
+            return failure
+
+        # node[...] and way[...] repeat each clause; union queries have one per tag
+        clauses = dict.fromkeys(match.groups() for match in _AROUND.finditer(data))
+        if not clauses:
+            return JSONResponse({"error": "unsupported query"}, status_code=400)
+        elements = []
+        for key, value, radius, lat, lon in clauses:
+            elements += synthetic_pois(key, value, int(radius), float(lat), float(lon), pois)
+        return {"elements": elements}
+
+    @app.get("/reverse")
+    async def nominatim_reverse(lat: float = Query(...), lon: float = Query(...)):
+        failure = await inject("nominatim", nominatim)
+        if failure is not None:
+            return failure
+        return {
+            "lat": str(lat),
+            "lon": str(lon),
+            "display_name": f"{int(abs(lat * 1000)) % 200 + 1} Test Road, Loadtest City, {lat:.4f}, {lon:.4f}",
+        }
+
+    @app.get("/stats")
+    async def upstream_stats():
+        return dict(stats)
+
+    return app
+
+
+async def serve_in_background(app, host: str = "127.0.0.1", port: int = 8900):
+    """
+    Starts uvicorn for `app` on the running loop.
+    Returns the server; stop it with `server.should_exit = True`.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()  # raises e.g. "address already in use"
+        await asyncio.sleep(0.01)
+    server.task = task
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--overpass", help=f"Overpass fault profile (default: {DEFAULT_OVERPASS})")
+    parser.add_argument("--nominatim", help=f"Nominatim fault profile (default: {DEFAULT_NOMINATIM})")
+    parser.add_argument("--pois", type=int, default=20, help="POIs returned per Overpass query")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    app = create_app(
+        FaultProfile.parse(args.overpass, DEFAULT_OVERPASS),
+        FaultProfile.parse(args.nominatim, DEFAULT_NOMINATIM),
+        pois=args.pois,
+        seed=args.seed
+    )
+    print(f"🧪 Fake upstreams on http://{args.host}:{args.port}")
+    print(f"   OVERPASS_URL=http://{args.host}:{args.port}/api/interpreter")
+    print(f"   NOMINATIM_URL=http://{args.host}:{args.port}/reverse")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,320 @@
+"""
+Offline load test for the unified API: SOS, route risk, fatigue and
+incident reports at a target request rate, against local stand-ins for
+Overpass, Nominatim and Gemini (fake_upstreams.py, fake_genai.py).
+
+Arrivals are open-loop: requests are sent on a fixed schedule whether or
+not earlier ones have finished, and latency is measured from the time a
+request was *due*, so a saturated server shows up as growing latency
+instead of a silently lower send rate. Each --rps level runs for
+--duration seconds; the table shows where throughput stops tracking the
+offered rate and tail latency takes off.
+
+Run from the repository root:
+
+    # In-process (app, fakes and load generator share one process/CPU)
+    python -m backend.benchmarks.load_test --rps 20 50 100 --duration 15
+
+    # Against a real server (numbers not skewed by the generator):
+    python -m backend.benchmarks.fake_upstreams --port 8900 &
+    OVERPASS_URL=http://127.0.0.1:8900/api/interpreter \\
+    NOMINATIM_URL=http://127.0.0.1:8900/reverse \\
+    GENAI_MODULE=backend.benchmarks.fake_genai GOOGLE_API_KEY=fake \\
+    INCIDENT_DATA_DIR=/tmp/gigguard-loadtest \\
+        uvicorn backend.app.main:app --port 8000 &
+    python -m backend.benchmarks.load_test --target http://127.0.0.1:8000 --rps 50 100 200
+
+--mix sets the relative weight of each endpoint, e.g.
+"sos=1,route=20,fatigue=20,incident=0.1" (the default).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+ROUTE_DATA_PATH = BASE_DIR / "backend" / "ml" / "route_risk" / "data" / "route_risk_expanded_10k.csv"
+FATIGUE_DATA_PATH = BASE_DIR / "backend" / "ml" / "fatigue_model" / "data" / "base_data_expanded.csv"
+ROUTE_FEATURES = [
+    "route_distance_km",
+    "route_duration_min",
+    "intersection_density",
+    "is_night",
+    "weather_stress_index",
+    "fatigue_score",
+    "shift_duration_hours"
+]
+FATIGUE_FEATURES = [
+    "shift_duration_hours",
+    "consecutive_work_days",
+    "night_work_fraction",
+    "weather_stress_index",
+    "self_reported_tiredness"
+]
+INT_FEATURES = {"is_night", "consecutive_work_days", "self_reported_tiredness"}
+
+# SOS locations are sampled around these (lat, lon) centers
+SOS_CENTERS = [(28.6139, 77.2090), (12.9716, 77.5946), (28.9845, 79.4137)]
+
+DEFAULT_MIX = "sos=1,route=20,fatigue=20,incident=0.1"
+FAKE_AUDIO = b"\x00" * 16_000  # content is never decoded by the fake Gemini
+
+
+def _sample_rows(path: Path, features: list[str], n: int = 2000) -> list[dict]:
+    """Real rows from the training data (first n)."""
+    rows = []
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            rows.append({
+                name: int(float(record[name])) if name in INT_FEATURES else float(record[name])
+                for name in features
+            })
+            if len(rows) >= n:
+                break
+    return rows
+
+
+class Workload:
+    """Builds request kwargs for each endpoint."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.routes = _sample_rows(ROUTE_DATA_PATH, ROUTE_FEATURES)
+        self.workers = _sample_rows(FATIGUE_DATA_PATH, FATIGUE_FEATURES)
+
+    def sos(self) -> dict:
+        lat, lon = self.rng.choice(SOS_CENTERS)
+        return {"json": {
+            "worker_id": f"loadtest-{self.rng.randrange(10_000)}",
+            "latitude": lat + self.rng.uniform(-0.05, 0.05),
+            "longitude": lon + self.rng.uniform(-0.05, 0.05),
+            "emergency_type": "general",
+        }}
+
+    def route(self) -> dict:
+        return {"json": self.rng.choice(self.routes)}
+
+    def fatigue(self) -> dict:
+        return {"json": self.rng.choice(self.workers)}
+
+    def incident(self) -> dict:
+        lat, lon = self.rng.choice(SOS_CENTERS)
+        return {
+            "files": {"file": ("loadtest.m4a", FAKE_AUDIO, "audio/mp4")},
+            "data": {
+                "gps_coords": f"{lat:.4f}, {lon:.4f}",
+                "user_id": "loadtest_user",
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        }
+
+
+ENDPOINTS = {
+    "sos": "/api/sos/trigger",
+    "route": "/predict/route",
+    "fatigue": "/predict/fatigue",
+    "incident": "/api/incident/report",
+}
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS or not weight:
+            raise ValueError(f"Bad mix entry '{part}', expected <{'|'.join(ENDPOINTS)}>=<weight>")
+        if float(weight) > 0:
+            mix[name] = float(weight)
+    if not mix:
+        raise ValueError("Mix has no endpoint with a positive weight")
+    return mix
+
+
+class _Tally:
+    def __init__(self):
+        self.latencies = []  # seconds, for every completed request
+        self.statuses = Counter()
+        self.exceptions = Counter()
+        self.dropped = 0
+
+    def summary(self, elapsed: float) -> dict:
+        ok = sum(n for status, n in self.statuses.items() if 200 <= status < 300)
+        lat_ms = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        sent = len(self.latencies) + sum(self.exceptions.values())
+        return {
+            "sent": sent,
+            "ok": ok,
+            "http_errors": {str(s): n for s, n in sorted(self.statuses.items()) if not 200 <= s < 300},
+            "exceptions": dict(self.exceptions),
+            "dropped": self.dropped,
+            "throughput_rps": ok / elapsed,
+            "error_rate": (sent - ok) / sent if sent else 0.0,
+            "p50_ms": float(np.percentile(lat_ms, 50)),
+            "p90_ms": float(np.percentile(lat_ms, 90)),
+            "p99_ms": float(np.percentile(lat_ms, 99)),
+            "max_ms": float(lat_ms.max()),
+        }
+
+
+async def run_level(client, workload: Workload, rps: float, duration: float, mix: dict,
+                    max_in_flight: int, rng: random.Random) -> dict:
+    """Offers `rps` requests/sec for `duration` seconds, then waits for stragglers."""
+    loop = asyncio.get_running_loop()
+    names, weights = list(mix), list(mix.values())
+    tallies = {name: _Tally() for name in names}
+    in_flight = set()
+
+    async def one(name: str, due: float):
+        tally = tallies[name]
+        try:
+            response = await client.post(ENDPOINTS[name], **getattr(workload, name)())
+            tally.statuses[response.status_code] += 1
+            tally.latencies.append(loop.time() - due)
+        except Exception as e:
+            tally.exceptions[type(e).__name__] += 1
+
+    start = loop.time()
+    for i in range(int(rps * duration)):
+        due = start + i / rps
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        name = rng.choices(names, weights)[0]
+        if len(in_flight) >= max_in_flight:
+            tallies[name].dropped += 1
+            continue
+        task = asyncio.create_task(one(name, due))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    elapsed = loop.time() - start
+
+    endpoints = {name: tally.summary(elapsed) for name, tally in tallies.items()}
+    total = _Tally()
+    for tally in tallies.values():
+        total.latencies += tally.latencies
+        total.statuses.update(tally.statuses)
+        total.exceptions.update(tally.exceptions)
+        total.dropped += tally.dropped
+    return {"offered_rps": rps, "elapsed_s": elapsed, "total": total.summary(elapsed), "endpoints": endpoints}
+
+
+def _print_level(level: dict, slo_p99_ms: float) -> None:
+    print(f"\n=== offered {level['offered_rps']:g} req/s ({level['elapsed_s']:.1f} s incl. drain) ===")
+    rows = [("TOTAL", level["total"])] + sorted(level["endpoints"].items())
+    for name, r in rows:
+        failures = {**r["http_errors"], **r["exceptions"]}
+        print(
+            f"{name:<10} {r['sent']:>7} sent  {r['throughput_rps']:>8.1f} ok/s  err {r['error_rate']:>6.1%}  "
+            f"p50 {r['p50_ms']:>8.1f} ms  p90 {r['p90_ms']:>8.1f} ms  p99 {r['p99_ms']:>8.1f} ms  "
+            f"max {r['max_ms']:>8.1f} ms  dropped {r['dropped']}"
+            + (f"  {failures}" if failures else "")
+        )
+    if level["total"]["p99_ms"] > slo_p99_ms:
+        print(f"⚠️ p99 {level['total']['p99_ms']:.0f} ms is over the {slo_p99_ms:g} ms SLO: past capacity")
+
+
+async def _run(args, mix: dict) -> list[dict]:
+    import httpx
+
+    rng = random.Random(args.seed)
+    workload = Workload(rng)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    results = []
+
+    if args.target:
+        async with httpx.AsyncClient(base_url=args.target, timeout=timeout, limits=limits) as client:
+            for rps in args.rps:
+                results.append(await run_level(client, workload, rps, args.duration, mix, args.max_in_flight, rng))
+                _print_level(results[-1], args.slo_p99_ms)
+        return results
+
+    # In-process: start the fakes, point the app at them, then import it
+    from backend.benchmarks.fake_upstreams import (
+        DEFAULT_NOMINATIM, DEFAULT_OVERPASS, FaultProfile, create_app, serve_in_background
+    )
+
+    fakes = await serve_in_background(create_app(
+        FaultProfile.parse(args.overpass, DEFAULT_OVERPASS),
+        FaultProfile.parse(args.nominatim, DEFAULT_NOMINATIM),
+        seed=args.seed
+    ), port=args.upstream_port)
+    upstream = f"http://127.0.0.1:{args.upstream_port}"
+    os.environ.update({
+        "OVERPASS_URL": f"{upstream}/api/interpreter",
+        "NOMINATIM_URL": f"{upstream}/reverse",
+        "GENAI_MODULE": "backend.benchmarks.fake_genai",
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY") or "fake",
+    })
+    if args.gemini_upload:
+        os.environ["FAKE_GEMINI_UPLOAD"] = args.gemini_upload
+    if args.gemini_generate:
+        os.environ["FAKE_GEMINI_GENERATE"] = args.gemini_generate
+    os.environ.setdefault("INCIDENT_DATA_DIR", tempfile.mkdtemp(prefix="gigguard-loadtest-"))
+
+    from backend.app.main import app
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+                for rps in args.rps:
+                    results.append(await run_level(client, workload, rps, args.duration, mix, args.max_in_flight, rng))
+                    _print_level(results[-1], args.slo_p99_ms)
+    finally:
+        fakes.should_exit = True
+        await fakes.task
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--rps", type=float, nargs="+", default=[10, 25, 50], help="Offered load levels, req/s")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per load level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--max-in-flight", type=int, default=2000, help="Requests over this are dropped and counted")
+    parser.add_argument("--timeout", type=float, default=30, help="Client timeout per request, seconds")
+    parser.add_argument("--slo-p99-ms", type=float, default=1000, help="Flags levels whose p99 is above this")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    fakes = parser.add_argument_group("in-process fakes (ignored with --target)")
+    fakes.add_argument("--upstream-port", type=int, default=8900)
+    fakes.add_argument("--overpass", help="Overpass fault profile, e.g. 'latency=700,jitter=500,errors=0.05'")
+    fakes.add_argument("--nominatim", help="Nominatim fault profile")
+    fakes.add_argument("--gemini-upload", help="Gemini upload fault profile")
+    fakes.add_argument("--gemini-generate", help="Gemini generate fault profile")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = asyncio.run(_run(args, mix))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "levels": results}, f, indent=2)
+        print(f"\nResults saved to: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
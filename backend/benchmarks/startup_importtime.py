@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for the unified API, based on `python -X importtime`.
+
+Imports backend.app.main in a fresh interpreter (optionally several times),
+reports the total import time and the slowest modules, and fails if any of
+the deferred heavy stacks (Gemini, python-docx, httpx, ...) got imported
+eagerly again or if the import exceeds --max-ms.
+
+Run from the repository root:
+    python -m backend.benchmarks.startup_importtime
+    python -m backend.benchmarks.startup_importtime --runs 5 --max-ms 1500
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+TARGET_MODULE = "backend.app.main"
+
+# Must only be imported on first use, never while importing the app
+DEFERRED_MODULES = [
+    "google.generativeai",
+    "docx",
+    "dotenv",
+    "httpx",
+    "nest_asyncio",
+    "uvicorn",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_once(module: str = TARGET_MODULE) -> list[dict]:
+    """
+    Imports `module` in a fresh interpreter and parses -X importtime output.
+    Returns one record per imported module (self/cumulative in microseconds).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    records = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return records
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=TARGET_MODULE)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import time exceeds this budget")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once(args.module) for _ in range(args.runs)]
+    totals_ms = [
+        next(r["cumulative_us"] for r in records if r["module"] == args.module) / 1000
+        for records in runs
+    ]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} run(s) "
+          f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f})\n")
+
+    print(f"Slowest top-level imports (cumulative, last run):")
+    top_level = sorted((r for r in runs[-1] if r["depth"] <= 1), key=lambda r: r["cumulative_us"], reverse=True)
+    for r in top_level[:args.top]:
+        print(f"  {r['cumulative_us'] / 1000:>9.1f} ms  {r['module']}")
+
+    failures = []
+    imported = {r["module"] for r in runs[-1]}
+    eager = [m for m in DEFERRED_MODULES if m in imported]
+    if eager:
+        failures.append(f"Deferred modules imported at startup: {eager}")
+    if args.max_ms is not None and median_ms > args.max_ms:
+        failures.append(f"Median import time {median_ms:.1f} ms exceeds budget {args.max_ms:.1f} ms")
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        return 1
+    print("\n✅ Heavy stacks deferred" + (f", within {args.max_ms:.0f} ms budget" if args.max_ms else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
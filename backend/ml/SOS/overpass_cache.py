@@ -0,0 +1,323 @@
+"""
+Cache of raw Overpass results per (tag, geohash cell, radius).
+
+Hospitals and police stations do not move, so results are kept for a long
+TTL and shared by every SOS from the same cell. Each entry is fetched around
+the cell *center* with the radius padded by the cell's half-diagonal. The
+padded circle contains the search circle of any point in the cell, so
+filtering the cached elements by distance from the actual worker position
+gives the same candidates as a direct query. Distances are always computed
+per request.
+
+Freshness:
+  age < ttl            fresh, served as is
+  ttl <= age < max_age stale, served immediately while one background
+                       refresh per key runs (stale-while-revalidate)
+  age >= max_age       treated as a miss
+
+Lookups take several tags at once, so the misses of one SOS (hospital,
+police, pharmacy, ...) are filled by a single multi-tag fetch. Failed
+fetches are never cached, a failed refresh keeps the stale entry, and a
+failed fetch only drops the tags it was fetching from a lookup.
+The cache is bounded (LRU) and persisted to a JSON file, so a restart
+starts warm.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            value = value * 2 + (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = value * 2 + (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_bounds(cell: str) -> tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in cell:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def _haversine_m(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def element_position(element: dict):
+    """(lat, lon) of an Overpass element (node, or way/relation with `out center`)."""
+    if "lat" in element:
+        return element["lat"], element["lon"]
+    if "center" in element:
+        return element["center"]["lat"], element["center"]["lon"]
+    return None
+
+
+def _within(elements: list, lat: float, lon: float, radius_m: float) -> list:
+    return [
+        el for el in elements
+        if (pos := element_position(el)) is not None and _haversine_m(lat, lon, *pos) <= radius_m
+    ]
+
+
+class OverpassCache:
+    def __init__(
+        self,
+        path: str | None = None,
+        precision: int = 5,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_age_seconds: float = 30 * 24 * 3600,
+        maxsize: int = 5000,
+        save_interval_seconds: float = 60.0,
+        clock=time.time
+    ):
+        self.path = path
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.maxsize = maxsize
+        self.save_interval_seconds = save_interval_seconds
+        self._clock = clock  # wall clock: timestamps are persisted
+
+        self._entries = OrderedDict()  # key -> (fetched_at, elements)
+        self._pending = {}  # key -> Task fetching it (misses and refreshes)
+        self._dirty = False
+        self._last_save = 0.0
+        self._saving = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failed_fetches = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cell_query(self, lat: float, lon: float, radius_m: float) -> tuple[str, float, float, float]:
+        """(cell, center_lat, center_lon, padded_radius_m) covering radius_m around any point of the cell."""
+        cell = geohash_encode(lat, lon, self.precision)
+        min_lat, min_lon, max_lat, max_lon = geohash_bounds(cell)
+        center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        # Half-diagonal: distance from the center to the farthest corner
+        pad = max(_haversine_m(center_lat, center_lon, la, lo) for la in (min_lat, max_lat) for lo in (min_lon, max_lon))
+        return cell, round(center_lat, 6), round(center_lon, 6), math.ceil(radius_m + pad)
+
+    async def get_many(self, tags, lat: float, lon: float, radius_m: int, fetch) -> dict:
+        """
+        tag -> elements within radius_m of (lat, lon), for every tag.
+
+        fetch(center_lat, center_lon, padded_radius_m, tags) -> {tag: elements}
+        fetches all the given tags in one go (e.g. one Overpass union query);
+        it must raise on failure, so failures are not cached. Tags that had
+        nothing usable cached and whose fetch failed are left out of the
+        result; the cached tags are still returned.
+        """
+        cell, center_lat, center_lon, padded = self.cell_query(lat, lon, radius_m)
+        radius_m = int(radius_m)
+        now = self._clock()
+
+        found, missing, stale = {}, [], []
+        for tag in tags:
+            key = (tag, cell, radius_m)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] >= self.max_age_seconds:
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                missing.append(tag)
+                continue
+            self._entries.move_to_end(key)
+            if now - entry[0] < self.ttl_seconds:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._pending:
+                    stale.append(tag)
+            found[tag] = entry[1]
+
+        if stale:
+            self.refreshes += len(stale)
+            self._start_fetch(stale, cell, radius_m, fetch, center_lat, center_lon, padded)
+
+        if missing:
+            # Concurrent misses share the fetch already in flight for their key
+            unfetched = [tag for tag in missing if (tag, cell, radius_m) not in self._pending]
+            if unfetched:
+                self._start_fetch(unfetched, cell, radius_m, fetch, center_lat, center_lon, padded)
+            waiting = {tag: self._pending[(tag, cell, radius_m)] for tag in missing}
+            failed = set()
+            for task in set(waiting.values()):
+                try:
+                    await asyncio.shield(task)
+                except Exception:
+                    failed.add(task)  # counted in failed_fetches by the task itself
+            for tag, task in waiting.items():
+                if task not in failed:
+                    found[tag] = task.result().get(tag, [])
+
+        return {tag: _within(found[tag], lat, lon, radius_m) for tag in tags if tag in found}
+
+    def peek(self, tags, lat: float, lon: float, radius_m: int) -> dict:
+        """
+        What get_many would answer from the cache right now (fresh or stale),
+        for the tags that have a usable entry. Never fetches; not counted.
+        """
+        cell = geohash_encode(lat, lon, self.precision)
+        now = self._clock()
+        found = {}
+        for tag in tags:
+            entry = self._entries.get((tag, cell, int(radius_m)))
+            if entry is not None and now - entry[0] < self.max_age_seconds:
+                found[tag] = _within(entry[1], lat, lon, radius_m)
+        return found
+
+    def _start_fetch(self, tags, cell, radius_m, fetch, center_lat, center_lon, padded):
+        """One fetch per key at a time, covering all the given tags."""
+        keys = [(tag, cell, radius_m) for tag in tags]
+
+        async def run():
+            try:
+                by_tag = await fetch(center_lat, center_lon, padded, list(tags))
+            except Exception:
+                self.failed_fetches += 1
+                raise
+            finally:
+                for key in keys:
+                    if self._pending.get(key) is task:
+                        del self._pending[key]
+            for key in keys:
+                self.put(key, by_tag.get(key[0], []))
+            return by_tag
+
+        task = asyncio.get_running_loop().create_task(run())
+        # A refresh nobody awaits must not log "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        for key in keys:
+            self._pending[key] = task
+        return task
+
+    def put(self, key, elements: list, fetched_at: float | None = None) -> None:
+        self._entries[key] = (self._clock() if fetched_at is None else fetched_at, elements)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._dirty = True
+        self._maybe_save()
+
+    # --- persistence ---
+
+    def load(self) -> int:
+        """Loads the persisted entries (skipping expired ones). Returns how many."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            data = json.load(f)
+
+        now = self._clock()
+        loaded = 0
+        for tag, cell, radius, fetched_at, elements in data.get("entries", []):
+            if len(cell) != self.precision or now - fetched_at >= self.max_age_seconds:
+                continue
+            self._entries[(tag, cell, radius)] = (fetched_at, elements)
+            loaded += 1
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return loaded
+
+    def _snapshot(self) -> dict:
+        return {
+            "version": 1,
+            "entries": [[tag, cell, radius, fetched_at, elements]
+                        for (tag, cell, radius), (fetched_at, elements) in self._entries.items()],
+        }
+
+    def save(self) -> None:
+        """Writes the cache to disk atomically (blocking)."""
+        if not self.path:
+            return
+        self._write(self._snapshot())
+        self._dirty = False
+        self._last_save = self._clock()
+
+    def _write(self, snapshot: dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def _maybe_save(self) -> None:
+        """Saves in a worker thread at most every save_interval_seconds."""
+        if not self.path or not self._dirty or (self._saving and not self._saving.done()):
+            return
+        if self._clock() - self._last_save < self.save_interval_seconds:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Snapshot on the loop thread; only the serialization runs off it
+        snapshot = self._snapshot()
+        self._dirty = False
+        self._last_save = self._clock()
+        self._saving = loop.run_in_executor(None, self._write, snapshot)
+
+    def stats(self) -> dict:
+        now = self._clock()
+        fresh = sum(1 for fetched_at, _ in self._entries.values() if now - fetched_at < self.ttl_seconds)
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "fresh_entries": fresh,
+            "stale_entries": len(self._entries) - fresh,
+            "maxsize": self.maxsize,
+            "geohash_precision": self.precision,
+            "ttl_seconds": self.ttl_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "failed_fetches": self.failed_fetches,
+            "evictions": self.evictions,
+            "in_flight": len(self._pending),
+            "path": self.path,
+        }
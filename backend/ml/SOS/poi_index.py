@@ -0,0 +1,339 @@
+"""
+In-memory spatial index of emergency POIs (hospitals, police, pharmacies)
+for the SOS nearest-place lookup, built from an OSM extract.
+
+The extract is loaded once at startup. Points go into a uniform lat/lon grid
+(one per tag), and k-nearest queries scan rings of cells outward from the
+query cell. They stop as soon as no unscanned cell can hold anything closer
+than the current k-th hit, so a lookup takes microseconds and touches only
+a few cells.
+
+The index is only trusted inside its coverage (the extract's bounding
+boxes). A query whose search circle reaches past the coverage edge might
+miss POIs just outside the extract, so nearest() returns None and the
+caller falls back to Overpass.
+
+Sources:
+  GeoJSON  FeatureCollection of Points (or Polygons, reduced to their bbox
+           center like Overpass `out center`) with OSM tags as properties.
+           An optional top-level "bbox" sets the coverage; without it the
+           extent of the POIs is used.
+  PBF      read with pyosmium (optional dependency). Convert once to a
+           compact GeoJSON so the server does not need it:
+               python backend/ml/SOS/poi_index.py extract.osm.pbf -o pois.geojson
+"""
+
+import json
+import math
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+DEFAULT_TAGS = ("amenity=hospital", "amenity=police", "amenity=pharmacy")
+# Properties kept per POI (everything sos_api turns into an EmergencyContact)
+KEPT_PROPERTIES = ("name", "addr:street", "addr:city", "phone", "contact:phone")
+
+
+class POI(NamedTuple):
+    tag: str
+    lat: float
+    lon: float
+    tags: dict
+
+
+class Hit(NamedTuple):
+    distance_km: float
+    poi: POI
+
+
+def _unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat, lon = np.radians(lats), np.radians(lons)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+class _Grid:
+    """Points of one tag, bucketed into cell_deg x cell_deg cells."""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float):
+        self.cell_deg = cell_deg
+        # Distances are ranked by chord length between unit vectors:
+        # monotonic in great-circle distance and a few cheap array ops
+        self.xyz = _unit_vectors(lats, lons)
+
+        rows = np.floor(lats / cell_deg).astype(np.int64)
+        cols = np.floor(lons / cell_deg).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        self.cells = {}
+        if len(order):
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, starts):
+                self.cells[(int(rows[group[0]]), int(cols[group[0]]))] = group
+
+    def _ring(self, row: int, col: int, r: int) -> list:
+        """Indices of the points in the cells exactly r cells away (Chebyshev)."""
+        if r == 0:
+            cells = [(row, col)]
+        else:
+            cells = [(row - r, c) for c in range(col - r, col + r + 1)]
+            cells += [(row + r, c) for c in range(col - r, col + r + 1)]
+            cells += [(rr, col - r) for rr in range(row - r + 1, row + r)]
+            cells += [(rr, col + r) for rr in range(row - r + 1, row + r)]
+        return [idx for idx in map(self.cells.get, cells) if idx is not None]
+
+    def knn(self, lat: float, lon: float, k: int, radius_km: float) -> tuple[np.ndarray, np.ndarray]:
+        """(indices, distances_km) of the k nearest points within radius_km, nearest first."""
+        row, col = math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+        # Narrowest cell width anywhere in the search area (longitude shrinks toward the poles).
+        # A point r + 1 or more rings out is at least r * cell_km away.
+        lat_extent = min(89.9, abs(lat) + radius_km / KM_PER_DEG + self.cell_deg)
+        cell_km = self.cell_deg * KM_PER_DEG * math.cos(math.radians(lat_extent))
+        last_ring = math.ceil(radius_km / cell_km)
+
+        # 1. Widen until there are k candidates (counting only, no distances)
+        found, count, r = [], 0, 0
+        while r <= last_ring:
+            ring = self._ring(row, col, r)
+            found += ring
+            count += sum(len(idx) for idx in ring)
+            if count >= k:
+                break
+            r += 1
+
+        if not found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # 2. The k-th candidate bounds the search: scan the rings it still reaches
+        query = _unit_vectors(np.array(lat), np.array(lon))
+        idx = np.concatenate(found)
+        chord = np.sqrt(((self.xyz[idx] - query) ** 2).sum(axis=1))
+        if count >= k and r < last_ring:
+            kth_km = float(_chord_to_km(np.partition(chord, k - 1)[k - 1]))
+            reach = min(last_ring, math.ceil(min(kth_km, radius_km) / cell_km))
+            extra = [i for rr in range(r + 1, reach + 1) for i in self._ring(row, col, rr)]
+            if extra:
+                more = np.concatenate(extra)
+                idx = np.concatenate([idx, more])
+                chord = np.concatenate([chord, np.sqrt(((self.xyz[more] - query) ** 2).sum(axis=1))])
+
+        dist = _chord_to_km(chord)
+        keep = dist <= radius_km
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:k]
+        return idx[order], dist[order]
+
+
+class POIIndex:
+    def __init__(self, pois: list[POI], coverage: list[tuple] | None = None, cell_deg: float = 0.1, tags=None):
+        """
+        coverage: bounding boxes (min_lon, min_lat, max_lon, max_lat) the
+        extract is complete for; defaults to the extent of the POIs.
+        tags: the tags the extract was built for (an indexed tag with no
+        POIs really has none); defaults to the tags of the POIs.
+        """
+        self.tags = frozenset(tags if tags is not None else (p.tag for p in pois))
+        self.pois_by_tag = {}
+        for poi in pois:
+            self.pois_by_tag.setdefault(poi.tag, []).append(poi)
+
+        self.grids = {
+            tag: _Grid(
+                np.array([p.lat for p in tag_pois], dtype=np.float64),
+                np.array([p.lon for p in tag_pois], dtype=np.float64),
+                cell_deg
+            )
+            for tag, tag_pois in self.pois_by_tag.items()
+        }
+
+        if coverage is None and pois:
+            lats, lons = [p.lat for p in pois], [p.lon for p in pois]
+            coverage = [(min(lons), min(lats), max(lons), max(lats))]
+        self.coverage = [tuple(map(float, box)) for box in coverage or []]
+
+    def __len__(self):
+        return sum(len(p) for p in self.pois_by_tag.values())
+
+    def coverage_margin_km(self, lat: float, lon: float) -> float:
+        """
+        Distance from the point to the nearest coverage edge (0 outside),
+        i.e. the search radius within which the index is complete.
+        """
+        margin = 0.0
+        for min_lon, min_lat, max_lon, max_lat in self.coverage:
+            if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                continue
+            lon_km = KM_PER_DEG * min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+            margin = max(margin, min(
+                (lat - min_lat) * KM_PER_DEG,
+                (max_lat - lat) * KM_PER_DEG,
+                (lon - min_lon) * lon_km,
+                (max_lon - lon) * lon_km,
+            ))
+        return margin
+
+    def nearest(self, tag: str, lat: float, lon: float, k: int = 5, radii_km=(20.0, 50.0)) -> list[Hit] | None:
+        """
+        Same semantics as the expanding Overpass search: the k nearest POIs
+        within the first radius that has any, nearest first ([] if none
+        within the largest radius). Returns None when the answer could
+        depend on data outside the extract, or the tag is not indexed
+        (use Overpass instead).
+        """
+        if tag not in self.tags:
+            return None
+        margin = self.coverage_margin_km(lat, lon)
+        grid = self.grids.get(tag)
+        pois = self.pois_by_tag.get(tag, [])
+
+        for radius in radii_km:
+            if grid is None:
+                idx, dist = (), ()
+            else:
+                idx, dist = grid.knn(lat, lon, k, radius)
+            # Complete if every point that could rank is inside the coverage
+            needed_km = float(dist[-1]) if len(dist) == k else radius
+            if needed_km > margin:
+                return None
+            if len(idx):
+                return [Hit(float(d), pois[i]) for i, d in zip(idx.tolist(), dist.tolist())]
+        return []
+
+
+def _center(geometry: dict):
+    """(lat, lon) of a GeoJSON geometry; bbox center for anything but a Point."""
+    if geometry["type"] == "Point":
+        lon, lat = geometry["coordinates"][:2]
+        return lat, lon
+
+    lons, lats = [], []
+
+    def walk(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            lons.append(coords[0])
+            lats.append(coords[1])
+        else:
+            for c in coords:
+                walk(c)
+
+    walk(geometry["coordinates"])
+    return (min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2
+
+
+def _matching_tags(properties: dict, tags) -> list[str]:
+    return [tag for tag in tags if properties.get(tag.split("=", 1)[0]) == tag.split("=", 1)[1]]
+
+
+def _kept(properties: dict) -> dict:
+    return {k: properties[k] for k in KEPT_PROPERTIES if properties.get(k)}
+
+
+def load_geojson(path: str, tags=DEFAULT_TAGS) -> tuple[list[POI], list[tuple] | None]:
+    with open(path) as f:
+        collection = json.load(f)
+
+    pois = []
+    for feature in collection.get("features", []):
+        properties = feature.get("properties") or {}
+        matched = _matching_tags(properties, tags)
+        if not matched or not feature.get("geometry"):
+            continue
+        lat, lon = _center(feature["geometry"])
+        for tag in matched:
+            pois.append(POI(tag, lat, lon, _kept(properties)))
+
+    # "coverage": list of boxes (see write_geojson), else the standard "bbox"
+    coverage = collection.get("coverage") or ([collection["bbox"]] if collection.get("bbox") else None)
+    return pois, ([tuple(box[:4]) for box in coverage] if coverage else None)
+
+
+def load_pbf(path: str, tags=DEFAULT_TAGS) -> tuple[list[POI], list[tuple] | None]:
+    """Nodes and ways (as their bbox center) with the given tags. Needs pyosmium."""
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Reading .pbf extracts needs pyosmium (pip install osmium); "
+                          "or convert the extract to GeoJSON elsewhere") from e
+
+    pois = []
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, n):
+            properties = {t.k: t.v for t in n.tags}
+            for tag in _matching_tags(properties, tags):
+                pois.append(POI(tag, n.location.lat, n.location.lon, _kept(properties)))
+
+        def way(self, w):
+            properties = {t.k: t.v for t in w.tags}
+            matched = _matching_tags(properties, tags)
+            if not matched:
+                return
+            locations = [(nd.lat, nd.lon) for nd in w.nodes if nd.location.valid()]
+            if not locations:
+                return
+            lats, lons = zip(*locations)
+            lat, lon = (min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2
+            for tag in matched:
+                pois.append(POI(tag, lat, lon, _kept(properties)))
+
+    Handler().apply_file(path, locations=True)
+
+    box = osmium.io.Reader(path).header().box()
+    coverage = None
+    if box.valid():
+        coverage = [(box.bottom_left.lon, box.bottom_left.lat, box.top_right.lon, box.top_right.lat)]
+    return pois, coverage
+
+
+def load_index(path: str, tags=DEFAULT_TAGS, cell_deg: float = 0.1) -> POIIndex:
+    """Builds the index from a .geojson/.json or .pbf extract."""
+    if path.endswith(".pbf"):
+        pois, coverage = load_pbf(path, tags)
+    else:
+        pois, coverage = load_geojson(path, tags)
+    return POIIndex(pois, coverage, cell_deg, tags)
+
+
+def write_geojson(index: POIIndex, path: str):
+    """Compact GeoJSON of the indexed POIs, keeping the coverage boxes."""
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [poi.lon, poi.lat]},
+            "properties": {**poi.tags, tag.split("=", 1)[0]: tag.split("=", 1)[1]},
+        }
+        for tag, pois in index.pois_by_tag.items()
+        for poi in pois
+    ]
+    collection = {"type": "FeatureCollection", "features": features}
+    if index.coverage:
+        collection["coverage"] = [list(box) for box in index.coverage]
+        if len(index.coverage) == 1:
+            collection["bbox"] = list(index.coverage[0])
+    with open(path, "w") as f:
+        json.dump(collection, f)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the SOS POI index from an OSM extract")
+    parser.add_argument("extract", help=".osm.pbf or .geojson extract")
+    parser.add_argument("-o", "--output", help="Write the indexed POIs as compact GeoJSON")
+    args = parser.parse_args()
+
+    index = load_index(args.extract)
+    print(f"✅ Indexed {len(index)} POIs: { {tag: len(p) for tag, p in index.pois_by_tag.items()} }")
+    print(f"   Coverage: {index.coverage}")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        write_geojson(index, args.output)
+        print(f"💾 Saved to {args.output}")
@@ -0,0 +1,381 @@
+"""
+Offline reverse geocoder for the SOS worker location: lat/lon -> address
+string from a preloaded street and admin-boundary extract, so an SOS does
+not wait on Nominatim (remote, rate-limited, 5 s timeout).
+
+The address is the nearest named street within max_street_m, followed by
+every admin area containing the point, finest first, e.g.
+"Janpath, New Delhi, Delhi, India".
+
+Indexes, built once at load:
+  streets  Segments bucketed in a uniform lat/lon grid; a lookup measures
+           only the segments in the few cells around the point.
+  areas    Bounding boxes checked in one vectorized pass. Point-in-polygon
+           (even-odd ray casting) then tests only the edges in the
+           polygon's latitude band, so large boundaries stay cheap.
+
+Answers are memoized in an LRU keyed on coordinates rounded to
+cache_precision decimals (4 = ~11 m). Outside the extract's coverage, or
+where it has nothing, address() returns None and the caller falls back
+to Nominatim.
+
+Sources:
+  GeoJSON  LineStrings with `highway` + `name` (streets) and Polygons /
+           MultiPolygons with `admin_level` + `name` (areas). An optional
+           top-level "coverage" list or "bbox" sets the coverage.
+  PBF      read with pyosmium (optional dependency). Convert once to a
+           compact GeoJSON so the server does not need it:
+               python backend/ml/SOS/reverse_geocoder.py extract.osm.pbf -o geocoder.geojson
+"""
+
+import json
+import math
+import os
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+M_PER_DEG = math.pi * 6_371_000.0 / 180
+
+
+class Street(NamedTuple):
+    name: str
+    coords: list  # [(lon, lat), ...]
+
+
+class Area(NamedTuple):
+    name: str
+    admin_level: int
+    rings: list  # outer and inner rings, [[(lon, lat), ...], ...]
+
+
+class Place(NamedTuple):
+    street: str | None
+    street_distance_m: float | None
+    areas: list  # names, finest first
+
+    @property
+    def label(self) -> str | None:
+        parts = [self.street] if self.street else []
+        for name in self.areas:
+            if not parts or parts[-1] != name:
+                parts.append(name)
+        return ", ".join(parts) or None
+
+
+class _StreetGrid:
+    def __init__(self, streets: list[Street], cell_deg: float):
+        self.cell_deg = cell_deg
+
+        x1, y1, x2, y2, owner = [], [], [], [], []
+        for i, street in enumerate(streets):
+            for (lon_a, lat_a), (lon_b, lat_b) in zip(street.coords, street.coords[1:]):
+                x1.append(lon_a)
+                y1.append(lat_a)
+                x2.append(lon_b)
+                y2.append(lat_b)
+                owner.append(i)
+        self.x1, self.y1, self.x2, self.y2 = (np.array(v, dtype=np.float64) for v in (x1, y1, x2, y2))
+        self.owner = np.array(owner, dtype=np.int64)
+
+        cells = {}
+        for seg, (a, b, c, d) in enumerate(zip(x1, y1, x2, y2)):
+            for row in range(math.floor(min(b, d) / cell_deg), math.floor(max(b, d) / cell_deg) + 1):
+                for col in range(math.floor(min(a, c) / cell_deg), math.floor(max(a, c) / cell_deg) + 1):
+                    cells.setdefault((row, col), []).append(seg)
+        self.cells = {key: np.array(segs, dtype=np.int64) for key, segs in cells.items()}
+
+    def nearest(self, lat: float, lon: float, max_m: float):
+        """(street index, distance in m) of the nearest segment within max_m, or None."""
+        dlat = max_m / M_PER_DEG
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        c = self.cell_deg
+        found = [
+            self.cells[key]
+            for row in range(math.floor((lat - dlat) / c), math.floor((lat + dlat) / c) + 1)
+            for col in range(math.floor((lon - dlon) / c), math.floor((lon + dlon) / c) + 1)
+            if (key := (row, col)) in self.cells
+        ]
+        if not found:
+            return None
+        idx = np.unique(np.concatenate(found))
+
+        # Local equirectangular projection around the point (metres)
+        kx, ky = math.cos(math.radians(lat)) * M_PER_DEG, M_PER_DEG
+        ax, ay = (self.x1[idx] - lon) * kx, (self.y1[idx] - lat) * ky
+        dx, dy = (self.x2[idx] - lon) * kx - ax, (self.y2[idx] - lat) * ky - ay
+        length2 = dx * dx + dy * dy
+        t = np.clip(-(ax * dx + ay * dy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+        dist = np.hypot(ax + t * dx, ay + t * dy)
+
+        best = int(np.argmin(dist))
+        if dist[best] > max_m:
+            return None
+        return int(self.owner[idx[best]]), float(dist[best])
+
+
+class _Polygon:
+    """Even-odd point-in-polygon over all rings, with edges bucketed in latitude bands."""
+
+    def __init__(self, rings: list):
+        x1, y1, x2, y2 = [], [], [], []
+        for ring in rings:
+            if len(ring) < 3:
+                continue
+            closed = ring if ring[0] == ring[-1] else ring + ring[:1]
+            for (lon_a, lat_a), (lon_b, lat_b) in zip(closed, closed[1:]):
+                if lat_a != lat_b:  # horizontal edges never cross a horizontal ray
+                    x1.append(lon_a)
+                    y1.append(lat_a)
+                    x2.append(lon_b)
+                    y2.append(lat_b)
+        self.x1, self.y1, self.x2, self.y2 = (np.array(v, dtype=np.float64) for v in (x1, y1, x2, y2))
+
+        low, high = np.minimum(self.y1, self.y2), np.maximum(self.y1, self.y2)
+        self.min_lat = float(low.min()) if len(low) else 0.0
+        max_lat = float(high.max()) if len(high) else 0.0
+        n_bands = max(1, min(256, len(x1) // 8))
+        self.band_deg = (max_lat - self.min_lat) / n_bands or 1.0
+        self.bands = [
+            np.nonzero((high >= self.min_lat + b * self.band_deg) & (low <= self.min_lat + (b + 1) * self.band_deg))[0]
+            for b in range(n_bands)
+        ]
+
+    def contains(self, lat: float, lon: float) -> bool:
+        band = int((lat - self.min_lat) / self.band_deg)
+        if not 0 <= band < len(self.bands):
+            return False
+        idx = self.bands[band]
+        y1, y2 = self.y1[idx], self.y2[idx]
+        spans = (y1 > lat) != (y2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = self.x1[idx] + (lat - y1) * (self.x2[idx] - self.x1[idx]) / (y2 - y1)
+        return bool(np.count_nonzero(spans & (lon < x_cross)) % 2)
+
+
+class ReverseGeocoder:
+    def __init__(
+        self,
+        streets: list[Street],
+        areas: list[Area],
+        coverage: list[tuple] | None = None,
+        max_street_m: float = 250.0,
+        cache_size: int = 10_000,
+        cache_precision: int = 4,
+        street_cell_deg: float = 0.005
+    ):
+        """
+        coverage: bounding boxes (min_lon, min_lat, max_lon, max_lat) the
+        extract is complete for; defaults to the extent of the data.
+        """
+        self.streets = streets
+        self.areas = areas
+        self.max_street_m = max_street_m
+        self.cache_size = cache_size
+        self.cache_precision = cache_precision
+
+        self._street_grid = _StreetGrid(streets, street_cell_deg)
+        self._polygons = [_Polygon(area.rings) for area in areas]
+        boxes = []
+        for area in areas:
+            lons = [lon for ring in area.rings for lon, _ in ring]
+            lats = [lat for ring in area.rings for _, lat in ring]
+            boxes.append((min(lons), min(lats), max(lons), max(lats)) if lons else (0.0, 0.0, -1.0, -1.0))
+        self._area_boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+        if coverage is None:
+            points = [c for s in streets for c in s.coords] + [c for a in areas for r in a.rings for c in r]
+            if points:
+                lons, lats = zip(*points)
+                coverage = [(min(lons), min(lats), max(lons), max(lats))]
+        self.coverage = [tuple(map(float, box)) for box in coverage or []]
+
+        self._cache = OrderedDict()  # rounded (lat, lon) -> address or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def covers(self, lat: float, lon: float) -> bool:
+        return any(
+            min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+            for min_lon, min_lat, max_lon, max_lat in self.coverage
+        )
+
+    def lookup(self, lat: float, lon: float) -> Place | None:
+        """Nearest street and containing areas (uncached); None outside the coverage."""
+        if not self.covers(lat, lon):
+            return None
+
+        street, distance = None, None
+        nearest = self._street_grid.nearest(lat, lon, self.max_street_m)
+        if nearest is not None:
+            street, distance = self.streets[nearest[0]].name, round(nearest[1], 1)
+
+        boxes = self._area_boxes
+        candidates = np.nonzero(
+            (boxes[:, 0] <= lon) & (lon <= boxes[:, 2]) & (boxes[:, 1] <= lat) & (lat <= boxes[:, 3])
+        )[0]
+        containing = [self.areas[i] for i in candidates.tolist() if self._polygons[i].contains(lat, lon)]
+        containing.sort(key=lambda area: -area.admin_level)
+        return Place(street, distance, [area.name for area in containing])
+
+    def address(self, lat: float, lon: float) -> str | None:
+        """Address string for the point, or None when the extract has no answer."""
+        key = (round(lat, self.cache_precision), round(lon, self.cache_precision))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        place = self.lookup(*key)
+        label = place.label if place is not None else None
+        self._cache[key] = label
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return label
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "streets": len(self.streets),
+            "street_segments": len(self._street_grid.owner),
+            "areas": len(self.areas),
+            "coverage": self.coverage,
+            "max_street_m": self.max_street_m,
+            "cache_size": len(self._cache),
+            "cache_maxsize": self.cache_size,
+            "cache_precision": self.cache_precision,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _admin_level(properties: dict):
+    try:
+        return int(properties.get("admin_level"))
+    except (TypeError, ValueError):
+        return None
+
+
+def load_geojson(path: str) -> tuple[list[Street], list[Area], list[tuple] | None]:
+    with open(path) as f:
+        collection = json.load(f)
+
+    streets, areas = [], []
+    for feature in collection.get("features", []):
+        properties = feature.get("properties") or {}
+        geometry = feature.get("geometry")
+        name = properties.get("name")
+        if not name or not geometry:
+            continue
+
+        kind, coords = geometry["type"], geometry["coordinates"]
+        if kind in ("LineString", "MultiLineString") and properties.get("highway"):
+            for line in [coords] if kind == "LineString" else coords:
+                if len(line) >= 2:
+                    streets.append(Street(name, [tuple(c[:2]) for c in line]))
+        elif kind in ("Polygon", "MultiPolygon") and _admin_level(properties) is not None:
+            polygons = [coords] if kind == "Polygon" else coords
+            rings = [[tuple(c[:2]) for c in ring] for polygon in polygons for ring in polygon]
+            areas.append(Area(name, _admin_level(properties), rings))
+
+    # "coverage": list of boxes (see write_geojson), else the standard "bbox"
+    coverage = collection.get("coverage") or ([collection["bbox"]] if collection.get("bbox") else None)
+    return streets, areas, ([tuple(box[:4]) for box in coverage] if coverage else None)
+
+
+def load_pbf(path: str) -> tuple[list[Street], list[Area], list[tuple] | None]:
+    """Named highways and administrative boundaries. Needs pyosmium."""
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Reading .pbf extracts needs pyosmium (pip install osmium); "
+                          "or convert the extract to GeoJSON elsewhere") from e
+
+    streets, areas = [], []
+
+    class Handler(osmium.SimpleHandler):
+        def way(self, w):
+            if "highway" not in w.tags or "name" not in w.tags:
+                return
+            coords = [(nd.lon, nd.lat) for nd in w.nodes if nd.location.valid()]
+            if len(coords) >= 2:
+                streets.append(Street(w.tags["name"], coords))
+
+        def area(self, a):
+            properties = {t.k: t.v for t in a.tags}
+            level = _admin_level(properties)
+            if properties.get("boundary") != "administrative" or level is None or not properties.get("name"):
+                return
+            rings = []
+            for outer in a.outer_rings():
+                rings.append([(nd.lon, nd.lat) for nd in outer])
+                for inner in a.inner_rings(outer):
+                    rings.append([(nd.lon, nd.lat) for nd in inner])
+            areas.append(Area(properties["name"], level, rings))
+
+    Handler().apply_file(path, locations=True)
+
+    box = osmium.io.Reader(path).header().box()
+    coverage = None
+    if box.valid():
+        coverage = [(box.bottom_left.lon, box.bottom_left.lat, box.top_right.lon, box.top_right.lat)]
+    return streets, areas, coverage
+
+
+def load_geocoder(path: str, **kwargs) -> ReverseGeocoder:
+    """Builds the geocoder from a .geojson/.json or .pbf extract."""
+    if path.endswith(".pbf"):
+        streets, areas, coverage = load_pbf(path)
+    else:
+        streets, areas, coverage = load_geojson(path)
+    return ReverseGeocoder(streets, areas, coverage, **kwargs)
+
+
+def write_geojson(geocoder: ReverseGeocoder, path: str):
+    """Compact GeoJSON of the streets and areas, keeping the coverage boxes."""
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [list(c) for c in street.coords]},
+            "properties": {"name": street.name, "highway": "yes"},
+        }
+        for street in geocoder.streets
+    ] + [
+        {
+            "type": "Feature",
+            # Rings are stored flat (outer and inner alike); even-odd makes that lossless
+            "geometry": {"type": "Polygon", "coordinates": [[list(c) for c in ring] for ring in area.rings]},
+            "properties": {"name": area.name, "admin_level": area.admin_level},
+        }
+        for area in geocoder.areas
+    ]
+    collection = {"type": "FeatureCollection", "features": features}
+    if geocoder.coverage:
+        collection["coverage"] = [list(box) for box in geocoder.coverage]
+        if len(geocoder.coverage) == 1:
+            collection["bbox"] = list(geocoder.coverage[0])
+    with open(path, "w") as f:
+        json.dump(collection, f)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the SOS reverse geocoder from an OSM extract")
+    parser.add_argument("extract", help=".osm.pbf or .geojson extract")
+    parser.add_argument("-o", "--output", help="Write the streets and areas as compact GeoJSON")
+    args = parser.parse_args()
+
+    geocoder = load_geocoder(args.extract)
+    print(f"✅ Loaded {len(geocoder.streets)} streets and {len(geocoder.areas)} admin areas")
+    print(f"   Coverage: {geocoder.coverage}")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        write_geojson(geocoder, args.output)
+        print(f"💾 Saved to {args.output}")
@@ -1,21 +1,93 @@
 # ============================================
 # CELL 1 & 2: Import Libraries
 # ============================================
-import nest_asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
-import httpx
+from typing import Annotated, Dict, List, Optional, TYPE_CHECKING
 import asyncio
+import os
+import sys
+import uuid
 from datetime import datetime
-import uvicorn
-from threading import Thread
 import time
 from math import radians, sin, cos, sqrt, atan2
+from pathlib import Path
+from urllib.parse import quote
 
-# Enable async support
-nest_asyncio.apply()
+# httpx is imported when the upstream pools open (see upstream_clients.py)
+# to keep API cold start fast; nest_asyncio/uvicorn are only needed for standalone runs.
+if TYPE_CHECKING:
+    import httpx
+
+if __name__ == "__main__":  # standalone run (python backend/ml/SOS/sos_api.py)
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from backend.app.core.metrics import stage, upstream_call
+
+try:
+    from backend.ml.SOS.overpass_cache import OverpassCache
+    from backend.ml.SOS.poi_index import load_index
+    from backend.ml.SOS.reverse_geocoder import load_geocoder
+    from backend.ml.SOS.sos_events import SOSStreams, format_sse
+    from backend.ml.SOS.upstream_clients import UpstreamClients
+except ImportError:  # standalone run
+    from overpass_cache import OverpassCache
+    from poi_index import load_index
+    from reverse_geocoder import load_geocoder
+    from sos_events import SOSStreams, format_sse
+    from upstream_clients import UpstreamClients
+
+# Upstream endpoints; point them at local stand-ins for load tests
+# (see backend/benchmarks/fake_upstreams.py)
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse")
+
+# Shared keep-alive pools, opened with the app lifespan (upstreams.start()).
+# Connection limits are per upstream host
+upstreams = UpstreamClients(
+    {"overpass": OVERPASS_URL, "nominatim": NOMINATIM_URL},
+    max_connections=int(os.getenv("SOS_HTTP_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("SOS_HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("SOS_HTTP_KEEPALIVE_EXPIRY", "90"))
+)
+
+# Local POI extract answering nearest-place lookups (see poi_index.py);
+# Overpass is only queried outside its coverage or when it is missing
+POI_INDEX_PATH = os.getenv("POI_INDEX_PATH", os.path.join(os.path.dirname(__file__), "data", "pois.geojson"))
+poi_index = None
+
+# Local street/admin-boundary extract for the worker address (see reverse_geocoder.py);
+# Nominatim is only asked where it has no answer, unless NOMINATIM_FALLBACK=0
+GEOCODER_PATH = os.getenv("GEOCODER_PATH", os.path.join(os.path.dirname(__file__), "data", "geocoder.geojson"))
+GEOCODER_MAX_STREET_M = float(os.getenv("GEOCODER_MAX_STREET_M", "250"))
+GEOCODER_CACHE_SIZE = int(os.getenv("GEOCODER_CACHE_SIZE", "10000"))
+NOMINATIM_FALLBACK = os.getenv("NOMINATIM_FALLBACK", "1") == "1"
+geocoder = None
+
+# Overpass results cached per (tag, geohash cell, radius), see overpass_cache.py.
+# Served stale while a background refresh runs; persisted so restarts start warm
+OVERPASS_CACHE_ENABLED = os.getenv("OVERPASS_CACHE", "1") == "1"
+overpass_cache = OverpassCache(
+    path=os.getenv("OVERPASS_CACHE_PATH", os.path.join(os.path.dirname(__file__), "cache", "overpass_cache.json")),
+    precision=int(os.getenv("OVERPASS_CACHE_GEOHASH_PRECISION", "5")),
+    ttl_seconds=float(os.getenv("OVERPASS_CACHE_TTL_HOURS", "168")) * 3600,
+    max_age_seconds=float(os.getenv("OVERPASS_CACHE_MAX_STALE_HOURS", "720")) * 3600,
+    maxsize=int(os.getenv("OVERPASS_CACHE_SIZE", "5000"))
+)
+
+# One Overpass union query for all requested place types per search radius,
+# instead of one query per type (OVERPASS_UNION_QUERY=0 restores that)
+OVERPASS_UNION_QUERY = os.getenv("OVERPASS_UNION_QUERY", "1") == "1"
+RADII_OPTIONS = [20000, 50000]
+DEFAULT_PLACE_TYPES = ["hospital", "police", "pharmacy"]
+
+# Latency budget: trigger_sos answers within SOS_DEADLINE_MS with whatever is ready
+# and streams the rest over SSE (GET /api/sos/events?sos_id=...). 0 waits for everything
+SOS_DEADLINE_MS = int(os.getenv("SOS_DEADLINE_MS", "300"))
+sos_streams = SOSStreams(ttl_seconds=float(os.getenv("SOS_STREAM_TTL_SECONDS", "600")))
+_background_tasks = set()
 
 # ============================================
 # CELL 3: Define Data Models
@@ -27,6 +99,12 @@ class SOSRequest(BaseModel):
     longitude: float = Field(..., ge=-180, le=180)
     emergency_type: str = Field(default="general")
     message: Optional[str] = None
+    # OSM amenity values to search, e.g. fire_station, fuel
+    amenities: List[Annotated[str, Field(pattern=r"^[a-z_]+$")]] = Field(
+        default_factory=lambda: list(DEFAULT_PLACE_TYPES), min_length=1, max_length=10
+    )
+    # Response time budget; None uses SOS_DEADLINE_MS, 0 waits for every lookup
+    deadline_ms: Optional[int] = Field(default=None, ge=0, le=60000)
 
 class EmergencyContact(BaseModel):
     name: str
@@ -44,9 +122,13 @@ class SOSResponse(BaseModel):
     nearest_hospitals: List[EmergencyContact]
     nearest_police: List[EmergencyContact]
     nearest_pharmacies: List[EmergencyContact]  # NEW FIELD
+    nearest_places: Dict[str, List[EmergencyContact]]  # every requested amenity
     emergency_number: str
     status: str
     processing_time_ms: float
+    complete: bool = True
+    pending: List[str] = []  # "address" and place types still being looked up
+    events_url: Optional[str] = None  # SSE stream with the pending results
 
 # ============================================
 # CELL 4: Helper Functions
@@ -62,74 +144,204 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     c = 2 * atan2(sqrt(a), sqrt(1-a))
     return round(R * c, 2)
 
-async def fetch_osm_raw(client: httpx.AsyncClient, lat: float, lon: float, tag: str, radius: int):
-    """Fetch raw data from Overpass API"""
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def place_tag(place_type: str) -> str:
+    return f"amenity={place_type}"
+
+async def query_overpass(client: "httpx.AsyncClient", lat: float, lon: float, tags: List[str], radius: int) -> list:
+    """Fetch raw data from Overpass API (one union query for all tags). Raises if every attempt fails, so failures are never cached"""
+    clauses = "".join(
+        f"""
+      node[{tag}](around:{radius},{lat},{lon});
+      way[{tag}](around:{radius},{lat},{lon});"""
+        for tag in tags
+    )
     query = f"""
     [out:json][timeout:15];
-    (
-      node[{tag}](around:{radius},{lat},{lon});
-      way[{tag}](around:{radius},{lat},{lon});
+    ({clauses}
     );
     out center;
     """
     headers = {"User-Agent": "GigGuard_Safety_App/2.1", "Content-Type": "application/x-www-form-urlencoded"}
 
+    error = None
     for attempt in range(2):
         try:
-            response = await client.post(overpass_url, data={"data": query}, headers=headers, timeout=20)
+            with upstream_call("overpass", attempt) as call:
+                response = await client.post(OVERPASS_URL, data={"data": query}, headers=headers, timeout=20)
+                if response.status_code != 200:
+                    call["outcome"] = f"http_{response.status_code}"
             if response.status_code == 200:
                 return response.json().get("elements", [])
-        except Exception:
+            error = RuntimeError(f"Overpass returned HTTP {response.status_code}")
+        except Exception as e:
+            error = e
             await asyncio.sleep(1)
-    return []
-
-async def fetch_places_expansive(client: httpx.AsyncClient, lat: float, lon: float, place_type: str):
-    """Smart Search: 5km -> 15km -> 50km"""
-    osm_tags = {
-        "hospital": "amenity=hospital",
-        "police": "amenity=police",
-        "pharmacy": "amenity=pharmacy"  # NEW TAG
-    }
-    tag = osm_tags.get(place_type, "amenity=hospital")
-    
-    radii_options = [20000, 50000]
-    elements = []
-    
-    for radius in radii_options:
-        elements = await fetch_osm_raw(client, lat, lon, tag, radius)
-        if len(elements) > 0: break
-    
+    raise error
+
+def split_by_tag(elements: list, tags: List[str]) -> dict:
+    """Splits a union result back into tag -> elements"""
+    by_tag = {tag: [] for tag in tags}
+    for el in elements:
+        el_tags = el.get("tags", {})
+        for tag in tags:
+            key, _, value = tag.partition("=")
+            if el_tags.get(key) == value:
+                by_tag[tag].append(el)
+    return by_tag
+
+async def fetch_osm_union(client: "httpx.AsyncClient", lat: float, lon: float, tags: List[str], radius: int) -> dict:
+    """tag -> raw Overpass elements, through the geohash cache when enabled ([] for failed tags)"""
+    async def fetch(q_lat, q_lon, q_radius, q_tags):
+        return split_by_tag(await query_overpass(client, q_lat, q_lon, q_tags, q_radius), q_tags)
+
+    try:
+        if not OVERPASS_CACHE_ENABLED:
+            return await fetch(lat, lon, radius, tags)
+        # Tags served from the cache survive a failed fetch of the others
+        found = await overpass_cache.get_many(tags, lat, lon, radius, fetch)
+    except Exception:
+        return {tag: [] for tag in tags}
+    return {tag: found.get(tag, []) for tag in tags}
+
+async def fetch_osm_raw(client: "httpx.AsyncClient", lat: float, lon: float, tag: str, radius: int):
+    """Raw Overpass elements for one tag ([] on failure)"""
+    return (await fetch_osm_union(client, lat, lon, [tag], radius))[tag]
+
+def load_poi_index(path: str = POI_INDEX_PATH):
+    """Loads the POI extract into memory. Without one, every lookup goes to Overpass."""
+    global poi_index
+    if not os.path.exists(path):
+        print(f"⚠️ No POI index at {path}, nearest-place lookups will use Overpass")
+        return None
+    poi_index = load_index(path)
+    print(f"✅ POI index loaded: {len(poi_index)} places, coverage {poi_index.coverage}")
+    return poi_index
+
+def load_geocoder_data(path: str = GEOCODER_PATH):
+    """Loads the street/boundary extract. Without one, addresses come from Nominatim."""
+    global geocoder
+    if not os.path.exists(path):
+        print(f"⚠️ No geocoder extract at {path}, addresses will use Nominatim")
+        return None
+    geocoder = load_geocoder(path, max_street_m=GEOCODER_MAX_STREET_M, cache_size=GEOCODER_CACHE_SIZE)
+    print(f"✅ Reverse geocoder loaded: {len(geocoder.streets)} streets, {len(geocoder.areas)} areas")
+    return geocoder
+
+def load_overpass_cache():
+    if not OVERPASS_CACHE_ENABLED:
+        return 0
+    loaded = overpass_cache.load()
+    print(f"✅ Overpass cache: {loaded} cells loaded from {overpass_cache.path}")
+    return loaded
+
+def save_overpass_cache():
+    if OVERPASS_CACHE_ENABLED and len(overpass_cache):
+        overpass_cache.save()
+
+def emergency_contact(place_type: str, lat: float, lon: float, p_lat: float, p_lon: float, tags: dict) -> EmergencyContact:
+    # Clean Address
+    addr_parts = [tags.get(k) for k in ["addr:street", "addr:city"] if tags.get(k)]
+    address = ", ".join(addr_parts) if addr_parts else "Address details unavailable"
+
+    return EmergencyContact(
+        name=tags.get("name", f"Unnamed {place_type.capitalize()}"),
+        type=place_type,
+        address=address,
+        latitude=p_lat,
+        longitude=p_lon,
+        distance_km=calculate_distance(lat, lon, p_lat, p_lon),
+        phone=tags.get("phone") or tags.get("contact:phone")
+    )
+
+def index_places(place_type: str, lat: float, lon: float):
+    """Nearest places from the local POI index, None when it does not cover the search"""
+    index = poi_index
+    if index is None:
+        return None
+    hits = index.nearest(place_tag(place_type), lat, lon, k=5, radii_km=[r / 1000 for r in RADII_OPTIONS])
+    if hits is None:
+        return None
+    return [emergency_contact(place_type, lat, lon, h.poi.lat, h.poi.lon, h.poi.tags) for h in hits]
+
+def rank_places(place_type: str, lat: float, lon: float, elements: list) -> List[EmergencyContact]:
     places = []
     for el in elements:
         if "lat" in el: p_lat, p_lon = el["lat"], el["lon"]
         elif "center" in el: p_lat, p_lon = el["center"]["lat"], el["center"]["lon"]
         else: continue
 
-        dist = calculate_distance(lat, lon, p_lat, p_lon)
-        tags = el.get("tags", {})
-        
-        # Clean Address
-        addr_parts = [tags.get(k) for k in ["addr:street", "addr:city"] if tags.get(k)]
-        address = ", ".join(addr_parts) if addr_parts else "Address details unavailable"
-
-        places.append(EmergencyContact(
-            name=tags.get("name", f"Unnamed {place_type.capitalize()}"),
-            type=place_type,
-            address=address,
-            latitude=p_lat,
-            longitude=p_lon,
-            distance_km=dist,
-            phone=tags.get("phone") or tags.get("contact:phone")
-        ))
+        places.append(emergency_contact(place_type, lat, lon, p_lat, p_lon, el.get("tags", {})))
 
     places.sort(key=lambda x: x.distance_km)
     return places[:5]
 
-async def get_address_async(client: httpx.AsyncClient, lat: float, lon: float) -> str:
-    url = "https://nominatim.openstreetmap.org/reverse"
+async def fetch_places_expansive(client: "httpx.AsyncClient", lat: float, lon: float, place_type: str):
+    """Smart Search: 20km -> 50km, from the local POI index when it covers the area"""
+    places = index_places(place_type, lat, lon)
+    if places is not None:
+        return places
+
+    tag = place_tag(place_type)
+    elements = []
+    
+    for radius in RADII_OPTIONS:
+        elements = await fetch_osm_raw(client, lat, lon, tag, radius)
+        if len(elements) > 0: break
+    
+    return rank_places(place_type, lat, lon, elements)
+
+async def fetch_places_union(client: "httpx.AsyncClient", lat: float, lon: float, place_types: List[str], on_places=None) -> dict:
+    """
+    Smart Search for several place types at once: one union query at 20km
+    for every type the POI index cannot answer, then one at 50km for the
+    types still empty. Results are split and ranked locally per type.
+    on_places(place_type, places) is called as soon as each type is known.
+    """
+    on_places = on_places or (lambda place_type, found: None)
+    places = {}
+    for place_type in place_types:
+        indexed = index_places(place_type, lat, lon)
+        if indexed is not None:
+            places[place_type] = indexed
+            on_places(place_type, indexed)
+
+    remaining = [t for t in place_types if t not in places]
+    if remaining and OVERPASS_CACHE_ENABLED:
+        # Cached types come back unchanged from the first union query; hand them out now
+        cached = overpass_cache.peek([place_tag(t) for t in remaining], lat, lon, RADII_OPTIONS[0])
+        for place_type in remaining:
+            if cached.get(place_tag(place_type)):
+                on_places(place_type, rank_places(place_type, lat, lon, cached[place_tag(place_type)]))
+
+    for radius in RADII_OPTIONS:
+        if not remaining: break
+        tags = {place_tag(t): t for t in remaining}
+        by_tag = await fetch_osm_union(client, lat, lon, list(tags), radius)
+        for tag, place_type in tags.items():
+            if by_tag.get(tag):
+                places[place_type] = rank_places(place_type, lat, lon, by_tag[tag])
+                on_places(place_type, places[place_type])
+        remaining = [t for t in remaining if t not in places]
+
+    for place_type in remaining:
+        on_places(place_type, [])
+    return {t: places.get(t, []) for t in place_types}
+
+async def get_address_async(client: "httpx.AsyncClient", lat: float, lon: float) -> str:
+    local = geocoder
+    if local is not None:
+        with stage("sos", "reverse_geocode"):
+            address = local.address(lat, lon)
+        if address:
+            return address
+    if not NOMINATIM_FALLBACK:
+        return f"{lat}, {lon}"
+
     try:
-        resp = await client.get(url, params={"lat": lat, "lon": lon, "format": "json"}, headers={"User-Agent": "GigGuard"}, timeout=5)
+        with upstream_call("nominatim") as call:
+            resp = await client.get(NOMINATIM_URL, params={"lat": lat, "lon": lon, "format": "json"}, headers={"User-Agent": "GigGuard"}, timeout=5)
+            if resp.status_code != 200:
+                call["outcome"] = f"http_{resp.status_code}"
         return resp.json().get("display_name", f"{lat}, {lon}")
     except:
         return f"{lat}, {lon}"
@@ -148,36 +360,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def resolve_sos(overpass: "httpx.AsyncClient", nominatim: "httpx.AsyncClient", lat: float, lon: float, place_types: List[str], ready):
+    """Runs every SOS lookup, calling ready(section, value) as each one lands ("address" or a place type)"""
+    async def address():
+        ready("address", await get_address_async(nominatim, lat, lon))
+
+    if OVERPASS_UNION_QUERY:
+        # One Overpass round trip per radius for all place types, in parallel with the address
+        places = fetch_places_union(overpass, lat, lon, place_types, on_places=ready)
+    else:
+        # Parallel Execution, one search per place type
+        async def search(place_type):
+            ready(place_type, await fetch_places_expansive(overpass, lat, lon, place_type))
+        places = asyncio.gather(*(search(t) for t in place_types))
+
+    await asyncio.gather(places, address())
+
 @app.post("/api/sos/trigger", response_model=SOSResponse)
 async def trigger_sos(sos_request: SOSRequest):
     start_time = time.time()
-    sos_id = f"SOS-{sos_request.worker_id}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    sos_id = f"SOS-{sos_request.worker_id}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
     
-    async with httpx.AsyncClient() as client:
-        # Parallel Execution for Hospitals, Police, AND Pharmacies
-        results = await asyncio.gather(
-            fetch_places_expansive(client, sos_request.latitude, sos_request.longitude, "hospital"),
-            fetch_places_expansive(client, sos_request.latitude, sos_request.longitude, "police"),
-            fetch_places_expansive(client, sos_request.latitude, sos_request.longitude, "pharmacy"),
-            get_address_async(client, sos_request.latitude, sos_request.longitude)
+    # No-op once the app lifespan has opened the pools (standalone runs open them here)
+    await upstreams.start()
+    overpass, nominatim = upstreams.get("overpass"), upstreams.get("nominatim")
+
+    lat, lon = sos_request.latitude, sos_request.longitude
+    place_types = list(dict.fromkeys(sos_request.amenities))
+    deadline_ms = SOS_DEADLINE_MS if sos_request.deadline_ms is None else sos_request.deadline_ms
+
+    found = {}  # section -> result, first answer wins
+    stream = None
+
+    def ready(section, value):
+        if section in found:
+            return
+        found[section] = value
+        if stream is not None:
+            publish(section, value)
+
+    def publish(section, value):
+        if section == "address":
+            stream.publish("address", {"sos_id": sos_id, "address": value})
+        else:
+            stream.publish("places", {"sos_id": sos_id, "type": section, "places": [p.model_dump() for p in value]})
+
+    def build_response(final: bool = False) -> SOSResponse:
+        # Once the lookups have ended, anything they never delivered is final as empty
+        places = {t: found.get(t, []) for t in place_types} if final else {t: found[t] for t in place_types if t in found}
+        pending = [] if final else [s for s in ["address", *place_types] if s not in found]
+        return SOSResponse(
+            sos_id=sos_id,
+            timestamp=datetime.now().isoformat(),
+            worker_location={"latitude": lat, "longitude": lon, "address": found.get("address", f"{lat}, {lon}")},
+            nearest_hospitals=places.get("hospital", []),
+            nearest_police=places.get("police", []),
+            nearest_pharmacies=places.get("pharmacy", []), # NEW
+            nearest_places=places,
+            emergency_number="108",
+            status="active",
+            processing_time_ms=round((time.time() - start_time) * 1000, 2),
+            complete=not pending,
+            pending=pending,
+            events_url=f"/api/sos/events?sos_id={quote(sos_id, safe='')}" if pending and stream is not None else None
         )
-        
-        hospitals, police, pharmacies, current_address = results
-
-    return SOSResponse(
-        sos_id=sos_id,
-        timestamp=datetime.now().isoformat(),
-        worker_location={"latitude": sos_request.latitude, "longitude": sos_request.longitude, "address": current_address},
-        nearest_hospitals=hospitals,
-        nearest_police=police,
-        nearest_pharmacies=pharmacies, # NEW
-        emergency_number="108",
-        status="active",
-        processing_time_ms=round((time.time() - start_time) * 1000, 2)
-    )
+
+    def log_failure(task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ SOS {sos_id} lookups failed: {task.exception()}")
+
+    work = asyncio.create_task(resolve_sos(overpass, nominatim, lat, lon, place_types, ready))
+    await asyncio.wait({work}, timeout=deadline_ms / 1000 if deadline_ms else None)
+    if work.done():
+        log_failure(work)
+        return build_response(final=True)
+
+    # Over budget: answer with what is ready, stream the rest to the client
+    stream = sos_streams.open(sos_id)
+    for section, value in found.items():
+        publish(section, value)
+
+    def finish(task):
+        _background_tasks.discard(task)
+        log_failure(task)
+        stream.publish("complete", build_response(final=True).model_dump())
+        stream.close()
+
+    _background_tasks.add(work)
+    work.add_done_callback(finish)
+    return build_response()
+
+@app.get("/api/sos/events")
+async def sos_events(sos_id: str):
+    """Server-Sent Events with the results a deadline-bounded SOS response left pending."""
+    stream = sos_streams.get(sos_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired SOS")
+
+    async def events():
+        async for item in stream.follow():
+            yield ": keep-alive\n\n" if item is None else format_sse(*item)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/sos/upstreams")
+async def upstream_pool_stats():
+    """Connection pool usage per upstream (requests, connections opened/reused, idle, queued)."""
+    return upstreams.stats()
+
+@app.get("/api/sos/geocoder")
+async def geocoder_stats():
+    """Local reverse geocoder size and address cache hit rate."""
+    local = geocoder
+    return {"loaded": local is not None, "nominatim_fallback": NOMINATIM_FALLBACK, **(local.stats() if local else {})}
+
+@app.get("/api/sos/overpass-cache")
+async def overpass_cache_stats():
+    """Overpass cache size, freshness and hit rate."""
+    return {"enabled": OVERPASS_CACHE_ENABLED, **overpass_cache.stats()}
 
 # ... (Run block remains same) ...
 if __name__ == "__main__":
+    import nest_asyncio
+    import uvicorn
+    from threading import Thread
+
+    # Enable async support
+    nest_asyncio.apply()
+
     server_thread = Thread(target=lambda: uvicorn.run(app, host="127.0.0.1", port=8000), daemon=True)
     server_thread.start()
     while True: time.sleep(1)
@@ -0,0 +1,87 @@
+"""
+Per-SOS event streams for deadline-bounded SOS responses.
+
+When trigger_sos answers before every lookup has finished, the remaining
+results (address, each place list, then the complete response) are
+published to the stream for that sos_id. Clients follow it as
+Server-Sent Events. Every subscriber gets the full history first, so
+connecting late loses nothing.
+
+Streams live in memory for ttl_seconds and the registry is bounded
+(oldest dropped first).
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class SOSStream:
+    def __init__(self, sos_id: str, created_at: float):
+        self.sos_id = sos_id
+        self.created_at = created_at
+        self.events = []  # (event, data), in publish order
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str, data) -> None:
+        self.events.append((event, data))
+        self._wake()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self, keepalive_seconds: float = 15.0):
+        """Yields (event, data) from the first event until the stream closes; None while idle."""
+        sent = 0
+        while True:
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.closed:
+                return
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield None
+
+
+class SOSStreams:
+    def __init__(self, ttl_seconds: float = 600.0, maxsize: int = 1000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._clock = clock
+        self._streams = OrderedDict()  # sos_id -> SOSStream, oldest first
+
+    def __len__(self):
+        return len(self._streams)
+
+    def open(self, sos_id: str) -> SOSStream:
+        now = self._clock()
+        while self._streams:
+            oldest = next(iter(self._streams.values()))
+            if now - oldest.created_at < self.ttl_seconds and len(self._streams) < self.maxsize:
+                break
+            # Wakes any subscriber still following it, so its response ends
+            self._streams.popitem(last=False)[1].close()
+
+        stream = SOSStream(sos_id, now)
+        self._streams[sos_id] = stream
+        return stream
+
+    def get(self, sos_id: str) -> SOSStream | None:
+        stream = self._streams.get(sos_id)
+        if stream is None or self._clock() - stream.created_at >= self.ttl_seconds:
+            return None
+        return stream
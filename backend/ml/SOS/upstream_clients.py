@@ -0,0 +1,132 @@
+"""
+Long-lived, pooled HTTP clients for the SOS upstreams (Overpass, Nominatim).
+
+One httpx.AsyncClient per upstream, opened once with the app lifespan and
+shared by every SOS. Connections are kept alive between requests, so an
+emergency reuses an established TCP/TLS connection instead of paying
+fresh handshakes, and each upstream gets its own connection limit (one
+slow host cannot starve the other's pool). HTTP/2 is negotiated through
+h2 (httpx[http2] in requirements.txt); an environment without h2 falls
+back to HTTP/1.1 keep-alive with a warning.
+
+httpx is imported in start(), not at module import, to keep API cold
+start fast.
+"""
+
+import importlib.util
+import weakref
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class UpstreamClients:
+    def __init__(
+        self,
+        upstreams: dict,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 90.0,
+        timeout: float = 20.0,
+        connect_timeout: float = 5.0
+    ):
+        """upstreams: name -> URL (only used to label stats)."""
+        self.upstreams = dict(upstreams)
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.http2 = importlib.util.find_spec("h2") is not None
+
+        self._clients: dict[str, "httpx.AsyncClient"] = {}
+        self._requests = dict.fromkeys(self.upstreams, 0)
+        self._opened = dict.fromkeys(self.upstreams, 0)
+        self._seen = {name: weakref.WeakSet() for name in self.upstreams}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._clients)
+
+    async def start(self):
+        """Opens the clients (no-op if already open)."""
+        if self.started:
+            return
+        import httpx
+
+        if not self.http2:
+            print("⚠️ h2 is not installed (pip install 'httpx[http2]'), upstreams will use HTTP/1.1")
+        for name in self.upstreams:
+            self._clients[name] = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                event_hooks={"request": [self._on_request(name)], "response": [self._on_response(name)]}
+            )
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> "httpx.AsyncClient":
+        return self._clients[name]
+
+    def _on_request(self, name: str):
+        async def hook(request):
+            self._requests[name] += 1
+        return hook
+
+    def _on_response(self, name: str):
+        async def hook(response):
+            # A connection not seen before was opened for this request
+            seen = self._seen[name]
+            for connection in self._pool_connections(name):
+                if connection not in seen:
+                    seen.add(connection)
+                    self._opened[name] += 1
+        return hook
+
+    def _pool(self, name: str):
+        # httpx exposes no public pool stats; read the httpcore pool defensively
+        client = self._clients.get(name)
+        transport = getattr(client, "_transport", None)
+        return getattr(transport, "_pool", None)
+
+    def _pool_connections(self, name: str) -> list:
+        pool = self._pool(name)
+        return list(getattr(pool, "connections", None) or [])
+
+    def stats(self) -> dict:
+        upstreams = {}
+        for name, url in self.upstreams.items():
+            connections = self._pool_connections(name)
+            idle = sum(1 for c in connections if c.is_idle())
+            pool = self._pool(name)
+            requests = self._requests[name]
+            upstreams[name] = {
+                "url": url,
+                "requests": requests,
+                "connections_opened": self._opened[name],
+                # Requests that found a connection already open (no handshake)
+                "reused_requests": max(0, requests - self._opened[name]),
+                "connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "queued_requests": sum(1 for r in getattr(pool, "_requests", []) if r.is_queued()),
+            }
+        return {
+            "started": self.started,
+            "http2": self.http2,
+            "limits": {
+                "max_connections_per_upstream": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry_s": self.keepalive_expiry,
+            },
+            "upstreams": upstreams,
+        }
@@ -0,0 +1,122 @@
+"""
+Exports the pickled models into raw-array artifacts (see
+route_risk/inference/array_artifacts.py) that the API memory-maps at startup
+instead of unpickling:
+
+    route_risk/artifacts/route_risk_logreg_arrays/
+        coef, intercept, classes, norm_scale, norm_offset (+ norm stats in the manifest)
+    fatigue_model/artifacts/fatigue_arrays/
+        coef, intercept, classes, scaler_scale, scaler_min, and the scaler
+        pre-folded into folded_coef / folded_intercept (+ label map in the manifest)
+
+The manifest records the sha256 of every source pickle, so the loaders fall
+back to the pickles if a model is retrained and not re-exported.
+Re-run this after every training run.
+
+Run from the repository root:
+    python -m backend.ml.export_artifacts
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+from backend.ml.route_risk.features.feature_utils import (
+    REQUIRED_FEATURES,
+    load_normalization_stats,
+    normalization_affine
+)
+from backend.ml.route_risk.inference.array_artifacts import file_sha256, write_array_artifact
+from backend.ml.route_risk.inference.linear_kernel import LinearSoftmaxKernel
+
+root = os.path.dirname(__file__)
+
+ROUTE_MODEL_PATH = os.path.join(root,'route_risk','artifacts','route_risk_logreg.joblib')
+FATIGUE_ARTIFACT_DIR = os.path.join(root,'fatigue_model','artifacts')
+
+FATIGUE_FEATURES = [
+    "shift_duration_hours",
+    "consecutive_work_days",
+    "night_work_fraction",
+    "weather_stress_index",
+    "self_reported_tiredness"
+]
+
+
+def _sources(*paths) -> dict:
+    return {os.path.basename(p): file_sha256(p) for p in paths}
+
+
+def export_route_risk(model_path: str = ROUTE_MODEL_PATH) -> str:
+    stem = os.path.splitext(model_path)[0]
+    stats_path = stem + "_norm_stats.json"
+    out_dir = stem + "_arrays"
+
+    model = joblib.load(model_path)
+    stats = load_normalization_stats(stats_path)
+    scale, offset = normalization_affine(stats)
+
+    write_array_artifact(
+        out_dir,
+        name="route_risk_logreg",
+        arrays={
+            "coef": np.asarray(model.coef_, dtype=np.float64),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64),
+            "classes": np.asarray(model.classes_, dtype=str),
+            "norm_scale": scale,
+            "norm_offset": offset,
+        },
+        metadata={
+            "feature_names": REQUIRED_FEATURES,
+            "norm_stats": stats,
+            "source_sha256": _sources(model_path, stats_path),
+        }
+    )
+    print("✅ Route Risk arrays exported to:", out_dir)
+    return out_dir
+
+
+def export_fatigue(artifact_dir: str = FATIGUE_ARTIFACT_DIR) -> str:
+    model_path = os.path.join(artifact_dir, "model.pkl")
+    scaler_path = os.path.join(artifact_dir, "scaler.pkl")
+    label_map_path = os.path.join(artifact_dir, "label_map.pkl")
+    out_dir = os.path.join(artifact_dir, "fatigue_arrays")
+
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    label_map = joblib.load(label_map_path)
+    # Folded here, not at load, so the served weights are the mapped pages themselves
+    folded = LinearSoftmaxKernel.from_estimator(model).fold_affine(scaler.scale_, scaler.min_)
+
+    write_array_artifact(
+        out_dir,
+        name="fatigue",
+        arrays={
+            "coef": np.asarray(model.coef_, dtype=np.float64),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64),
+            "classes": np.asarray(model.classes_, dtype=np.int64),
+            "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+            "scaler_min": np.asarray(scaler.min_, dtype=np.float64),
+            "folded_coef": folded.coef,
+            "folded_intercept": folded.intercept,
+        },
+        metadata={
+            "feature_names": FATIGUE_FEATURES,
+            "label_map": {label: int(idx) for label, idx in label_map.items()},
+            "source_sha256": _sources(model_path, scaler_path, label_map_path),
+        }
+    )
+    print("✅ Fatigue arrays exported to:", out_dir)
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export pickled models as memory-mappable arrays")
+    parser.add_argument("--route-model", default=ROUTE_MODEL_PATH)
+    parser.add_argument("--fatigue-dir", default=FATIGUE_ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    export_route_risk(args.route_model)
+    export_fatigue(args.fatigue_dir)
@@ -0,0 +1,89 @@
+"""
+Parity check: NumPy inference kernel vs sklearn for the fatigue model.
+Scores the full dataset both ways and fails loudly on any mismatch.
+
+Run from the repository root:
+    python -m backend.ml.fatigue_model.check_kernel_parity
+"""
+
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import os
+
+from backend.ml.route_risk.inference.array_artifacts import load_array_artifact
+from backend.ml.route_risk.inference.linear_kernel import LinearSoftmaxKernel
+
+root=os.path.dirname(__file__)
+data_path=os.path.join(root,'data','base_data_expanded.csv')
+
+FEATURES = [
+    "shift_duration_hours",
+    "consecutive_work_days",
+    "night_work_fraction",
+    "weather_stress_index",
+    "self_reported_tiredness"
+]
+
+ATOL = 1e-9
+
+
+def check_parity(atol: float = ATOL) -> bool:
+    df = pd.read_csv(data_path)
+    model = joblib.load(os.path.join(root,"artifacts/model.pkl"))
+    scaler = joblib.load(os.path.join(root,"artifacts/scaler.pkl"))
+    kernel = LinearSoftmaxKernel.from_estimator(model)
+
+    X_scaled = scaler.transform(df[FEATURES].to_numpy(dtype=float))
+
+    ok = True
+
+    # 1. Full-matrix probabilities and labels
+    sk_probs = model.predict_proba(X_scaled)
+    np_probs = kernel.predict_proba(X_scaled)
+    max_diff = float(np.max(np.abs(sk_probs - np_probs)))
+    label_mismatches = int(np.sum(model.predict(X_scaled) != kernel.predict(X_scaled)))
+
+    print(f"Rows checked:          {len(X_scaled)}")
+    print(f"Max |prob diff|:       {max_diff:.3e}")
+    print(f"Label mismatches:      {label_mismatches}")
+    ok &= max_diff <= atol and label_mismatches == 0
+
+    # 2. Single-row calls (the API hot path) on a sample of rows
+    rng = np.random.default_rng(42)
+    sample_idx = rng.choice(len(X_scaled), size=min(200, len(X_scaled)), replace=False)
+    single_diff = max(
+        float(np.max(np.abs(
+            model.predict_proba(X_scaled[[i]]) - kernel.predict_proba(X_scaled[[i]])
+        )))
+        for i in sample_idx
+    )
+    print(f"Single-row max diff:   {single_diff:.3e}")
+    ok &= single_diff <= atol
+
+    # 3. Scaler folded into the weights (what FatigueService serves) on raw features
+    X_raw = df[FEATURES].to_numpy(dtype=float)
+    folded = kernel.fold_affine(scaler.scale_, scaler.min_)
+    folded_diff = float(np.max(np.abs(folded.predict_proba(X_raw) - sk_probs)))
+    folded_mismatches = int(np.sum(folded.predict(X_raw) != model.predict(X_scaled)))
+    print(f"Folded scaler diff:    {folded_diff:.3e}")
+    print(f"Folded label mismatch: {folded_mismatches}")
+    ok &= folded_diff <= atol and folded_mismatches == 0
+
+    # 4. Exported raw-array artifact (what the API memory-maps) scores identically
+    artifact_dir = os.path.join(root,"artifacts","fatigue_arrays")
+    if os.path.exists(artifact_dir):
+        arrays, _ = load_array_artifact(artifact_dir, verify=True)
+        mapped = LinearSoftmaxKernel(arrays["folded_coef"], arrays["folded_intercept"], arrays["classes"])
+        array_diff = float(np.max(np.abs(mapped.predict_proba(X_raw) - sk_probs)))
+        print(f"Array artifact diff:   {array_diff:.3e}")
+        ok &= array_diff <= atol
+
+    print("\n✅ Parity OK" if ok else "\n❌ Parity FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_parity() else 1)
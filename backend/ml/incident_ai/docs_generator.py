@@ -3,7 +3,20 @@ from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from datetime import datetime
 
+from backend.app.core.metrics import stage
+
 def create_word_report(json_data, filename=None):
+    with stage("incident_report", "docx_render"):
+        doc = _build_document(json_data)
+
+    if filename:
+        with stage("incident_report", "docx_write"):
+            doc.save(filename)
+        print(f"Word Document saved locally as: {filename}")
+
+    return doc
+
+def _build_document(json_data):
     doc = Document()
     
     # --- 1. TITLE & HEADER ---
@@ -130,8 +143,4 @@ def create_word_report(json_data, filename=None):
     disclaimer.style = "Quote" 
     disclaimer.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
-    if filename:
-        doc.save(filename)
-        print(f"Word Document saved locally as: {filename}")
-        
     return doc
\ No newline at end of file
@@ -1,27 +1,21 @@
 import os
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from dotenv import load_dotenv
+import sys
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 import json
 import time as t
 
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
+if __name__ == "__main__":  # standalone run (python backend/ml/incident_ai/generate_report.py)
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
 
-if api_key:
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-flash-latest")
-else:
-    model = None
+# Gemini SDK is imported and configured lazily (see transcribe.get_genai)
+from transcribe import get_genai, get_safety_settings, upstream_call
 
-# --- NEW: Safety Settings to prevent blocking Accident/Crime descriptions ---
-safety_settings = {
-    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-}
+@lru_cache(maxsize=None)
+def get_model():
+    genai = get_genai()
+    return genai.GenerativeModel("gemini-flash-latest") if genai else None
 
 def create_fallback_data(transcription, category, location, time, error_msg):
     """
@@ -52,6 +46,7 @@ def create_fallback_data(transcription, category, location, time, error_msg):
     }
 
 def generate_incident_json(transcription, category, location, time):
+    model = get_model()
     if not model:
         return create_fallback_data(transcription, category, location, time, "AI Model Not Configured")
 
@@ -86,7 +81,8 @@ def generate_incident_json(transcription, category, location, time):
 
     try:
         # Pass safety_settings to avoid "Finish Reason: Safety"
-        response = model.generate_content(prompt, safety_settings=safety_settings)
+        with upstream_call("gemini_generate"):
+            response = model.generate_content(prompt, safety_settings=get_safety_settings())
         
         clean_text = response.text.replace("```json", "").replace("```", "").strip()
         data = json.loads(clean_text)
@@ -1,5 +1,10 @@
 import os
+import sys
 import time
+from pathlib import Path
+
+if __name__ == "__main__":  # standalone run (python backend/ml/incident_ai/main_workflow.py)
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
 
 # --- IMPORT MODULES ---
 from transcribe import process_incident_audio
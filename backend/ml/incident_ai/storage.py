@@ -2,9 +2,12 @@ import os
 import json
 from datetime import datetime
 
+from backend.app.core.metrics import stage
+
 # --- CONFIGURATION ---
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")) 
-BASE_DATA_DIR = os.path.join(BASE_DIR, "backend", "data")
+# INCIDENT_DATA_DIR redirects reports + database.json (e.g. for load tests)
+BASE_DATA_DIR = os.getenv("INCIDENT_DATA_DIR", os.path.join(BASE_DIR, "backend", "data"))
 DATABASE_FILE = os.path.join(BASE_DATA_DIR, "database.json")
 
 os.makedirs(BASE_DATA_DIR, exist_ok=True)
@@ -20,7 +23,8 @@ def save_report_and_update_db(user_id, doc_object, incident_data):
         filename = f"{incident_data['meta']['report_id']}.docx"
         file_path = os.path.join(user_folder, filename)
         
-        doc_object.save(file_path)
+        with stage("incident_report", "docx_write"):
+            doc_object.save(file_path)
         
         # Construct the download link (adjust host/port if deployed elsewhere)
         download_link = f"http://localhost:8000/data/{user_id}/{filename}"
@@ -41,18 +45,19 @@ def save_report_and_update_db(user_id, doc_object, incident_data):
     }
 
     try:
-        existing_data = []
-        if os.path.exists(DATABASE_FILE):
-            with open(DATABASE_FILE, 'r') as f:
-                try:
-                    existing_data = json.load(f)
-                except json.JSONDecodeError:
-                    existing_data = [] # Handle corrupted/empty file
-        
-        existing_data.insert(0, db_entry)
-        
-        with open(DATABASE_FILE, 'w') as f:
-            json.dump(existing_data, f, indent=4)
+        with stage("incident_report", "db_write"):
+            existing_data = []
+            if os.path.exists(DATABASE_FILE):
+                with open(DATABASE_FILE, 'r') as f:
+                    try:
+                        existing_data = json.load(f)
+                    except json.JSONDecodeError:
+                        existing_data = [] # Handle corrupted/empty file
+
+            existing_data.insert(0, db_entry)
+
+            with open(DATABASE_FILE, 'w') as f:
+                json.dump(existing_data, f, indent=4)
             
         print(f"✅ [Storage] Saved report to {filename} and updated database.json")
         
@@ -1,27 +1,50 @@
 import os
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 import json
-from dotenv import load_dotenv
+import importlib
+import sys
+from functools import lru_cache
+from pathlib import Path
 
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
+if __name__ == "__main__":  # standalone run (python backend/ml/incident_ai/transcribe.py)
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
 
-if not api_key:
-    print("⚠️ Warning: GOOGLE_API_KEY not found. AI features will fail, but Server is ON.")
-else:
+from backend.app.core.metrics import upstream_call
+
+# The Gemini SDK takes ~1s to import, so it is loaded and configured on
+# first use instead of at import time (keeps API cold start fast).
+@lru_cache(maxsize=None)
+def get_genai():
+    """Returns the configured google.generativeai module, or None without an API key."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+
+    if not api_key:
+        print("⚠️ Warning: GOOGLE_API_KEY not found. AI features will fail, but Server is ON.")
+        return None
+
+    # GENAI_MODULE swaps in a stand-in with the same API for offline load
+    # tests (e.g. backend.benchmarks.fake_genai)
+    genai = importlib.import_module(os.getenv("GENAI_MODULE", "google.generativeai"))
     genai.configure(api_key=api_key)
+    return genai
 
 # --- SAFETY SETTINGS ---
-safety_settings = {
-    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-}
+@lru_cache(maxsize=None)
+def get_safety_settings():
+    # From the module get_genai() loaded, so a GENAI_MODULE stand-in needs no real SDK
+    types = get_genai().types
+    HarmCategory, HarmBlockThreshold = types.HarmCategory, types.HarmBlockThreshold
+    return {
+        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+    }
 
 def process_incident_audio(audio_path):
-    if not api_key:
+    genai = get_genai()
+    if not genai:
         return {
             "transcription": "System Error: No Google API Key configured.",
             "category": "Other",
@@ -33,7 +56,8 @@ def process_incident_audio(audio_path):
     print(f'🚀 Uploading {audio_path} to Gemini...')
 
     try:
-        myfile = genai.upload_file(audio_path)
+        with upstream_call("gemini_upload"):
+            myfile = genai.upload_file(audio_path)
         print(f'✅ Upload complete: {myfile.name}')
     except Exception as e:
         print(f"❌ Upload failed: {e}")
@@ -81,11 +105,12 @@ def process_incident_audio(audio_path):
     
     try:
         # Added safety_settings here
-        result = model.generate_content(
-            [myfile, prompt],
-            generation_config={"response_mime_type": "application/json"},
-            safety_settings=safety_settings
-        )
+        with upstream_call("gemini_generate"):
+            result = model.generate_content(
+                [myfile, prompt],
+                generation_config={"response_mime_type": "application/json"},
+                safety_settings=get_safety_settings()
+            )
 
         data = json.loads(result.text)
         return data
@@ -5,23 +5,30 @@ This module prepares raw or processed datasets
 for ML training and inference.
 """
 
+import numpy as np
 import pandas as pd
 from features.feature_utils import (
     validate_features,
     clip_feature_ranges,
-    normalize_continuous_features
+    normalize_continuous_features,
+    validate_feature_array,
+    clip_feature_array
 )
 
 
 def prepare_features(
     df: pd.DataFrame,
-    normalize: bool = True
+    normalize: bool = True,
+    stats: dict | None = None
 ) -> pd.DataFrame:
     """
     Full feature preparation pipeline:
     1. Validate schema
     2. Clip outliers
     3. Normalize continuous features (optional)
+
+    stats: frozen training-time min/max. Required at inference;
+        omit only when fitting on the full training set.
     """
 
     # Step 1 — Schema validation
@@ -32,11 +39,32 @@ def prepare_features(
 
     # Step 3 — Normalize if requested
     if normalize:
-        df = normalize_continuous_features(df)
+        df = normalize_continuous_features(df, stats=stats)
 
     return df
 
 
+def prepare_feature_array(
+    X,
+    affine: tuple[np.ndarray, np.ndarray] | None = None
+) -> np.ndarray:
+    """
+    NumPy counterpart of prepare_features for inference.
+    X has shape (n_rows, 7) in REQUIRED_FEATURES order.
+
+    affine: (scale, offset) from normalization_affine(stats).
+        Applied in place as one fused multiply-add.
+    """
+    X = clip_feature_array(validate_feature_array(X))
+
+    if affine is not None:
+        scale, offset = affine
+        X *= scale
+        X += offset
+
+    return X
+
+
 def split_features_and_label(
     df: pd.DataFrame,
     label_col: str = "route_risk_label"
@@ -3,6 +3,8 @@ Utility functions for route risk feature processing.
 All features are designed to be auto-extracted with zero user input.
 """
 
+import json
+
 import numpy as np
 import pandas as pd
 
@@ -17,6 +19,29 @@ REQUIRED_FEATURES = [
     "shift_duration_hours"
 ]
 
+# Realistic bounds per feature (mirrors config/model_config.yaml)
+CLIP_RANGES = {
+    "route_distance_km": (0.5, 40),
+    "route_duration_min": (3, 180),
+    "intersection_density": (0.05, 5.0),
+    "fatigue_score": (1, 5),
+    "shift_duration_hours": (1, 16),
+    "weather_stress_index": (0, 1),
+}
+
+# Features min-max normalized for training and inference
+CONTINUOUS_FEATURES = [
+    "route_distance_km",
+    "route_duration_min",
+    "intersection_density",
+    "shift_duration_hours"
+]
+
+# Column-aligned bounds for the NumPy path (is_night is left unbounded)
+_CLIP_LOWER = np.array([CLIP_RANGES.get(f, (-np.inf, np.inf))[0] for f in REQUIRED_FEATURES], dtype=float)
+_CLIP_UPPER = np.array([CLIP_RANGES.get(f, (-np.inf, np.inf))[1] for f in REQUIRED_FEATURES], dtype=float)
+_IS_NIGHT_IDX = REQUIRED_FEATURES.index("is_night")
+
 
 def validate_features(df: pd.DataFrame) -> None:
     """
@@ -33,35 +58,120 @@ def clip_feature_ranges(df: pd.DataFrame) -> pd.DataFrame:
     """
     df = df.copy()
 
-    df["route_distance_km"] = df["route_distance_km"].clip(0.5, 40)
-    df["route_duration_min"] = df["route_duration_min"].clip(3, 180)
-    df["intersection_density"] = df["intersection_density"].clip(0.05, 5.0)
-    df["fatigue_score"] = df["fatigue_score"].clip(1, 5)
-    df["shift_duration_hours"] = df["shift_duration_hours"].clip(1, 16)
-    df["weather_stress_index"] = df["weather_stress_index"].clip(0, 1)
+    for col, (low, high) in CLIP_RANGES.items():
+        df[col] = df[col].clip(low, high)
     df["is_night"] = df["is_night"].astype(int)
 
     return df
 
 
-def normalize_continuous_features(df: pd.DataFrame) -> pd.DataFrame:
+def validate_feature_array(X) -> np.ndarray:
+    """
+    Array counterpart of validate_features.
+    Expects shape (n_rows, len(REQUIRED_FEATURES)) in REQUIRED_FEATURES order.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != len(REQUIRED_FEATURES):
+        raise ValueError(
+            f"Expected array of shape (n, {len(REQUIRED_FEATURES)}) "
+            f"with columns {REQUIRED_FEATURES}, got {X.shape}"
+        )
+    if not np.isfinite(X).all():
+        raise ValueError("Feature array contains NaN or infinite values")
+    return X
+
+
+def feature_array_from_records(records: list[dict]) -> np.ndarray:
+    """
+    Builds the (n_rows, 7) feature matrix from raw feature dicts,
+    columns in REQUIRED_FEATURES order.
+    """
+    missing = sorted({f for r in records for f in REQUIRED_FEATURES if f not in r})
+    if missing:
+        raise ValueError(f"Missing required features: {missing}")
+    X = np.array([[r[f] for f in REQUIRED_FEATURES] for r in records], dtype=float)
+    return X.reshape(-1, len(REQUIRED_FEATURES))
+
+
+def clip_feature_array(X: np.ndarray) -> np.ndarray:
+    """
+    Array counterpart of clip_feature_ranges (returns a new array).
+    """
+    X = np.clip(X, _CLIP_LOWER, _CLIP_UPPER)
+    X[:, _IS_NIGHT_IDX] = np.trunc(X[:, _IS_NIGHT_IDX])
+    return X
+
+
+def normalize_continuous_features(
+    df: pd.DataFrame,
+    stats: dict | None = None
+) -> pd.DataFrame:
     """
     Applies min-max normalization to continuous features.
     NOTE: This is optional for Logistic Regression but improves stability.
+
+    stats: frozen training-time min/max (see fit_normalization_stats).
+        When omitted, min/max come from df itself, which is only correct
+        for the full training set. Inference must always pass stats so a
+        row's score never depends on the rest of its batch.
     """
     df = df.copy()
 
-    continuous = [
-        "route_distance_km",
-        "route_duration_min",
-        "intersection_density",
-        "shift_duration_hours"
-    ]
+    if stats is None:
+        stats = fit_normalization_stats(df)
 
-    for col in continuous:
-        min_val = df[col].min()
-        max_val = df[col].max()
+    for col in CONTINUOUS_FEATURES:
+        min_val = stats[col]["min"]
+        max_val = stats[col]["max"]
         if max_val > min_val:
             df[col] = (df[col] - min_val) / (max_val - min_val)
 
     return df
+
+
+def fit_normalization_stats(df: pd.DataFrame) -> dict:
+    """
+    Computes per-feature min/max for normalize_continuous_features.
+    Expects already-clipped training data.
+    """
+    return {
+        col: {"min": float(df[col].min()), "max": float(df[col].max())}
+        for col in CONTINUOUS_FEATURES
+    }
+
+
+def save_normalization_stats(stats: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def load_normalization_stats(path: str) -> dict:
+    with open(path, "r") as f:
+        stats = json.load(f)
+
+    missing = [c for c in CONTINUOUS_FEATURES if c not in stats]
+    if missing:
+        raise ValueError(f"Normalization stats missing features: {missing}")
+    return stats
+
+
+def normalization_affine(stats: dict):
+    """
+    Precomputes the frozen normalization as a column-aligned affine map,
+    so that X_normalized = X * scale + offset for the NumPy path.
+    Non-continuous columns pass through unchanged (scale 1, offset 0).
+    """
+    scale = np.ones(len(REQUIRED_FEATURES))
+    offset = np.zeros(len(REQUIRED_FEATURES))
+
+    for col in CONTINUOUS_FEATURES:
+        min_val = stats[col]["min"]
+        max_val = stats[col]["max"]
+        if max_val > min_val:
+            i = REQUIRED_FEATURES.index(col)
+            scale[i] = 1.0 / (max_val - min_val)
+            offset[i] = -min_val * scale[i]
+
+    return scale, offset
@@ -0,0 +1,120 @@
+"""
+Versioned raw-array model artifacts.
+
+An artifact is a directory of plain .npy files plus a manifest.json:
+
+    route_risk_logreg_arrays/
+        manifest.json      format version, model name, array index, metadata
+        coef.npy
+        intercept.npy
+        ...
+
+Loading maps every array read-only with np.load(mmap_mode="r"), so all
+uvicorn workers on a host share one copy of the pages through the OS page
+cache, and no pickle is deserialized at startup. Only NumPy and the
+standard library are needed, so this module is shared by both models.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_array_artifact(out_dir: str, name: str, arrays: dict, metadata: dict | None = None) -> dict:
+    """
+    Writes each array as <key>.npy and then the manifest. The manifest is
+    written last, so a directory without one is never treated as complete.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    index = {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise TypeError(f"Array '{key}' has dtype=object; artifacts must not need pickle")
+
+        filename = f"{key}.npy"
+        path = os.path.join(out_dir, filename)
+        np.save(path, array, allow_pickle=False)
+        index[key] = {
+            "file": filename,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": file_sha256(path),
+        }
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "name": name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "arrays": index,
+        "metadata": metadata or {},
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(artifact_dir: str) -> dict:
+    with open(os.path.join(artifact_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format {manifest.get('format_version')} in {artifact_dir} "
+            f"(expected {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def load_array_artifact(artifact_dir: str, verify: bool = False):
+    """
+    Returns (arrays, manifest). Arrays are read-only memory maps.
+    verify=True re-hashes every file against the manifest (reads all pages).
+    """
+    manifest = read_manifest(artifact_dir)
+
+    arrays = {}
+    for key, entry in manifest["arrays"].items():
+        path = os.path.join(artifact_dir, entry["file"])
+        if verify and file_sha256(path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {path}")
+
+        array = np.load(path, mmap_mode="r", allow_pickle=False)
+        if list(array.shape) != entry["shape"] or array.dtype.str != entry["dtype"]:
+            raise ValueError(f"{path} does not match its manifest entry")
+        arrays[key] = array
+
+    return arrays, manifest
+
+
+def is_stale(manifest: dict, *source_paths: str) -> bool:
+    """
+    True when any file the artifact was exported from has changed since
+    (e.g. the model was retrained but not re-exported). Every source the
+    manifest records is checked; one missing from source_paths counts as
+    stale, one missing on disk does not (arrays-only deploys).
+    """
+    paths = {os.path.basename(path): path for path in source_paths}
+    for name, expected in manifest["metadata"].get("source_sha256", {}).items():
+        path = paths.get(name)
+        if path is None or (os.path.exists(path) and file_sha256(path) != expected):
+            return True
+    return False
@@ -0,0 +1,94 @@
+"""
+Pure-NumPy inference kernel for fitted multinomial logistic regression.
+
+The weights are pulled out of the sklearn estimator once, at load time, or
+mapped straight from a raw-array artifact (see array_artifacts.py).
+Scoring is then a single matmul + softmax, which skips sklearn's per-call
+input validation (the dominant cost for single-row requests).
+
+This module only depends on NumPy so it can be shared by the route risk
+and fatigue models.
+"""
+
+import numpy as np
+
+
+class LinearSoftmaxKernel:
+    def __init__(self, coef, intercept, classes):
+        # No copy for float64 C-contiguous input, so memory-mapped weights stay shared
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64)
+        self.classes = np.asarray(classes)
+
+        if self.coef.ndim != 2 or self.coef.shape[0] != len(self.classes):
+            raise ValueError(
+                f"Expected one coefficient row per class, got coef shape "
+                f"{self.coef.shape} for {len(self.classes)} classes"
+            )
+
+    @classmethod
+    def from_estimator(cls, model):
+        """
+        Builds a kernel from a fitted multinomial LogisticRegression.
+        """
+        if len(model.classes_) != model.coef_.shape[0]:
+            raise ValueError("Only multinomial (one row per class) models are supported")
+        return cls(model.coef_, model.intercept_, model.classes_)
+
+    def fold_affine(self, scale, offset) -> "LinearSoftmaxKernel":
+        """
+        Returns a kernel that scores raw inputs directly by folding a per-feature
+        affine preprocessing step (X * scale + offset, e.g. a MinMaxScaler)
+        into the weights:
+
+            W (X * s + o) + b  =  (W * s) X + (b + W o)
+        """
+        scale = np.asarray(scale, dtype=np.float64)
+        offset = np.asarray(offset, dtype=np.float64)
+        if scale.shape != (self.n_features,) or offset.shape != (self.n_features,):
+            raise ValueError(f"Expected scale/offset of shape ({self.n_features},)")
+
+        return LinearSoftmaxKernel(
+            self.coef * scale,
+            self.intercept + self.coef @ offset,
+            self.classes
+        )
+
+    @property
+    def n_features(self) -> int:
+        return self.coef.shape[1]
+
+    def class_index(self, label) -> int:
+        return int(np.flatnonzero(self.classes == label)[0])
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Per-feature terms coef[k, j] * X[i, j], shape (n_rows, n_classes, n_features).
+        Summing over the last axis (plus intercept) gives decision_function.
+        """
+        return X[:, None, :] * self.coef[None, :, :]
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw class scores, shape (n_rows, n_classes).
+        """
+        return X @ self.coef.T + self.intercept
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Softmax class probabilities, shape (n_rows, n_classes).
+        """
+        return softmax(self.decision_function(X))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmax(self.decision_function(X), axis=1)]
+
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    """
+    Row-wise numerically stable softmax (in place on a fresh array).
+    """
+    probs = scores - scores.max(axis=1, keepdims=True)
+    np.exp(probs, out=probs)
+    probs /= probs.sum(axis=1, keepdims=True)
+    return probs
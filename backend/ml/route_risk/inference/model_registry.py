@@ -0,0 +1,168 @@
+"""
+Process-wide registry for the Route Risk model.
+Loads the logistic regression artifact once and shares it across callers,
+together with the training-time normalization stats it was fitted on.
+
+When an exported raw-array artifact (route_risk_logreg_arrays/) sits next
+to the joblib and is up to date, the kernel is memory-mapped from it and
+the pickle is only unpickled if get_model() is actually called.
+
+Everything the request path needs lives in one immutable ModelBundle
+behind a single module reference. Swapping models (activate()) is one
+reference assignment, so readers never take a lock and never see a
+kernel from one version with the normalization of another.
+"""
+
+import os
+import threading
+from typing import NamedTuple
+
+import joblib
+
+from features.feature_utils import load_normalization_stats, normalization_affine
+from inference.array_artifacts import MANIFEST_NAME, is_stale, load_array_artifact
+from inference.linear_kernel import LinearSoftmaxKernel
+
+root = os.path.dirname(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(root, 'artifacts', 'route_risk_logreg.joblib')
+
+
+class ModelBundle(NamedTuple):
+    version: str
+    model_path: str
+    kernel: LinearSoftmaxKernel
+    norm_stats: dict
+    norm_affine: tuple  # (scale, offset)
+
+
+_bundle: ModelBundle | None = None
+_model = None  # (model_path, sklearn estimator), unpickled on demand
+_lock = threading.RLock()  # writers only
+
+
+def norm_stats_path(model_path: str) -> str:
+    """
+    Normalization stats live next to the model they belong to:
+    route_risk_logreg.joblib -> route_risk_logreg_norm_stats.json
+    """
+    return os.path.splitext(model_path)[0] + "_norm_stats.json"
+
+
+def array_artifact_path(model_path: str) -> str:
+    """
+    route_risk_logreg.joblib -> route_risk_logreg_arrays/
+    """
+    return os.path.splitext(model_path)[0] + "_arrays"
+
+
+NORM_STATS_PATH = norm_stats_path(MODEL_PATH)
+
+
+def _load_from_arrays(model_path: str):
+    """
+    Returns (kernel, stats, affine) from the raw-array artifact, or None
+    if there is none or it was exported from a different model/stats file.
+    """
+    artifact_dir = array_artifact_path(model_path)
+    if not os.path.exists(os.path.join(artifact_dir, MANIFEST_NAME)):
+        return None
+
+    arrays, manifest = load_array_artifact(artifact_dir)
+    if is_stale(manifest, model_path, norm_stats_path(model_path)):
+        print(f"⚠️ {artifact_dir} is out of date with {model_path}, loading the joblib instead")
+        return None
+
+    kernel = LinearSoftmaxKernel(arrays["coef"], arrays["intercept"], arrays["classes"])
+    affine = (arrays["norm_scale"], arrays["norm_offset"])
+    return kernel, manifest["metadata"]["norm_stats"], affine
+
+
+def build_bundle(model_path: str = MODEL_PATH, prefer_arrays: bool = True, version: str = "default") -> ModelBundle:
+    """
+    Loads a model and its normalization stats into a bundle without
+    activating it (safe to call while another version is serving).
+    """
+    loaded = _load_from_arrays(model_path) if prefer_arrays else None
+    if loaded is not None:
+        kernel, stats, affine = loaded
+        return ModelBundle(version, model_path, kernel, stats, affine)
+
+    stats_path = norm_stats_path(model_path)
+    for path in (model_path, stats_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model artifact not found at {path}")
+
+    model = joblib.load(model_path)
+    stats = load_normalization_stats(stats_path)
+    kernel = LinearSoftmaxKernel.from_estimator(model)
+    return ModelBundle(version, model_path, kernel, stats, normalization_affine(stats))
+
+
+def activate(bundle: ModelBundle) -> ModelBundle | None:
+    """
+    Atomically makes `bundle` the one served. Returns the previous bundle.
+    """
+    global _bundle
+    with _lock:
+        previous, _bundle = _bundle, bundle
+    return previous
+
+
+def load_model(model_path: str = MODEL_PATH, prefer_arrays: bool = True, version: str = "default") -> ModelBundle:
+    """
+    Loads (or reloads) the model and its normalization stats from disk
+    and activates them, together with the NumPy inference kernel.
+    Called once from the API startup hook.
+    """
+    bundle = build_bundle(model_path, prefer_arrays, version)
+    activate(bundle)
+    return bundle
+
+
+def get_bundle() -> ModelBundle:
+    """
+    Returns the active bundle, loading the default model on first use.
+    Read it once per request so all parts come from the same version.
+    """
+    bundle = _bundle
+    if bundle is None:
+        with _lock:
+            if _bundle is None:
+                load_model()
+            bundle = _bundle
+    return bundle
+
+
+def get_model():
+    """
+    Returns the sklearn model of the active version, unpickling it on
+    demand (the request path only ever uses the kernel).
+    """
+    global _model
+
+    model_path = get_bundle().model_path
+    cached = _model
+    if cached is None or cached[0] != model_path:
+        cached = _model = (model_path, joblib.load(model_path))
+    return cached[1]
+
+
+def get_kernel() -> LinearSoftmaxKernel:
+    """
+    Returns the cached NumPy kernel used on the request path.
+    """
+    return get_bundle().kernel
+
+
+def get_normalization_stats() -> dict:
+    """
+    Returns the frozen training-time min/max per continuous feature.
+    """
+    return get_bundle().norm_stats
+
+
+def get_normalization_affine():
+    """
+    Returns (scale, offset) so that X_normalized = X * scale + offset.
+    """
+    return get_bundle().norm_affine
@@ -1,17 +1,28 @@
 """
 Inference entrypoint for Route Risk Classification.
 Designed for API / backend usage (one-tap prediction).
+
+All entrypoints share one fused forward pass: per-feature contributions
+are computed once and reused for both the class probabilities and the
+top-k reasons, so the reasons always explain the score that was returned.
 """
 
-import joblib
+import sys
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-from features.feature_extraction import prepare_features
+from features.feature_extraction import prepare_feature_array
+from features.feature_utils import feature_array_from_records
+from inference.linear_kernel import softmax
+from inference.model_registry import ModelBundle, get_bundle, get_model
+from inference.risk_reasoning import reasons_from_contributions
 
-import os
-root = os.path.dirname(os.path.dirname(__file__))
+if __name__ == "__main__":  # standalone run (python -m inference.predict_route_risk)
+    sys.path.append(str(Path(__file__).resolve().parents[4]))
 
-MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg.joblib')
+from backend.app.core.metrics import stage
 
 
 def predict_route_risk(input_features: dict):
@@ -28,25 +39,70 @@ def predict_route_risk(input_features: dict):
         shift_duration_hours
     """
 
-    # Convert to DataFrame
-    df = pd.DataFrame([input_features])
+    result = score_route(input_features)
+    return {
+        "risk_label": result["risk_label"],
+        "risk_probabilities": result["risk_probabilities"]
+    }
 
-    # Prepare features (same pipeline as training)
-    df_prepared = prepare_features(df, normalize=True)
 
-    # Load model
-    model = joblib.load(MODEL_PATH)
+def score_route(input_features: dict, top_k: int = 3):
+    """
+    Single-route fused scoring: label, probabilities and reasons
+    from one forward computation.
+    """
 
-    # Prediction
-    risk_label = model.predict(df_prepared)[0]
-    risk_probs = model.predict_proba(df_prepared)[0]
+    batch = predict_route_risk_batch(feature_array_from_records([input_features]), top_k=top_k)
 
     return {
-        "risk_label": risk_label,
+        "risk_label": batch["risk_labels"][0],
         "risk_probabilities": {
             label: float(prob)
-            for label, prob in zip(model.classes_, risk_probs)
-        }
+            for label, prob in zip(batch["classes"], batch["risk_probabilities"][0])
+        },
+        "reasons": batch["reasons"][0]
+    }
+
+
+def predict_route_risk_batch(feature_array, top_k: int = 3, bundle: ModelBundle | None = None):
+    """
+    Vectorized prediction for many routes at once.
+
+    feature_array: array-like of shape (n_routes, 7), columns in
+        REQUIRED_FEATURES order (see features/feature_utils.py).
+
+    Rows are validated, clipped and normalized (frozen training stats) as
+    one NumPy matrix. Each row scores exactly as it would alone.
+
+    bundle: model version to score with; defaults to the active one
+        (read once, so a concurrent hot-swap never mixes versions).
+    """
+
+    bundle = bundle or get_bundle()
+
+    # Prepare features (same pipeline and frozen stats as training)
+    with stage("route_risk", "feature_prep"):
+        X = prepare_feature_array(feature_array, affine=bundle.norm_affine)
+
+    # Shared NumPy kernel (loaded once per process)
+    kernel = bundle.kernel
+
+    # One forward pass: contributions -> logits -> probabilities
+    with stage("route_risk", "model"):
+        contributions = kernel.contributions(X)
+        probs = softmax(contributions.sum(axis=2) + kernel.intercept)
+        labels = kernel.classes[np.argmax(probs, axis=1)]
+
+    # Reasons reuse the same contributions of the highest-risk class
+    with stage("route_risk", "reasons"):
+        high_contributions = contributions[:, kernel.class_index("High"), :]
+        reasons = reasons_from_contributions(high_contributions, top_k=top_k)
+
+    return {
+        "risk_labels": labels.tolist(),
+        "risk_probabilities": probs,
+        "classes": kernel.classes.tolist(),
+        "reasons": reasons
     }
 
 
@@ -63,9 +119,9 @@ if __name__ == "__main__":
     }
 
     print(predict_route_risk(sample_input))
-    model = joblib.load(MODEL_PATH)
+    model = get_model()
     coef_df = pd.DataFrame(
         model.coef_,
         columns=list(sample_input.keys()),
-        index=["Low", "Medium", "High"]) # type: ignore
+        index=model.classes_) # type: ignore
     print(coef_df)
@@ -3,12 +3,11 @@ Explainability module for Route Risk predictions.
 Maps model coefficients to human-readable reasons.
 """
 
-import joblib
 import numpy as np
-import os
 
-root = os.path.dirname(os.path.dirname(__file__))
-MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg.joblib')
+from features.feature_extraction import prepare_feature_array
+from features.feature_utils import feature_array_from_records
+from inference.model_registry import get_bundle, get_kernel
 
 FEATURE_NAMES = [
     "route_distance_km",
@@ -31,29 +30,58 @@ HUMAN_READABLE_REASONS = {
     "shift_duration_hours": "Long working hours increase exhaustion"
 }
 
+# Column-aligned lookup for the vectorized path
+_READABLE = [HUMAN_READABLE_REASONS[f] for f in FEATURE_NAMES]
+
 
 def get_top_risk_reasons(input_features: dict, top_k: int = 3):
     """
     Returns top contributing reasons for the predicted risk.
+    Contributions use the prepared (clipped + normalized) feature values
+    the model actually scores, so reasons agree with the prediction.
+    """
+
+    bundle = get_bundle()
+    X = prepare_feature_array(
+        feature_array_from_records([input_features]),
+        affine=bundle.norm_affine
+    )
+    return get_top_risk_reasons_batch(X, top_k=top_k, kernel=bundle.kernel)[0]
+
+
+def get_top_risk_reasons_batch(X_prepared: np.ndarray, top_k: int = 3, kernel=None):
+    """
+    Vectorized get_top_risk_reasons for prepared features of shape
+    (n_rows, 7) in FEATURE_NAMES order. Returns one list of reasons per row.
     """
 
-    model = joblib.load(MODEL_PATH)
+    kernel = kernel or get_kernel()
 
     # Use coefficients of the highest-risk class (usually 'High')
-    class_index = list(model.classes_).index("High")
-    coefs = model.coef_[class_index]
+    high_contributions = X_prepared * kernel.coef[kernel.class_index("High")]
+    return reasons_from_contributions(high_contributions, top_k=top_k)
+
+
+def reasons_from_contributions(contributions: np.ndarray, top_k: int = 3):
+    """
+    Picks the top_k features by |contribution| per row, largest first.
+    contributions: shape (n_rows, n_features).
+    """
 
-    feature_values = np.array([input_features[f] for f in FEATURE_NAMES])
-    contributions = coefs * feature_values
+    magnitude = np.abs(contributions)
+    n_features = magnitude.shape[1]
+    top_k = min(top_k, n_features)
 
-    ranked_idx = np.argsort(np.abs(contributions))[::-1][:top_k]
+    if top_k < n_features:
+        # O(n_features) selection per row, then sort only the k winners
+        top_idx = np.argpartition(-magnitude, top_k - 1, axis=1)[:, :top_k]
+    else:
+        top_idx = np.broadcast_to(np.arange(n_features), magnitude.shape)
 
-    reasons = []
-    for idx in ranked_idx:
-        feature = FEATURE_NAMES[idx]
-        reasons.append(HUMAN_READABLE_REASONS[feature])
+    order = np.argsort(-np.take_along_axis(magnitude, top_idx, axis=1), axis=1)
+    ranked_idx = np.take_along_axis(top_idx, order, axis=1)
 
-    return reasons
+    return [[_READABLE[idx] for idx in row] for row in ranked_idx]
 
 
 if __name__ == "__main__":
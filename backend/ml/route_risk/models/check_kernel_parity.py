@@ -0,0 +1,83 @@
+"""
+Parity check: NumPy inference kernel vs sklearn for the Route Risk model.
+Scores the full training CSV both ways and fails loudly on any mismatch.
+
+Run from backend/ml/route_risk:
+    python -m models.check_kernel_parity
+"""
+
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features.feature_extraction import prepare_features, split_features_and_label
+from features.feature_utils import REQUIRED_FEATURES, load_normalization_stats
+from inference.model_registry import array_artifact_path, norm_stats_path
+from inference.array_artifacts import load_array_artifact
+from inference.linear_kernel import LinearSoftmaxKernel
+import os
+
+root = os.path.dirname(os.path.dirname(__file__))
+
+DATA_PATH = os.path.join(root,'data','route_risk_expanded_10k.csv')
+MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg.joblib')
+
+ATOL = 1e-9
+
+
+def check_parity(atol: float = ATOL) -> bool:
+    df = pd.read_csv(DATA_PATH)
+    model = joblib.load(MODEL_PATH)
+    kernel = LinearSoftmaxKernel.from_estimator(model)
+
+    stats = load_normalization_stats(norm_stats_path(MODEL_PATH))
+    X, _ = split_features_and_label(prepare_features(df, normalize=True, stats=stats))
+    X = X[REQUIRED_FEATURES]
+    X_np = X.to_numpy(dtype=float)
+
+    ok = True
+
+    # 1. Full-matrix probabilities and labels
+    sk_probs = model.predict_proba(X)
+    np_probs = kernel.predict_proba(X_np)
+    max_diff = float(np.max(np.abs(sk_probs - np_probs)))
+    label_mismatches = int(np.sum(model.predict(X) != kernel.predict(X_np)))
+
+    print(f"Rows checked:          {len(X_np)}")
+    print(f"Max |prob diff|:       {max_diff:.3e}")
+    print(f"Label mismatches:      {label_mismatches}")
+    ok &= max_diff <= atol and label_mismatches == 0
+
+    # 2. Single-row calls (the API hot path) on a sample of rows
+    sample = X.sample(n=min(200, len(X)), random_state=42)
+    single_diff = max(
+        float(np.max(np.abs(
+            model.predict_proba(sample.iloc[[i]]) - kernel.predict_proba(sample.iloc[[i]].to_numpy(dtype=float))
+        )))
+        for i in range(len(sample))
+    )
+    print(f"Single-row max diff:   {single_diff:.3e}")
+    ok &= single_diff <= atol
+
+    # 3. Class order must match what the API reports
+    classes_match = list(model.classes_) == kernel.classes.tolist()
+    print(f"Class order matches:   {classes_match}")
+    ok &= classes_match
+
+    # 4. Exported raw-array artifact (what the API memory-maps) scores identically
+    artifact_dir = array_artifact_path(MODEL_PATH)
+    if os.path.exists(artifact_dir):
+        arrays, _ = load_array_artifact(artifact_dir, verify=True)
+        mapped = LinearSoftmaxKernel(arrays["coef"], arrays["intercept"], arrays["classes"])
+        array_diff = float(np.max(np.abs(mapped.predict_proba(X_np) - np_probs)))
+        print(f"Array artifact diff:   {array_diff:.3e}")
+        ok &= array_diff == 0.0 and mapped.classes.tolist() == kernel.classes.tolist()
+
+    print("\n✅ Parity OK" if ok else "\n❌ Parity FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_parity() else 1)
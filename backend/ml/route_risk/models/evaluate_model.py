@@ -8,6 +8,8 @@ import pandas as pd
 from sklearn.metrics import classification_report, confusion_matrix
 
 from features.feature_extraction import prepare_features, split_features_and_label
+from features.feature_utils import load_normalization_stats
+from inference.model_registry import norm_stats_path
 import os
 
 root = os.path.dirname(os.path.dirname(__file__))
@@ -20,9 +22,10 @@ def evaluate():
     # Load data & model
     df = pd.read_csv(DATA_PATH)
     model = joblib.load(MODEL_PATH)
+    stats = load_normalization_stats(norm_stats_path(MODEL_PATH))
 
-    # Prepare features
-    df_prepared = prepare_features(df, normalize=True)
+    # Prepare features (frozen training stats, as in serving)
+    df_prepared = prepare_features(df, normalize=True, stats=stats)
     X, y = split_features_and_label(df_prepared)
 
     # Predictions
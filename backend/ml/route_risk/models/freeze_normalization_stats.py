@@ -0,0 +1,39 @@
+"""
+Freezes the training-time min/max used to normalize continuous features.
+The stats are saved next to the model artifact and reused at inference,
+so serving applies exactly the transform the model was trained on.
+
+Run from backend/ml/route_risk:
+    python -m models.freeze_normalization_stats
+"""
+
+import pandas as pd
+
+from features.feature_utils import (
+    validate_features,
+    clip_feature_ranges,
+    fit_normalization_stats,
+    save_normalization_stats
+)
+from inference.model_registry import NORM_STATS_PATH
+import os
+
+root = os.path.dirname(os.path.dirname(__file__))
+
+DATA_PATH = os.path.join(root,'data','route_risk_expanded_10k.csv')
+
+
+def freeze(data_path: str = DATA_PATH, out_path: str = NORM_STATS_PATH) -> dict:
+    df = pd.read_csv(data_path)
+
+    # Same order as training: stats are taken on clipped values
+    validate_features(df)
+    stats = fit_normalization_stats(clip_feature_ranges(df))
+
+    save_normalization_stats(stats, out_path)
+    print("Normalization stats saved to:", out_path)
+    return stats
+
+
+if __name__ == "__main__":
+    print(freeze())
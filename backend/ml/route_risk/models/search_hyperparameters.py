@@ -0,0 +1,259 @@
+"""
+Parallel cross-validated hyperparameter search for the Route Risk model.
+
+The prepared feature matrix is cached as .npy files keyed by a hash of the
+data file and the feature pipeline source, so re-runs skip read_csv and
+prepare_features entirely. Worker processes memory-map the cache read-only
+(no copies, no pickling of X), and every (config, fold) fit runs as its own
+task across all cores.
+
+The cache holds clipped but unnormalized features. Each fold fits its
+normalization stats on its own training rows, so the validation fold
+never leaks into its scaling; only the final refit uses stats from all rows.
+
+Run from backend/ml/route_risk:
+    python -m models.search_hyperparameters
+    python -m models.search_hyperparameters --search random --n-iter 40 --folds 10
+    python -m models.search_hyperparameters --refit-out artifacts/route_risk_logreg.joblib
+"""
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+
+from features import feature_extraction, feature_utils
+from features.feature_extraction import prepare_features, split_features_and_label
+from features.feature_utils import (
+    REQUIRED_FEATURES,
+    fit_normalization_stats,
+    normalization_affine,
+    save_normalization_stats
+)
+from inference.model_registry import norm_stats_path
+
+root = os.path.dirname(os.path.dirname(__file__))
+
+DATA_PATH = os.path.join(root,'data','route_risk_expanded_10k.csv')
+CACHE_DIR = os.path.join(root,'artifacts','cache')
+# Bumped when the cached arrays change meaning (v2: unnormalized X)
+CACHE_FORMAT = "v2"
+RANDOM_STATE = 42
+
+PARAM_GRID = {
+    "C": [0.01, 0.1, 1.0, 10.0, 100.0],
+    "class_weight": [None, "balanced"],
+    "solver": ["lbfgs", "newton-cg", "saga"],
+}
+
+
+# -------------------------
+# Prepared-feature cache
+# -------------------------
+def cache_key(data_path: str) -> str:
+    """
+    Hash of the data file bytes and the feature pipeline source code.
+    Editing either invalidates the cache.
+    """
+    digest = hashlib.sha256(CACHE_FORMAT.encode())
+    with open(data_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    for module in (feature_utils, feature_extraction):
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_or_build_cache(data_path: str = DATA_PATH, cache_root: str = CACHE_DIR) -> str:
+    """
+    Returns the cache directory holding X.npy (clipped, unnormalized),
+    y.npy and meta.json, building it on first use.
+    """
+    cache_dir = os.path.join(cache_root, cache_key(data_path))
+    if os.path.exists(os.path.join(cache_dir, "meta.json")):
+        print(f"Using cached features: {cache_dir}")
+        return cache_dir
+
+    start = time.perf_counter()
+    df = pd.read_csv(data_path)
+    prepared = prepare_features(df, normalize=False)
+    # Stats of all rows, only for the final refit; folds fit their own
+    stats = fit_normalization_stats(prepared)
+    X, y = split_features_and_label(prepared)
+
+    classes, y_idx = np.unique(y.to_numpy(), return_inverse=True)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(os.path.join(cache_dir, "X.npy"), X[REQUIRED_FEATURES].to_numpy(dtype=np.float64))
+    np.save(os.path.join(cache_dir, "y.npy"), y_idx.astype(np.int64))
+    # meta.json is written last, so a half-built cache is never reused
+    with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+        json.dump({"data_path": data_path, "classes": classes.tolist(), "norm_stats": stats}, f, indent=2)
+
+    print(f"Built feature cache in {time.perf_counter() - start:.2f}s: {cache_dir}")
+    return cache_dir
+
+
+def load_cache(cache_dir: str):
+    X = np.load(os.path.join(cache_dir, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(cache_dir, "y.npy"), mmap_mode="r")
+    with open(os.path.join(cache_dir, "meta.json")) as f:
+        meta = json.load(f)
+    return X, y, meta
+
+
+# -------------------------
+# Worker side
+# -------------------------
+_X = None
+_y = None
+
+
+def _init_worker(cache_dir: str):
+    global _X, _y
+    _X, _y, _ = load_cache(cache_dir)
+
+
+def _fold_affine(X_train: np.ndarray):
+    """Normalization fitted on the fold's training rows only."""
+    return normalization_affine(fit_normalization_stats(pd.DataFrame(X_train, columns=REQUIRED_FEATURES)))
+
+
+def _fit_fold(config_id: int, params: dict, fold: int, train_idx, test_idx):
+    start = time.perf_counter()
+
+    X_train = _X[train_idx]
+    scale, offset = _fold_affine(X_train)
+
+    model = LogisticRegression(max_iter=1000, random_state=RANDOM_STATE, **params)
+    model.fit(X_train * scale + offset, _y[train_idx])
+    y_pred = model.predict(_X[test_idx] * scale + offset)
+    y_true = _y[test_idx]
+
+    return {
+        "config_id": config_id,
+        "fold": fold,
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "f1_macro": float(f1_score(y_true, y_pred, average="macro")),
+        "wall_time_s": time.perf_counter() - start,
+    }
+
+
+# -------------------------
+# Search driver
+# -------------------------
+def grid_configs(grid: dict) -> list[dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_configs(grid: dict, n_iter: int, seed: int = RANDOM_STATE) -> list[dict]:
+    """C is sampled log-uniformly over the grid's range; the rest uniformly."""
+    rng = np.random.default_rng(seed)
+    low, high = np.log10(min(grid["C"])), np.log10(max(grid["C"]))
+    return [
+        {
+            "C": float(10 ** rng.uniform(low, high)),
+            "class_weight": grid["class_weight"][rng.integers(len(grid["class_weight"]))],
+            "solver": grid["solver"][rng.integers(len(grid["solver"]))],
+        }
+        for _ in range(n_iter)
+    ]
+
+
+def search(configs: list[dict], cache_dir: str, folds: int = 5, workers: int | None = None):
+    _, y, _ = load_cache(cache_dir)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE).split(np.zeros(len(y)), y))
+
+    workers = workers or os.cpu_count()
+    print(f"Searching {len(configs)} configs x {folds} folds on {workers} workers...")
+
+    start = time.perf_counter()
+    fold_results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        futures = [
+            pool.submit(_fit_fold, config_id, params, fold, train_idx, test_idx)
+            for config_id, params in enumerate(configs)
+            for fold, (train_idx, test_idx) in enumerate(splits)
+        ]
+        for future in as_completed(futures):
+            fold_results.append(future.result())
+    total_wall = time.perf_counter() - start
+
+    return summarize(configs, fold_results), fold_results, total_wall
+
+
+def summarize(configs: list[dict], fold_results: list[dict]) -> list[dict]:
+    summary = []
+    for config_id, params in enumerate(configs):
+        rows = sorted((r for r in fold_results if r["config_id"] == config_id), key=lambda r: r["fold"])
+        f1 = np.array([r["f1_macro"] for r in rows])
+        summary.append({
+            "config_id": config_id,
+            "params": params,
+            "f1_macro_mean": float(f1.mean()),
+            "f1_macro_std": float(f1.std()),
+            "accuracy_mean": float(np.mean([r["accuracy"] for r in rows])),
+            "fold_wall_times_s": [round(r["wall_time_s"], 4) for r in rows],
+        })
+    return sorted(summary, key=lambda s: s["f1_macro_mean"], reverse=True)
+
+
+def refit(params: dict, cache_dir: str, model_path: str):
+    """Fits the best config on all rows and saves it with its norm stats."""
+    X, y, meta = load_cache(cache_dir)
+    scale, offset = normalization_affine(meta["norm_stats"])
+    model = LogisticRegression(max_iter=1000, random_state=RANDOM_STATE, **params)
+    model.fit(pd.DataFrame(X * scale + offset, columns=REQUIRED_FEATURES), np.asarray(meta["classes"], dtype=object)[y])
+
+    joblib.dump(model, model_path)
+    save_normalization_stats(meta["norm_stats"], norm_stats_path(model_path))
+    print("Best model refit and saved to:", model_path)
+
+
+def _print_report(summary: list[dict], total_wall: float, top: int = 10):
+    print(f"\nTotal wall time: {total_wall:.2f}s\n")
+    print(f"{'rank':<5}{'f1_macro':>18}{'accuracy':>10}  {'params':<50}fold wall times (s)")
+    for rank, s in enumerate(summary[:top], 1):
+        params = ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in s["params"].items())
+        print(
+            f"{rank:<5}{s['f1_macro_mean']:>10.4f} ± {s['f1_macro_std']:.4f}{s['accuracy_mean']:>10.4f}  "
+            f"{params:<50}{s['fold_wall_times_s']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel CV hyperparameter search for Route Risk")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=20, help="Configs to sample for --search random")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="Default: all cores")
+    parser.add_argument("--report", help="Write the full results as JSON")
+    parser.add_argument("--refit-out", help="Refit the best config on all rows and save it here")
+    args = parser.parse_args()
+
+    cache_dir = load_or_build_cache(args.data, args.cache_dir)
+    configs = grid_configs(PARAM_GRID) if args.search == "grid" else random_configs(PARAM_GRID, args.n_iter)
+
+    summary, fold_results, total_wall = search(configs, cache_dir, folds=args.folds, workers=args.workers)
+    _print_report(summary, total_wall)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"total_wall_time_s": total_wall, "summary": summary, "folds": fold_results}, f, indent=2)
+
+    if args.refit_out:
+        refit(summary[0]["params"], cache_dir, args.refit_out)
@@ -1,29 +1,41 @@
 """
 Train Logistic Regression model for Route Risk Classification.
 Model is lightweight, explainable, and hackathon-safe.
+
+Writes a candidate next to the shipped model by default; pass --out to
+choose where it goes (e.g. a versions/<name>/ dir for the admin API).
+
+Run from backend/ml/route_risk:
+    python -m models.train_logistic_regression
+    python -m models.train_logistic_regression --out artifacts/route_risk_logreg.joblib
 """
 
+import argparse
 import joblib
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
 from features.feature_extraction import prepare_features, split_features_and_label
+from features.feature_utils import clip_feature_ranges, fit_normalization_stats, save_normalization_stats
+from inference.model_registry import norm_stats_path
 import os
 
 root = os.path.dirname(os.path.dirname(__file__))
 
 DATA_PATH = os.path.join(root,'data','route_risk_expanded_10k.csv')
-MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg.joblib')
+# Not the served route_risk_logreg.joblib: overwriting that is opt-in via --out
+MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg_candidate.joblib')
 RANDOM_STATE = 42
 
 
-def train():
+def train(data_path: str = DATA_PATH, model_path: str = MODEL_PATH):
     # Load data
-    df = pd.read_csv(DATA_PATH)
+    df = pd.read_csv(data_path)
 
-    # Prepare features
-    df_prepared = prepare_features(df, normalize=True)
+    # Prepare features (stats are frozen here and shipped with the model)
+    stats = fit_normalization_stats(clip_feature_ranges(df))
+    df_prepared = prepare_features(df, normalize=True, stats=stats)
     X, y = split_features_and_label(df_prepared)
 
     # Train / validation split
@@ -44,13 +56,20 @@ def train():
 
     model.fit(X_train, y_train)
 
-    # Save model
-    # joblib.dump(model, MODEL_PATH)
+    # Save model (always together with its normalization stats)
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    joblib.dump(model, model_path)
+    save_normalization_stats(stats, norm_stats_path(model_path))
 
-    print("Model trained and saved to:", MODEL_PATH)
+    print("Model trained and saved to:", model_path)
+    print("Normalization stats saved to:", norm_stats_path(model_path))
     print("Validation accuracy:", model.score(X_val, y_val))
 
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the Route Risk logistic regression")
+    parser.add_argument("--data", default=DATA_PATH, help="Training CSV")
+    parser.add_argument("--out", default=MODEL_PATH, help="Output .joblib path")
+    args = parser.parse_args()
+    train(args.data, args.out)
     
@@ -0,0 +1,267 @@
+"""
+Out-of-core training for the Route Risk model.
+
+Streams the training data (CSV or Parquet) in chunks, so memory stays
+bounded by --chunksize no matter how large the trip logs are:
+
+1. Stats pass: clipped min/max per continuous feature + class counts
+   (skipped when --norm-stats points at already frozen stats).
+2. Training passes: each chunk goes through the frozen prepare_features
+   pipeline and updates a multinomial logistic regression with
+   mini-batch gradient steps (partial_fit).
+
+The result is saved as a regular LogisticRegression joblib plus its
+normalization stats, so inference.model_registry.load_model() can serve it.
+
+Run from backend/ml/route_risk:
+    python -m models.train_streaming --data trips.parquet --out artifacts/route_risk_logreg.joblib
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from features.feature_extraction import prepare_features, split_features_and_label
+from features.feature_utils import (
+    REQUIRED_FEATURES,
+    CONTINUOUS_FEATURES,
+    validate_features,
+    clip_feature_ranges,
+    load_normalization_stats,
+    save_normalization_stats
+)
+from inference.linear_kernel import softmax
+from inference.model_registry import norm_stats_path
+
+root = os.path.dirname(os.path.dirname(__file__))
+
+DATA_PATH = os.path.join(root,'data','route_risk_expanded_10k.csv')
+MODEL_PATH = os.path.join(root,'artifacts','route_risk_logreg_streaming.joblib')
+LABEL_COL = "route_risk_label"
+RANDOM_STATE = 42
+
+
+class StreamingSoftmaxRegression:
+    """
+    Multinomial logistic regression trained with partial_fit on mini-batches
+    (Adam updates, L2 penalty). sklearn has no multinomial linear model with
+    partial_fit, and SGDClassifier is one-vs-rest, which would not match the
+    softmax the inference kernel computes.
+    """
+
+    def __init__(self, classes, n_features, learning_rate=0.1, alpha=1e-4, class_weight=None):
+        self.classes_ = np.asarray(sorted(classes))
+        self.learning_rate = learning_rate
+        self.alpha = alpha
+
+        n_classes = len(self.classes_)
+        self.coef_ = np.zeros((n_classes, n_features))
+        self.intercept_ = np.zeros(n_classes)
+
+        # Per-class sample weights, in classes_ order
+        self._class_weight = np.ones(n_classes)
+        if class_weight:
+            self._class_weight = np.array([class_weight[c] for c in self.classes_], dtype=float)
+
+        # Adam state
+        self._t = 0
+        self._m = [np.zeros_like(self.coef_), np.zeros_like(self.intercept_)]
+        self._v = [np.zeros_like(self.coef_), np.zeros_like(self.intercept_)]
+
+    def _class_indices(self, y) -> np.ndarray:
+        idx = np.minimum(np.searchsorted(self.classes_, y), len(self.classes_) - 1)
+        if np.any(self.classes_[idx] != y):
+            raise ValueError(f"Unknown labels in y; expected {list(self.classes_)}")
+        return idx
+
+    def partial_fit(self, X: np.ndarray, y) -> "StreamingSoftmaxRegression":
+        y_idx = self._class_indices(np.asarray(y))
+        weights = self._class_weight[y_idx]
+
+        # Gradient of the weighted mean cross-entropy
+        probs = self.predict_proba(X)
+        probs[np.arange(len(y_idx)), y_idx] -= 1.0
+        residual = probs * (weights / weights.sum())[:, None]
+
+        grads = [residual.T @ X + self.alpha * self.coef_, residual.sum(axis=0)]
+        self._adam_step(grads)
+        return self
+
+    def _adam_step(self, grads, beta1=0.9, beta2=0.999, eps=1e-8):
+        self._t += 1
+        for i, (param, grad) in enumerate(zip((self.coef_, self.intercept_), grads)):
+            self._m[i] = beta1 * self._m[i] + (1 - beta1) * grad
+            self._v[i] = beta2 * self._v[i] + (1 - beta2) * grad ** 2
+            m_hat = self._m[i] / (1 - beta1 ** self._t)
+            v_hat = self._v[i] / (1 - beta2 ** self._t)
+            param -= self.learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return softmax(X @ self.coef_.T + self.intercept_)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(X @ self.coef_.T + self.intercept_, axis=1)]
+
+    def to_sklearn(self) -> LogisticRegression:
+        """
+        Packs the weights into a fitted LogisticRegression so the artifact
+        loads exactly like the batch-trained model.
+        """
+        model = LogisticRegression(max_iter=1000, class_weight="balanced")
+        model.classes_ = self.classes_.astype(object)
+        model.coef_ = self.coef_.copy()
+        model.intercept_ = self.intercept_.copy()
+        model.n_features_in_ = self.coef_.shape[1]
+        model.feature_names_in_ = np.array(REQUIRED_FEATURES, dtype=object)
+        model.n_iter_ = np.array([self._t])
+        return model
+
+
+def iter_chunks(path: str, chunksize: int):
+    """Yields DataFrame chunks from a CSV or Parquet file."""
+    if path.endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def scan_stats(path: str, chunksize: int):
+    """
+    Pass 1: streaming min/max of clipped continuous features and class counts.
+    """
+    mins = {col: np.inf for col in CONTINUOUS_FEATURES}
+    maxs = {col: -np.inf for col in CONTINUOUS_FEATURES}
+    class_counts = {}
+
+    for chunk in iter_chunks(path, chunksize):
+        validate_features(chunk)
+        clipped = clip_feature_ranges(chunk)
+        for col in CONTINUOUS_FEATURES:
+            mins[col] = min(mins[col], float(clipped[col].min()))
+            maxs[col] = max(maxs[col], float(clipped[col].max()))
+        for label, count in chunk[LABEL_COL].value_counts().items():
+            class_counts[label] = class_counts.get(label, 0) + int(count)
+
+    stats = {col: {"min": mins[col], "max": maxs[col]} for col in CONTINUOUS_FEATURES}
+    return stats, class_counts
+
+
+def scan_class_counts(path: str, chunksize: int) -> dict:
+    class_counts = {}
+    for chunk in iter_chunks(path, chunksize):
+        for label, count in chunk[LABEL_COL].value_counts().items():
+            class_counts[label] = class_counts.get(label, 0) + int(count)
+    return class_counts
+
+
+def _prepared_chunks(path: str, chunksize: int, stats: dict, holdout_every: int):
+    """
+    Yields (X_train, y_train, X_val, y_val) per chunk. Every holdout_every-th
+    row (by global position) is held out, so the split is deterministic
+    without ever materializing the full dataset.
+    """
+    offset = 0
+    for chunk in iter_chunks(path, chunksize):
+        X, y = split_features_and_label(prepare_features(chunk, normalize=True, stats=stats), LABEL_COL)
+        X = X[REQUIRED_FEATURES].to_numpy(dtype=float)
+        y = y.to_numpy()
+
+        is_val = np.zeros(len(X), dtype=bool)
+        if holdout_every:
+            is_val = (np.arange(offset, offset + len(X)) % holdout_every) == 0
+        offset += len(X)
+        yield X[~is_val], y[~is_val], X[is_val], y[is_val]
+
+
+def train_streaming(
+    data_path: str = DATA_PATH,
+    model_path: str = MODEL_PATH,
+    chunksize: int = 50_000,
+    epochs: int = 10,
+    batch_size: int = 128,
+    learning_rate: float = 0.1,
+    alpha: float = 1e-4,
+    holdout: float = 0.2,
+    norm_stats: str | None = None,
+    seed: int = RANDOM_STATE
+):
+    rng = np.random.default_rng(seed)
+
+    # Pass 1 — frozen feature stats and class balance
+    if norm_stats:
+        stats = load_normalization_stats(norm_stats)
+        class_counts = scan_class_counts(data_path, chunksize)
+    else:
+        stats, class_counts = scan_stats(data_path, chunksize)
+
+    total = sum(class_counts.values())
+    class_weight = {c: total / (len(class_counts) * n) for c, n in class_counts.items()}
+    print(f"Rows: {total}  Classes: {class_counts}")
+
+    model = StreamingSoftmaxRegression(
+        classes=list(class_counts),
+        n_features=len(REQUIRED_FEATURES),
+        learning_rate=learning_rate,
+        alpha=alpha,
+        class_weight=class_weight
+    )
+    holdout_every = round(1 / holdout) if holdout > 0 else 0
+
+    # Passes 2..N — incremental fitting, one chunk in memory at a time
+    for epoch in range(1, epochs + 1):
+        correct = seen = 0
+        for X_train, y_train, X_val, y_val in _prepared_chunks(data_path, chunksize, stats, holdout_every):
+            order = rng.permutation(len(X_train))
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                model.partial_fit(X_train[idx], y_train[idx])
+
+            if len(X_val):
+                correct += int(np.sum(model.predict(X_val) == y_val))
+                seen += len(X_val)
+
+        if seen:
+            print(f"Epoch {epoch}/{epochs}  validation accuracy: {correct / seen:.4f}")
+
+    # Save model (always together with its normalization stats)
+    joblib.dump(model.to_sklearn(), model_path)
+    save_normalization_stats(stats, norm_stats_path(model_path))
+
+    print("Model trained and saved to:", model_path)
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core Route Risk training")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV or Parquet training file")
+    parser.add_argument("--out", default=MODEL_PATH, help="Output .joblib path")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--alpha", type=float, default=1e-4, help="L2 penalty")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of rows held out for validation")
+    parser.add_argument("--norm-stats", help="Reuse frozen normalization stats instead of scanning the data")
+    args = parser.parse_args()
+
+    train_streaming(
+        data_path=args.data,
+        model_path=args.out,
+        chunksize=args.chunksize,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        alpha=args.alpha,
+        holdout=args.holdout,
+        norm_stats=args.norm_stats
+    )
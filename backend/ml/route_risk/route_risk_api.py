@@ -3,8 +3,7 @@ from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
 
-from inference.predict_route_risk import predict_route_risk
-from inference.risk_reasoning import get_top_risk_reasons
+from inference.predict_route_risk import score_route
 
 app = FastAPI(
     title="Route Risk API",
@@ -49,11 +48,5 @@ class RouteRiskResponse(BaseModel):
 def predict(data: RouteRiskRequest):
     input_features = data.dict()
 
-    prediction = predict_route_risk(input_features)
-    reasons = get_top_risk_reasons(input_features)
-
-    return {
-        "risk_label": prediction["risk_label"],
-        "risk_probabilities": prediction["risk_probabilities"],
-        "reasons": reasons
-    }
+    # Label, probabilities and reasons from one forward pass
+    return score_route(input_features)
@@ -109,7 +109,13 @@ function SOSPage() {
         combined.sort((a, b) => a.distance_km - b.distance_km);
         
         setAllServices(combined);
-        toast.success(`Found ${combined.length} places`, { id: toastId });
+        if (data.complete === false && data.events_url) {
+          // Server answered within its deadline; the remaining lists stream in
+          toast.success(`Found ${combined.length} places, still searching...`, { id: toastId });
+          followPendingResults(data.events_url);
+        } else {
+          toast.success(`Found ${combined.length} places`, { id: toastId });
+        }
       } else {
         toast.error('Failed to load data', { id: toastId });
       }
@@ -120,6 +126,22 @@ function SOSPage() {
     }
   };
 
+  const followPendingResults = (eventsUrl) => {
+    const source = new EventSource(`http://localhost:8000${eventsUrl}`);
+
+    source.addEventListener('places', (event) => {
+      const { type, places } = JSON.parse(event.data);
+      setAllServices(prev => {
+        // Replace this type's list (it may have been sent from cache already)
+        const merged = [...prev.filter(s => s.type !== type), ...places.map(p => ({ ...p, type }))];
+        merged.sort((a, b) => a.distance_km - b.distance_km);
+        return merged;
+      });
+    });
+    source.addEventListener('complete', () => source.close());
+    source.onerror = () => source.close();
+  };
+
   // 2. Filter Logic
   const filteredServices = allServices.filter(s => 
     activeTab === 'all' ? true : s.type === activeTab